@@ -3,11 +3,20 @@
 DMX Life Application - Main Entry Point
 Web interface for controlling DMX lighting scenes via Art-Net
 """
+import os
+
 from app import create_app
+from app.dmx_controller import start_engine
 
 app = create_app()
 
 if __name__ == '__main__':
+    # Start the output now, not at the first request, so a restored live
+    # state is back on the rig at once. Under the debug reloader this file
+    # runs in a monitoring parent too; only the child it spawns to serve
+    # (WERKZEUG_RUN_MAIN) may transmit.
+    if not app.config['DMXLIFE_DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_engine(app)
     # Host and debug are resolved by create_app() from DMXLIFE_HOST /
     # DMXLIFE_DEBUG, with a bind-address-based safety check already applied.
     app.run(host=app.config['DMXLIFE_HOST'], port=5050, debug=app.config['DMXLIFE_DEBUG'])
@@ -124,7 +124,13 @@ def create_app(config=None):
     app.config.update(
         SECRET_KEY=os.urandom(24),
         CONFIG_FILE=os.path.join(os.path.dirname(__file__), 'config.json'),
-        MAX_SCENES=40,
+        FIXTURE_LIBRARY=os.path.join(os.path.dirname(__file__), 'fixture_profiles'),
+        FIXTURE_CACHE_DIR=os.path.join(os.path.dirname(__file__), '..', 'cache'),
+        STATIC_BUILD_DIR=os.path.join(os.path.dirname(__file__), '..', 'cache', 'static'),
+        MAX_SCENES=5000,
+        CONFIG_WATCH=True,  # Reload config.json when it is edited outside the app
+        LIVE_STATE=True,  # Resume the active scenes after a restart (<CONFIG_FILE>.state)
+        ARTNET_LISTEN=True,  # Own UDP port 6454: node discovery and Art-Net input
         DMXLIFE_HOST=host,
         DMXLIFE_DEBUG=debug,
         VERSION=_read_version(),
@@ -157,6 +163,14 @@ def create_app(config=None):
     app.register_blueprint(main_bp)
     app.register_blueprint(setup_bp, url_prefix='/setup')
 
+    # Fingerprinted, precompressed static files, linked with asset_url()
+    from app import static_assets
+    static_assets.init_app(app)
+
+    # Per-endpoint request timing for /metrics
+    from app import metrics
+    metrics.init_app(app)
+
     # Initialize DMX controller
     from app.dmx_controller import init_dmx_controller
     init_dmx_controller(app)
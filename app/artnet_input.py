@@ -0,0 +1,181 @@
+"""
+Art-Net Input - Merges DMX from an external console into the output frame
+"""
+import numpy as np
+from flask import current_app
+
+
+# How the console's values combine with ours: 'htp' (highest takes
+# precedence) keeps whichever is brighter per channel; 'ltp' (latest takes
+# precedence) follows whichever side changed that channel most recently.
+MERGE_POLICIES = ('htp', 'ltp')
+
+DEFAULT_INPUT_SETTINGS = {
+    'enabled': False,
+    'universe': 0,
+    'merge': 'htp',
+    'timeout': 2.5,
+}
+
+ARTDMX_DATA_OFFSET = 18
+
+
+class _InputFrame:
+    """
+    One console frame as received. Built on the listener thread per packet
+    and never mutated afterwards, so the output thread reads whichever frame
+    reference is current without taking a lock.
+    """
+
+    __slots__ = ('values', 'changed_at', 'received_at', 'sender')
+
+    def __init__(self, values, changed_at, received_at, sender):
+        self.values = values
+        self.changed_at = changed_at  # Per channel, when the console last moved it
+        self.received_at = received_at
+        self.sender = sender
+
+
+class ArtNetInput:
+    """
+    Frame layer merging the latest ArtDmx frame from an external console.
+
+    handle_artdmx() runs on the Art-Net listener thread (registered with
+    ArtNetListener.add_handler) and only swaps in a new _InputFrame;
+    render() merges whatever frame is current with one or two whole-array
+    operations per tick. The first console heard owns the input until it
+    has been silent for `timeout` seconds, after which its values stop
+    being merged and any console can take over.
+    """
+
+    def __init__(self, own_source_port=None):
+        """
+        Args:
+            own_source_port: callable returning the UDP port our own Art-Net
+                output sends from (or None), so broadcast output looping back
+                to this host is never taken for console input
+        """
+        self.own_source_port = own_source_port or (lambda: None)
+        self.enabled = False
+        self.universe = 0
+        self.policy = 'htp'
+        self.timeout = DEFAULT_INPUT_SETTINGS['timeout']
+        self._input = None
+        self._ignored_senders = set()  # Logged once each, listener thread only
+
+        # Written by the output thread only: the frame underneath on the
+        # previous tick, and when each of its channels last changed (LTP)
+        self._previous_frame = np.zeros(512, dtype=np.uint8)
+        self._frame_changed_at = np.full(512, -np.inf)
+        self._restart_tracking = True
+        self._timed_out = None
+
+    def configure(self, settings):
+        """Apply the config's `input` section. Any held console frame is dropped."""
+        settings = {**DEFAULT_INPUT_SETTINGS, **(settings or {})}
+        self.universe = int(settings['universe'])
+        self.policy = settings['merge'] if settings['merge'] in MERGE_POLICIES else 'htp'
+        self.timeout = float(settings['timeout'])
+        self.enabled = bool(settings['enabled'])
+        self._input = None
+        self._ignored_senders = set()
+        self._restart_tracking = True
+
+        if current_app:
+            if self.enabled:
+                current_app.logger.info(
+                    f"Art-Net input: merging universe {self.universe} ({self.policy.upper()})"
+                )
+            else:
+                current_app.logger.info("Art-Net input: disabled")
+
+    def handle_artdmx(self, packet, sender, now):
+        """Take one ArtDmx packet (see ArtNetListener.add_handler)"""
+        if not self.enabled or len(packet) <= ARTDMX_DATA_OFFSET:
+            return
+        if int.from_bytes(packet[14:16], 'little') != self.universe:
+            return
+        ip, port = sender
+        if port == self.own_source_port():
+            return
+
+        current = self._input
+        live = current is not None and now - current.received_at <= self.timeout
+        if live and current.sender != ip:
+            if ip not in self._ignored_senders:
+                self._ignored_senders.add(ip)
+                if current_app:
+                    current_app.logger.warning(
+                        f"Art-Net input: ignoring {ip} on universe {self.universe}, "
+                        f"already following {current.sender}"
+                    )
+            return
+
+        length = min(int.from_bytes(packet[16:18], 'big'), 512,
+                     len(packet) - ARTDMX_DATA_OFFSET)
+        values = np.zeros(512, dtype=np.uint8)
+        values[:length] = np.frombuffer(packet, dtype=np.uint8, count=length,
+                                        offset=ARTDMX_DATA_OFFSET)
+
+        if live:
+            changed_at = np.where(values != current.values, now, current.changed_at)
+        else:
+            # A console appearing (or coming back) is the latest change on
+            # every channel it sends
+            changed_at = np.full(512, now)
+            if current_app:
+                current_app.logger.info(
+                    f"Art-Net input: following {ip} on universe {self.universe}"
+                )
+        # Channels past the packet's length were never sent, so never win LTP
+        changed_at[length:] = -np.inf
+
+        self._input = _InputFrame(values, changed_at, now, ip)
+
+    def render(self, frame, now):
+        """Merge the console's frame into this tick's output, in place"""
+        if not self.enabled:
+            return
+
+        if self.policy == 'ltp':
+            # Track changes underneath even while no console is sending, so a
+            # console appearing later is compared against real history. What
+            # was already on the output when merging started counts as old.
+            if self._restart_tracking:
+                self._restart_tracking = False
+                self._previous_frame[:] = frame
+                self._frame_changed_at.fill(-np.inf)
+            changed = frame != self._previous_frame
+            self._frame_changed_at[changed] = now
+            self._previous_frame[:] = frame
+
+        current = self._input
+        if current is None:
+            return
+        if now - current.received_at > self.timeout:
+            if self._timed_out is not current:
+                self._timed_out = current
+                if current_app:
+                    current_app.logger.warning(
+                        f"Art-Net input: {current.sender} silent for {self.timeout}s, "
+                        f"no longer merged"
+                    )
+            return
+
+        if self.policy == 'htp':
+            np.maximum(frame, current.values, out=frame)
+        else:
+            np.copyto(frame, current.values, where=current.changed_at > self._frame_changed_at)
+
+    def get_status(self, now):
+        """Input settings and the console currently followed, for display"""
+        current = self._input
+        live = current is not None and now - current.received_at <= self.timeout
+        return {
+            'enabled': self.enabled,
+            'universe': self.universe,
+            'merge': self.policy,
+            'timeout': self.timeout,
+            'source': current.sender if live else None,
+            'last_received_s': round(now - current.received_at, 1) if current else None,
+        }
@@ -0,0 +1,233 @@
+"""
+Config History - Every saved config as a revision, each part stored once by content
+"""
+import datetime
+import hashlib
+import json
+import os
+import zlib
+
+# Scenes per chunk of a revision's scene list: saving one scene stores that
+# scene, one chunk and the list of chunks, however many scenes there are
+SCENE_CHUNK = 128
+
+
+def _encode(value):
+    """The canonical bytes a part is hashed and stored as"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+class ConfigHistory:
+    """
+    A revision store for config.json, laid out like a small git object
+    store:
+
+        objects/<2 hex>/<62 hex>   zlib-compressed JSON, named by a sha256
+        revisions/<000042>.json    a manifest per revision
+        HEAD                       the latest revision number
+
+    A manifest names each top-level section by the hash of its content,
+    except `scenes`, stored per scene: the manifest names a list of chunks,
+    each chunk lists SCENE_CHUNK [name, scene hash] pairs. A part that is
+    already stored is never stored again, so a revision costs its manifest
+    plus whatever actually changed, and listing or diffing revisions reads
+    manifests and chunks, never the scenes themselves.
+
+    Not thread- or process-safe on its own: ConfigManager records under its
+    lock.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.revisions_dir = os.path.join(directory, 'revisions')
+        self._stored = set()  # Hashes known to be in objects/
+
+    # Objects
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _put(self, value):
+        """Store a part if it isn't stored yet; returns its hash"""
+        data = _encode(value)
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._stored:
+            return digest
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_file(path, zlib.compress(data))
+        self._stored.add(digest)
+        return digest
+
+    def _put_scene(self, scene):
+        """
+        Store a scene; returns its hash. Channel lists are hashed as bytes,
+        which is a fraction of the cost of encoding them, so only scenes not
+        stored yet are encoded as JSON.
+        """
+        try:
+            channels = bytes(scene['channels'])
+            rest = {key: value for key, value in scene.items() if key != 'channels'}
+        except (TypeError, ValueError, KeyError):
+            return self._put(scene)  # Not a DMX value list: hash it as JSON
+        digest = hashlib.sha256(b'scene\0' + _encode(rest) + b'\0' + channels).hexdigest()
+        if digest in self._stored:
+            return digest
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._write_file(path, zlib.compress(_encode(scene)))
+        self._stored.add(digest)
+        return digest
+
+    def _get(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    @staticmethod
+    def _write_file(path, data):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # Revisions
+
+    def _manifest_path(self, revision):
+        return os.path.join(self.revisions_dir, f"{revision:06d}.json")
+
+    def manifest(self, revision):
+        """A revision's manifest, or None if there is no such revision"""
+        try:
+            with open(self._manifest_path(revision)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _manifest_or_empty(self, revision):
+        """manifest(), with revision 0 as a manifest of the empty config"""
+        if revision == 0:
+            return {'order': [], 'sections': {}, 'scenes': None}
+        return self.manifest(revision)
+
+    def latest(self):
+        """The latest revision number, 0 if there is none"""
+        try:
+            with open(os.path.join(self.directory, 'HEAD')) as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return 0
+
+    def record(self, config, note=None):
+        """
+        Record `config` as a new revision, storing only the parts not stored
+        before. A config identical to the latest revision records nothing.
+
+        Returns the revision number holding `config`.
+        """
+        sections = {}
+        scenes = None
+        for key, value in config.items():
+            if key == 'scenes' and isinstance(value, list):
+                scenes = self._put_scenes(value)
+            else:
+                sections[key] = self._put(value)
+
+        latest = self.latest()
+        previous = self.manifest(latest) if latest else None
+        order = list(config)
+        if previous and (previous['order'], previous['sections'], previous['scenes']) == (order, sections, scenes):
+            return latest
+
+        revision = latest + 1
+        manifest = {
+            'revision': revision,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'note': note,
+            'order': order,
+            'sections': sections,
+            'scenes': scenes,
+        }
+        os.makedirs(self.revisions_dir, exist_ok=True)
+        self._write_file(self._manifest_path(revision), json.dumps(manifest).encode())
+        self._write_file(os.path.join(self.directory, 'HEAD'), str(revision).encode())
+        return revision
+
+    def _put_scenes(self, scenes):
+        entries = [[scene.get('name'), self._put_scene(scene)] if isinstance(scene, dict)
+                   else [None, self._put(scene)] for scene in scenes]
+        chunks = [self._put(entries[start:start + SCENE_CHUNK])
+                  for start in range(0, len(entries), SCENE_CHUNK)]
+        return self._put(chunks)
+
+    def _scene_entries(self, manifest):
+        """[[name, hash], ...] of a revision's scenes, read from its chunks"""
+        if manifest['scenes'] is None:
+            return []
+        return [entry for chunk in self._get(manifest['scenes']) for entry in self._get(chunk)]
+
+    def revisions(self, offset=0, limit=None):
+        """
+        One page of revisions, newest first, as {'revision', 'time', 'note'}.
+
+        Returns (revisions, total)
+        """
+        try:
+            names = sorted((name for name in os.listdir(self.revisions_dir) if name.endswith('.json')),
+                           reverse=True)
+        except OSError:
+            return [], 0
+        end = None if limit is None else offset + limit
+        page = []
+        for name in names[offset:end]:
+            manifest = self.manifest(int(name[:-len('.json')]))
+            if manifest is not None:
+                page.append({key: manifest[key] for key in ('revision', 'time', 'note')})
+        return page, len(names)
+
+    def load(self, revision):
+        """The config as it was at `revision`, or None if there is no such revision"""
+        manifest = self.manifest(revision)
+        if manifest is None:
+            return None
+        config = {}
+        for key in manifest['order']:
+            if key in manifest['sections']:
+                config[key] = self._get(manifest['sections'][key])
+            else:
+                config[key] = [self._get(digest) for _, digest in self._scene_entries(manifest)]
+        return config
+
+    def diff(self, old, new):
+        """
+        What changed from revision `old` to `new`: the top-level sections
+        whose content differs, and the scenes added, removed or changed (by
+        name). Scenes are compared by hash, so no scene is read.
+
+        Revision 0 is the empty config before the first revision, so the
+        first revision diffs as adding everything.
+
+        Returns {'sections': [...], 'scenes': {'added', 'removed',
+        'changed'}}, or None if either revision doesn't exist.
+        """
+        before, after = self._manifest_or_empty(old), self._manifest_or_empty(new)
+        if before is None or after is None:
+            return None
+
+        sections = [key for key in dict.fromkeys(before['order'] + after['order'])
+                    if key in before['sections'] or key in after['sections']
+                    if before['sections'].get(key) != after['sections'].get(key)]
+
+        scenes = {'added': [], 'removed': [], 'changed': []}
+        if before['scenes'] != after['scenes']:
+            old_scenes = dict(self._scene_entries(before))
+            new_scenes = dict(self._scene_entries(after))
+            for name, digest in new_scenes.items():
+                if name not in old_scenes:
+                    scenes['added'].append(name)
+                elif old_scenes[name] != digest:
+                    scenes['changed'].append(name)
+            scenes['removed'] = [name for name in old_scenes if name not in new_scenes]
+        return {'sections': sections, 'scenes': scenes}
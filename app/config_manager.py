@@ -1,11 +1,45 @@
 """
 Config Manager - Handles all configuration file I/O operations
 """
-import datetime
+import contextlib
 import json
 import os
-import shutil
+import threading
+import time
 from flask import current_app
+from app import metrics
+from app.config_history import ConfigHistory
+
+try:
+    import fcntl  # POSIX only: elsewhere, locked() only excludes this process's threads
+except ImportError:
+    fcntl = None
+
+def dumps(value, indent='    ', prefix=''):
+    """
+    JSON laid out like json.dumps(value, indent=4), except that a list of
+    numbers (or other non-string scalars) is kept on one line: a scene's
+    512 channel values then take one line instead of 512, the file a fifth
+    of the space, and each such list is encoded by the C encoder, which
+    json.dumps() can't use once it indents.
+    """
+    inner = prefix + indent
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        items = [f"{inner}{json.dumps(str(key))}: {dumps(item, indent, inner)}"
+                 for key, item in value.items()]
+        return '{\n' + ',\n'.join(items) + f"\n{prefix}}}"
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return '[]'
+        if not isinstance(value[0], (dict, list, tuple, str)):
+            flat = json.dumps(value)
+            if '"' not in flat and '[' not in flat[1:] and '{' not in flat:
+                return flat
+        items = [f"{inner}{dumps(item, indent, inner)}" for item in value]
+        return '[\n' + ',\n'.join(items) + f"\n{prefix}]"
+    return json.dumps(value)
 
 
 class ConfigManager:
@@ -13,28 +47,66 @@ class ConfigManager:
     
     def __init__(self, config_file):
         self.config_file = config_file
+        self._output_migration_logged = False
+        # Changes whenever the file does (see get_generation()); the instance
+        # token tells generations of different processes apart, since the
+        # counter starts again at every start-up
+        self.instance = os.urandom(4).hex()
+        self._generation = 0
+        self._file_signature = None
+        self._generation_lock = threading.Lock()
+        # The file's signature right after our own last write, so a watcher
+        # can tell that change from an edit made outside the app
+        self.written_signature = None
+        # Shared by every process using this config file (see locked() and
+        # _write_generation_file())
+        self.lock_file = f"{config_file}.lock"
+        self.generation_file = f"{config_file}.gen"
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_fd = None
+        # Every version written, deduplicated (replaces the daily full copies
+        # once kept in the same backups/ directory)
+        self.history = ConfigHistory(
+            os.path.join(os.path.dirname(config_file), '..', 'backups', 'history')
+        )
         self._ensure_config_exists()
     
     def _ensure_config_exists(self):
         """Create default configuration file if it doesn't exist"""
-        if not os.path.exists(self.config_file):
+        with self.locked():
+            if os.path.exists(self.config_file):
+                return
             default_config = {
-                'artnet_ip': '255.255.255.255',  # Broadcast by default
-                'artnet_port': 6454,
-                'universe': 0,
-                'packet_size': 512,
+                'output': {
+                    'backend': 'artnet',
+                    'artnet': {
+                        'ip': '255.255.255.255',  # Broadcast by default
+                        'port': 6454,
+                        'universe': 0,
+                        'packet_size': 512,
+                        'nodes': []
+                    }
+                },
                 'refresh_rate': 30,  # FPS
                 'fixtures': [],
-                'scenes': []
+                'scenes': [],
+                'effects': [],
+                'cue_lists': [],
+                'schedule': []
             }
             self.write(default_config)
     
     def read(self):
         """Read the entire configuration file"""
         try:
+            started = time.perf_counter()
             with open(self.config_file, 'r') as f:
-                config = json.load(f)
-            self._migrate_fixture_links(config.get('fixtures', []))
+                text = f.read()
+            config = json.loads(text)
+            metrics.CONFIG_READ.observe(time.perf_counter() - started)
+            metrics.CONFIG_READ_BYTES.observe(len(text))
+            self._migrate(config)
             return config
         except json.JSONDecodeError as e:
             backup_path = f"{self.config_file}.bak"
@@ -54,34 +126,139 @@ class ConfigManager:
                 current_app.logger.error(f"Error reading configuration: {e}")
             raise
 
-    def _snapshot_daily_backup(self):
+    def locked(self):
+        """
+        Hold the config for a read-modify-write cycle, excluding other
+        threads and, through an advisory flock() on config.json.lock, other
+        processes using the same file. A read() inside sees every write
+        that finished before the lock was taken, and no other write lands
+        until the block ends, so concurrent saves can't drop each other's
+        changes. Re-entrant within a thread; plain reads don't need it,
+        since write() replaces the file atomically.
         """
-        Copy the current on-disk config to backups/config-<date>.json if
-        today doesn't have one yet.
+        return self._locked()
 
-        Best-effort: any failure here (permissions, disk full, ...) is
-        logged and swallowed, never allowed to block the real write it
-        guards. Runs before the atomic-write sequence, since it needs to
-        capture the file exactly as it stood before this write touches it.
+    @contextlib.contextmanager
+    def _locked(self):
+        started = time.perf_counter()
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                except OSError:
+                    os.close(fd)
+                    raise
+                self._lock_fd = fd
+                metrics.CONFIG_LOCK_WAIT.observe(time.perf_counter() - started)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_fd is not None:
+                    os.close(self._lock_fd)  # Releases the flock
+                    self._lock_fd = None
+
+    def stored_generation(self):
         """
-        if not os.path.exists(self.config_file):
-            return
+        The generation recorded in config.json.gen: a counter every write()
+        from any process adds one to. 0 if there is no such file yet.
+        """
+        try:
+            with open(self.generation_file) as f:
+                generation = json.load(f)['generation']
+            return generation if isinstance(generation, int) else 0
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
 
+    def _write_generation_file(self):
+        """
+        Record one more generation; called by write(), under the lock, once
+        the new content is in place. Best-effort like the config history: without
+        it other processes still notice the write from the file's stat.
+        """
+        record = {'generation': self.stored_generation() + 1}
+        tmp_path = f"{self.generation_file}.tmp"
         try:
-            today = datetime.date.today().isoformat()
-            backups_dir = os.path.join(os.path.dirname(self.config_file), '..', 'backups')
-            snapshot_path = os.path.join(backups_dir, f"config-{today}.json")
+            with open(tmp_path, 'w') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self.generation_file)
+        except OSError as e:
+            if current_app:
+                current_app.logger.error(f"Error recording config generation: {e}")
 
-            if os.path.exists(snapshot_path):
-                return
+    def get_generation(self):
+        """
+        The config's generation and the file's modification time.
+
+        The generation is a counter that goes up whenever the file changes,
+        whether through write() here or in another process, or an edit made
+        outside the app, so equal generations mean identical content and a
+        response built from the config can be validated without reading it
+        again. Costs a stat() and a read of the few bytes in config.json.gen.
 
-            os.makedirs(backups_dir, exist_ok=True)
-            shutil.copy2(self.config_file, snapshot_path)
+        Returns (generation, mtime), or (generation, None) if the file
+        cannot be read.
+        """
+        try:
+            stat = os.stat(self.config_file)
+        except OSError:
+            return self._generation, None
+        signature = self._signature(stat)
+        with self._generation_lock:
+            if signature != self._file_signature:
+                self._file_signature = signature
+                self._generation += 1
+            return self._generation, stat.st_mtime
+
+    def _signature(self, stat):
+        # The stored generation catches writes by other processes that the
+        # stat alone could miss, e.g. two within a coarse mtime resolution
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size, self.stored_generation())
+
+    def file_signature(self):
+        """
+        The file's (inode, mtime in ns, size, stored generation), or None
+        if it can't be stat()ed
+        """
+        try:
+            return self._signature(os.stat(self.config_file))
+        except OSError:
+            return None
+
+    def _record_revision(self, config, note=None):
+        """
+        Record a config in the history (see ConfigHistory).
+
+        Best-effort: any failure (permissions, disk full, ...) is logged and
+        swallowed, never allowed to block the real write it accompanies.
+        """
+        try:
+            started = time.perf_counter()
+            self.history.record(config, note)
+            metrics.CONFIG_REVISION.observe(time.perf_counter() - started)
         except Exception as e:
             if current_app:
-                current_app.logger.error(f"Error creating daily config snapshot: {e}")
+                current_app.logger.error(f"Error recording config revision: {e}")
+
+    def _record_file_as_found(self):
+        """
+        Before a write, record the file as it stands unless our own last
+        write produced it: an edit made outside the app, or the first write
+        since start-up. Identical content records nothing, so the history
+        only gains a revision for a version nobody recorded.
+        """
+        if not os.path.exists(self.config_file) or self.file_signature() == self.written_signature:
+            return
+        try:
+            with open(self.config_file) as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return  # Nothing usable to keep; the write replaces it
+        self._record_revision(config, 'as found on disk')
 
-    def write(self, config):
+    def write(self, config, note=None):
         """
         Write the entire configuration file atomically.
 
@@ -90,16 +267,27 @@ class ConfigManager:
         then atomically replaces the target with the new content. A reader
         never observes a partial or empty file: at every point it is either
         the complete previous version or the complete new one.
+
+        Runs under locked(), so writes from several processes are applied
+        one at a time, each recording a new generation in config.json.gen.
+        Each write is also recorded in the config history, with `note` if
+        given.
         """
-        self._snapshot_daily_backup()
+        with self.locked():
+            self._write(config, note)
+
+    def _write(self, config, note):
+        started = time.perf_counter()
+        self._record_file_as_found()
 
         tmp_path = f"{self.config_file}.tmp"
         backup_path = f"{self.config_file}.bak"
         had_previous = os.path.exists(self.config_file)
 
         try:
+            text = dumps(config)
             with open(tmp_path, 'w') as f:
-                json.dump(config, f, indent=4)
+                f.write(text)
                 f.flush()
                 os.fsync(f.fileno())
 
@@ -126,6 +314,25 @@ class ConfigManager:
                 current_app.logger.error(f"Error writing configuration: {e}")
             raise
 
+        # Every write is a new generation, even one landing within the
+        # file system's timestamp resolution of the last
+        self._write_generation_file()
+        signature = self.file_signature()
+        with self._generation_lock:
+            self._generation += 1
+            self._file_signature = signature
+            self.written_signature = signature
+
+        self._record_revision(config, note)
+
+        metrics.CONFIG_WRITE.observe(time.perf_counter() - started)
+        metrics.CONFIG_WRITE_BYTES.observe(len(text))
+
+    def _migrate(self, config):
+        """Bring a config in an older layout up to date, in place (see below)"""
+        self._migrate_fixture_links(config.get('fixtures', []))
+        self._migrate_output_settings(config)
+
     def _migrate_fixture_links(self, fixtures):
         """
         Convert legacy positional `linked_to` indices to master fixture names,
@@ -220,44 +427,74 @@ class ConfigManager:
                 lines.append(f"  {name}: index {original_index} -> {outcome}")
             current_app.logger.warning("\n".join(lines))
 
+    # Legacy top-level Art-Net keys and where they live in output.artnet
+    LEGACY_ARTNET_KEYS = {
+        'artnet_ip': 'ip',
+        'artnet_port': 'port',
+        'universe': 'universe',
+        'packet_size': 'packet_size',
+    }
+
+    def _migrate_output_settings(self, config):
+        """
+        Move legacy top-level Art-Net settings into the `output` section, in
+        place, selecting the Art-Net backend. A config that already has an
+        `output` section is left untouched, so this is safe on every read;
+        the migrated shape reaches disk with the next write.
+        """
+        if 'output' in config:
+            return
+
+        artnet = {'nodes': []}
+        moved = []
+        for legacy_key, key in self.LEGACY_ARTNET_KEYS.items():
+            if legacy_key in config:
+                artnet[key] = config.pop(legacy_key)
+                moved.append(f"  {legacy_key} -> output.artnet.{key} = {artnet[key]!r}")
+        config['output'] = {'backend': 'artnet', 'artnet': artnet}
+
+        # Until the next write, every read migrates again; say so once
+        if moved and current_app and not self._output_migration_logged:
+            self._output_migration_logged = True
+            current_app.logger.warning(
+                "\n".join(["Migrated network settings into the output section:"] + moved)
+            )
+
     def update(self, **kwargs):
         """Update specific configuration keys"""
         try:
-            config = self.read()
-            config.update(kwargs)
-            self.write(config)
+            with self.locked():
+                config = self.read()
+                config.update(kwargs)
+                self.write(config)
             return config
         except Exception as e:
             if current_app:
                 current_app.logger.error(f"Error updating configuration: {e}")
             return None
     
+    def get_output_settings(self):
+        """Get the `output` section: the active backend and each backend's settings"""
+        config = self.read()
+        return config['output']
+
     def get_network_settings(self):
-        """Get network-related settings"""
+        """Get the Art-Net settings flattened to their legacy names"""
         config = self.read()
+        artnet = config['output'].get('artnet', {})
         return {
-            'artnet_ip': config.get('artnet_ip', '255.255.255.255'),
-            'artnet_port': config.get('artnet_port', 6454),
-            'universe': config.get('universe', 0),
-            'packet_size': config.get('packet_size', 512),
+            'artnet_ip': artnet.get('ip', '255.255.255.255'),
+            'artnet_port': artnet.get('port', 6454),
+            'universe': artnet.get('universe', 0),
+            'packet_size': artnet.get('packet_size', 512),
             'refresh_rate': config.get('refresh_rate', 30)
         }
     
-    def update_network_settings(self, artnet_ip=None, artnet_port=None, 
-                               universe=None, refresh_rate=None):
-        """Update network settings"""
-        updates = {}
-        if artnet_ip is not None:
-            updates['artnet_ip'] = artnet_ip
-        if artnet_port is not None:
-            updates['artnet_port'] = artnet_port
-        if universe is not None:
-            updates['universe'] = universe
-        if refresh_rate is not None:
-            updates['refresh_rate'] = refresh_rate
-        
-        return self.update(**updates)
-    
+    def get_input_settings(self):
+        """Get the `input` section (Art-Net console merge), or {} if never configured"""
+        config = self.read()
+        return config.get('input', {})
+
     def get_fixtures(self):
         """Get all fixtures"""
         config = self.read()
@@ -267,41 +504,57 @@ class ConfigManager:
         """Save fixtures list"""
         return self.update(fixtures=fixtures)
     
+    def get_effects(self):
+        """Get all effect definitions"""
+        config = self.read()
+        return config.get('effects', [])
+
+    def get_cue_lists(self):
+        """Get all cue list definitions"""
+        config = self.read()
+        return config.get('cue_lists', [])
+
+    def get_schedule(self):
+        """Get all time-of-day trigger definitions"""
+        config = self.read()
+        return config.get('schedule', [])
+
     def get_scenes(self):
         """Get all scenes"""
         config = self.read()
         return config.get('scenes', [])
     
-    def save_scene(self, name, channels, enabled_fixtures=None, group=None):
-        """Save or update a scene"""
+    def save_scene(self, name, channels, enabled_fixtures=None, group=None, position=None):
+        """
+        Save or update a scene.
+
+        `position` is where the caller expects the scene in the scenes list
+        (the SceneCatalogue keeps track); it is checked, and the list is only
+        searched if it doesn't hold the scene there.
+        """
         try:
-            config = self.read()
-            scenes = config.get('scenes', [])
-
-            # Check if scene exists
-            scene_index = None
-            for i, scene in enumerate(scenes):
-                if scene['name'] == name:
-                    scene_index = i
-                    break
-
-            # Create scene data
-            scene_data = {
-                'name': name,
-                'channels': channels,
-                'enabledFixtures': enabled_fixtures if enabled_fixtures is not None else [],
-                'group': group
-            }
+            with self.locked():
+                config = self.read()
+                scenes = config.get('scenes', [])
+                scene_index = self._find_scene(scenes, name, position)
+
+                # Create scene data
+                scene_data = {
+                    'name': name,
+                    'channels': channels,
+                    'enabledFixtures': enabled_fixtures if enabled_fixtures is not None else [],
+                    'group': group
+                }
             
-            # Update or append
-            if scene_index is not None:
-                scenes[scene_index] = scene_data
-            else:
-                scenes.append(scene_data)
+                # Update or append
+                if scene_index is not None:
+                    scenes[scene_index] = scene_data
+                else:
+                    scenes.append(scene_data)
             
-            # Save back
-            config['scenes'] = scenes
-            self.write(config)
+                # Save back
+                config['scenes'] = scenes
+                self.write(config)
             return True
             
         except Exception as e:
@@ -309,24 +562,47 @@ class ConfigManager:
                 current_app.logger.error(f"Error saving scene: {e}")
             return False
     
-    def delete_scene(self, name):
-        """Delete a scene by name"""
+    def delete_scene(self, name, position=None):
+        """Delete a scene by name, at `position` if given (as for save_scene())"""
         try:
-            config = self.read()
-            scenes = config.get('scenes', [])
-            
-            # Filter out the scene to delete
-            scenes = [scene for scene in scenes if scene['name'] != name]
+            with self.locked():
+                config = self.read()
+                scenes = config.get('scenes', [])
+                scene_index = self._find_scene(scenes, name, position)
+                if scene_index is not None:
+                    del scenes[scene_index]
             
-            config['scenes'] = scenes
-            self.write(config)
+                config['scenes'] = scenes
+                self.write(config)
             return True
             
         except Exception as e:
             if current_app:
                 current_app.logger.error(f"Error deleting scene: {e}")
             return False
+
+    @staticmethod
+    def _find_scene(scenes, name, position=None):
+        """The index of the scene called name, trying `position` first; None if absent"""
+        if position is not None and 0 <= position < len(scenes) and scenes[position].get('name') == name:
+            return position
+        return next((i for i, scene in enumerate(scenes) if scene.get('name') == name), None)
     
+    def get_revisions(self, offset=0, limit=None):
+        """Get one page of config revisions, newest first. Returns (revisions, total)."""
+        return self.history.revisions(offset, limit)
+
+    def get_revision(self, revision):
+        """Get the config as recorded at a revision, migrated like read(), or None"""
+        config = self.history.load(revision)
+        if config is not None:
+            self._migrate(config)
+        return config
+
+    def diff_revisions(self, old, new):
+        """Get what changed between two revisions (see ConfigHistory.diff()), or None"""
+        return self.history.diff(old, new)
+
     def get_scene_by_name(self, name):
         """Get a specific scene by name"""
         scenes = self.get_scenes()
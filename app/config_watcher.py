@@ -0,0 +1,128 @@
+"""
+Config Watcher - Notices edits made to config.json outside the app
+"""
+import threading
+
+# Sections that hold lists of definitions, and the fields each entry needs
+LIST_SECTIONS = {
+    'fixtures': ('name', 'start_channel', 'channel_count'),
+    'scenes': ('name', 'channels'),
+    'effects': ('name',),
+    'cue_lists': ('name',),
+    'schedule': (),
+}
+
+
+def find_config_problem(config):
+    """
+    Check that an edited config has the shape everything compiled from it
+    relies on. Individual bad effects, cue lists and triggers are skipped
+    by their own loaders; this catches what would break a whole section.
+
+    Returns None if usable, otherwise a message naming the problem.
+    """
+    if not isinstance(config, dict):
+        return 'the config must be a JSON object'
+    if not isinstance(config.get('output'), dict):
+        return "'output' must be an object"
+    if 'input' in config and not isinstance(config['input'], dict):
+        return "'input' must be an object"
+
+    for section, fields in LIST_SECTIONS.items():
+        entries = config.get(section, [])
+        if not isinstance(entries, list):
+            return f"'{section}' must be a list"
+        names = set()
+        for position, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                return f"{section} entry {position + 1} must be an object"
+            missing = [field for field in fields if field not in entry]
+            if missing:
+                return f"{section} entry {position + 1} has no '{missing[0]}'"
+            if 'name' in fields:
+                if not isinstance(entry['name'], str):
+                    return f"{section} entry {position + 1}: name must be text"
+                if entry['name'] in names:
+                    return f"{section}: '{entry['name']}' is defined twice"
+                names.add(entry['name'])
+
+    for fixture in config.get('fixtures', []):
+        start, count = fixture['start_channel'], fixture['channel_count']
+        if not all(isinstance(value, int) and not isinstance(value, bool) for value in (start, count)):
+            return f"fixture '{fixture['name']}': start_channel and channel_count must be integers"
+        if not (1 <= start <= 512 and 1 <= count <= 512):
+            return f"fixture '{fixture['name']}': channels out of range"
+    for scene in config.get('scenes', []):
+        if not isinstance(scene['channels'], list):
+            return f"scene '{scene['name']}': channels must be a list"
+    return None
+
+
+class ConfigWatcher:
+    """
+    Polls the config file's signature (inode, mtime, size) with stat() and
+    calls back when someone other than this process has changed it.
+
+    A change is acted on once the signature has held still for one poll,
+    so a copy still being written isn't read half-way. Polls run every
+    MIN_INTERVAL around a change and back off, doubling, to MAX_INTERVAL
+    while the file is quiet: a stat every few seconds when nothing happens.
+    The app's own writes are recognised by ConfigManager.written_signature
+    and ignored; their effects are applied where they are made.
+    """
+
+    MIN_INTERVAL = 0.5
+    MAX_INTERVAL = 5.0
+
+    def __init__(self, config_manager, on_change):
+        """
+        Args:
+            config_manager: the ConfigManager whose file to watch
+            on_change: callable with no arguments, invoked on the watcher
+                thread after an outside edit has settled
+        """
+        self.config_manager = config_manager
+        self.on_change = on_change
+        # Taken now, when the config has just been loaded, so an edit made
+        # before the thread starts is still noticed
+        self._seen = config_manager.file_signature()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the watcher thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self):
+        seen = self._seen
+        candidate = None  # A new signature waiting to hold still
+        interval = self.MIN_INTERVAL
+        while not self._stop.wait(interval):
+            signature = self.config_manager.file_signature()
+            if signature is None or signature == seen:
+                # Unchanged, or missing for a moment while being replaced
+                candidate = None
+                interval = min(interval * 2, self.MAX_INTERVAL)
+                continue
+
+            interval = self.MIN_INTERVAL
+            if signature != candidate:
+                candidate = signature
+                continue
+
+            seen, candidate = signature, None
+            self._seen = seen
+            if signature != self.config_manager.written_signature:
+                self.on_change()
@@ -0,0 +1,230 @@
+"""
+Cue Sequencer - Ordered cue lists with fades, delays and auto-follow
+"""
+import threading
+
+import numpy as np
+from flask import current_app
+
+
+class _Playback:
+    """Run state of one cue list. Guarded by CueSequencer._lock."""
+
+    def __init__(self):
+        self.cue_index = -1
+        # Monotonic time the current cue was started, or None while a GO is
+        # waiting for the output thread's next tick to pick it up
+        self.go_time = None
+        self.from_values = None  # Values faded from, over the list's channels
+        self.output = None  # Values written on the last tick
+
+
+class CueSequencer:
+    """
+    Plays cue lists as a frame layer on DMXController.
+
+    Every cue's target frame is composed from its scenes when the cue lists
+    are loaded, not when it is triggered, so a GO only has to record which
+    cue is next. The fade itself is advanced by render() on the output
+    thread, using that thread's monotonic clock: a GO takes effect on the
+    very next transmitted frame.
+
+    A cue list owns every channel any of its cues writes. While a list is
+    playing, those channels follow the list and override the scene stack
+    underneath; a channel one cue writes and the next doesn't fades to 0.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.cue_lists = {}  # list name -> compiled list, see _compile_cue_list
+        self.playbacks = {}  # list name -> _Playback, insertion-ordered
+
+    def load_cue_lists(self, definitions, scene_manager):
+        """
+        Precompute every cue's target frame from the scenes it names.
+
+        A list with a cue that can't be composed (unknown scene, bad timing
+        value) is logged and skipped as a whole - playing it with a gap in
+        the middle would be worse than not offering it at all.
+        """
+        compiled = {}
+        for definition in definitions:
+            try:
+                cue_list = self._compile_cue_list(definition, scene_manager)
+            except (KeyError, TypeError, ValueError) as e:
+                if current_app:
+                    current_app.logger.error(
+                        f"Skipping cue list '{definition.get('name')}': {e}"
+                    )
+                continue
+            compiled[cue_list['name']] = cue_list
+
+        with self._lock:
+            old_lists = self.cue_lists
+            self.cue_lists = compiled
+            # Playbacks survive a reload if their list still has the cue they
+            # were on; the new target is picked up on the next tick.
+            for name, playback in list(self.playbacks.items()):
+                cue_list = compiled.get(name)
+                if cue_list is None or playback.cue_index >= len(cue_list['cues']):
+                    del self.playbacks[name]
+                elif not np.array_equal(cue_list['index'], old_lists[name]['index']):
+                    # The list's channel set changed, so the running arrays
+                    # no longer line up: restart the current cue from it.
+                    playback.go_time = None
+                    playback.output = None
+        return True
+
+    def _compile_cue_list(self, definition, scene_manager):
+        """Compose each cue's scenes into a target frame over the list's channels"""
+        name = definition['name']
+        cues = []
+        claimed_any = np.zeros(512, dtype=bool)
+        for position, cue in enumerate(definition['cues']):
+            for scene_name in cue['scenes']:
+                if scene_name not in scene_manager.scenes:
+                    raise ValueError(f"cue {position + 1} names unknown scene '{scene_name}'")
+            buffer, claimed = scene_manager.compose_scenes(cue['scenes'])
+            claimed_any |= np.frombuffer(bytes(claimed), dtype=np.uint8).astype(bool)
+
+            # A null fade or delay means the default, as a null follow means none
+            fade, delay, follow = cue.get('fade'), cue.get('delay'), cue.get('follow')
+            cues.append({
+                'label': str(cue.get('label') or position + 1),
+                'frame': np.frombuffer(bytes(buffer), dtype=np.uint8),
+                'fade': 3.0 if fade is None else max(float(fade), 0.0),
+                'delay': 0.0 if delay is None else max(float(delay), 0.0),
+                'follow': None if follow is None else max(float(follow), 0.0),
+            })
+
+        if not cues:
+            raise ValueError('no cues')
+
+        index = np.flatnonzero(claimed_any)
+        for cue in cues:
+            cue['target'] = cue.pop('frame')[index].astype(np.float64)
+        return {'name': name, 'index': index, 'cues': cues}
+
+    def get_cue_lists(self):
+        """Get every cue list with its cue labels"""
+        return {
+            name: [cue['label'] for cue in cue_list['cues']]
+            for name, cue_list in self.cue_lists.items()
+        }
+
+    def get_state(self):
+        """Get the current cue of every playing list, as {list name: cue label}"""
+        with self._lock:
+            return {
+                name: self.cue_lists[name]['cues'][playback.cue_index]['label']
+                for name, playback in self.playbacks.items()
+            }
+
+    def go(self, list_name):
+        """Advance a cue list to its next cue. Returns (success, message)."""
+        with self._lock:
+            playback = self.playbacks.get(list_name)
+            cue_index = playback.cue_index + 1 if playback else 0
+            return self._start_cue(list_name, cue_index)
+
+    def back(self, list_name):
+        """Step a playing cue list back to its previous cue. Returns (success, message)."""
+        with self._lock:
+            playback = self.playbacks.get(list_name)
+            if playback is None:
+                return False, f"Cue list '{list_name}' is not playing"
+            return self._start_cue(list_name, playback.cue_index - 1)
+
+    def goto(self, list_name, cue_label):
+        """Jump a cue list to the cue with the given label. Returns (success, message)."""
+        with self._lock:
+            cue_list = self.cue_lists.get(list_name)
+            if cue_list is None:
+                return False, f"Cue list '{list_name}' not found"
+            for cue_index, cue in enumerate(cue_list['cues']):
+                if cue['label'] == str(cue_label):
+                    return self._start_cue(list_name, cue_index)
+            return False, f"Cue '{cue_label}' not found in '{list_name}'"
+
+    def release(self, list_name):
+        """Stop a cue list, handing its channels back to the scene stack"""
+        with self._lock:
+            if self.playbacks.pop(list_name, None) is None:
+                return False, f"Cue list '{list_name}' is not playing"
+            return True, None
+
+    def _start_cue(self, list_name, cue_index):
+        """Queue a cue to start on the next output tick. Caller must hold _lock."""
+        cue_list = self.cue_lists.get(list_name)
+        if cue_list is None:
+            return False, f"Cue list '{list_name}' not found"
+        if not 0 <= cue_index < len(cue_list['cues']):
+            return False, f"No cue to go to in '{list_name}'"
+
+        playback = self.playbacks.setdefault(list_name, _Playback())
+        playback.cue_index = cue_index
+        playback.go_time = None
+        if current_app:
+            current_app.logger.info(
+                f"Cue list '{list_name}': cue {cue_list['cues'][cue_index]['label']}"
+            )
+        return True, None
+
+    def get_highest_active_idx(self):
+        """Get the highest DMX channel index a playing list writes, or 0"""
+        with self._lock:
+            highest = 0
+            for name in self.playbacks:
+                index = self.cue_lists[name]['index']
+                if len(index):
+                    highest = max(highest, int(index[-1]))
+            return highest
+
+    def render(self, frame, now):
+        """
+        Advance every playing list's fade and write it onto the frame (in place).
+
+        Args:
+            frame: numpy uint8 array of 512 channels with the scene stack's
+                output for this tick
+            now: the output thread's monotonic clock for this tick
+        """
+        with self._lock:
+            for name, playback in self.playbacks.items():
+                cue_list = self.cue_lists[name]
+                index = cue_list['index']
+                if not len(index):
+                    continue
+
+                if playback.go_time is None:
+                    # A GO landed since the last tick: fade from exactly what
+                    # was on the wire, whether that was this list or the
+                    # scene stack underneath it.
+                    playback.from_values = (
+                        playback.output if playback.output is not None
+                        else frame[index].astype(np.float64)
+                    )
+                    playback.go_time = now
+
+                cue = cue_list['cues'][playback.cue_index]
+                elapsed = now - playback.go_time - cue['delay']
+                if elapsed <= 0:
+                    progress = 0.0
+                elif cue['fade'] <= 0:
+                    progress = 1.0
+                else:
+                    progress = min(elapsed / cue['fade'], 1.0)
+
+                output = playback.from_values + (cue['target'] - playback.from_values) * progress
+                playback.output = output
+                frame[index] = np.rint(output).astype(np.uint8)
+
+                # Auto-follow, timed from the end of this cue's fade. The
+                # next cue's clock starts at the follow deadline rather than
+                # at this tick, so a chain of follows doesn't drift.
+                if cue['follow'] is not None and playback.cue_index + 1 < len(cue_list['cues']):
+                    deadline = playback.go_time + cue['delay'] + cue['fade'] + cue['follow']
+                    if now >= deadline:
+                        playback.cue_index += 1
+                        playback.from_values = output
+                        playback.go_time = deadline
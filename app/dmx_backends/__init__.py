@@ -0,0 +1,11 @@
+"""
+DMX output backends - the transports DMXController sends frames through
+"""
+from app.dmx_backends.base import DMXBackend, DMXBackendError
+from app.dmx_backends.factory import BACKENDS, create_backend
+from app.dmx_backends.artnet_discovery import ArtNetListener, NodeTable
+
+__all__ = [
+    'DMXBackend', 'DMXBackendError', 'BACKENDS', 'create_backend',
+    'ArtNetListener', 'NodeTable',
+]
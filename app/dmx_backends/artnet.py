@@ -0,0 +1,167 @@
+"""
+Art-Net Backend - ArtDmx output over UDP, unicast to known nodes or broadcast
+"""
+import socket
+
+from app.dmx_backends.base import DMXBackend, DMXBackendError
+
+
+ARTNET_PORT = 6454
+PROTOCOL_VERSION = 14
+OP_DMX = 0x5000
+
+ARTDMX_HEADER_SIZE = 18
+SEQUENCE_OFFSET = 12
+
+
+def port_address(net, subnet, universe):
+    """Combine net (0-127), subnet (0-15) and universe (0-15) into a Port-Address"""
+    return (net & 0x7F) << 8 | (subnet & 0x0F) << 4 | (universe & 0x0F)
+
+
+def build_artdmx_header(address, length):
+    """
+    The 18-byte ArtDmx header for one Port-Address, with the sequence byte
+    left at 0 for the sender to fill in per frame.
+
+    Args:
+        address: 15-bit Port-Address (see port_address())
+        length: number of channels that follow, even, 2-512
+    """
+    return (
+        b'Art-Net\x00'
+        + OP_DMX.to_bytes(2, 'little')
+        + PROTOCOL_VERSION.to_bytes(2, 'big')
+        + bytes([0, 0])  # Sequence, Physical
+        + address.to_bytes(2, 'little')  # SubUni, Net
+        + length.to_bytes(2, 'big')
+    )
+
+
+class ArtNetBackend(DMXBackend):
+    """
+    Sends each frame as one ArtDmx packet to every node outputting its
+    universe.
+
+    The packet is built once, header included, and reused: a frame costs
+    one copy into its data area, one sequence byte, and then one sendto()
+    per destination over the same buffer.
+
+    Destinations, in order of preference: the `nodes` the operator listed;
+    otherwise the nodes discovery currently knows serve this universe (see
+    NodeTable); otherwise the single `ip`, broadcast by default. Discovered
+    destinations are looked up per frame, so a node appearing or expiring
+    takes effect on the next frame without a reconfigure.
+
+    A frame only fails if it reached no destination at all. One dead node
+    among several is reported in get_connection_status() instead, so the
+    controller doesn't back off the frames the healthy nodes still get.
+    """
+
+    name = 'artnet'
+
+    def __init__(self, ip='255.255.255.255', port=ARTNET_PORT, universe=0,
+                 packet_size=512, nodes=None, node_table=None):
+        """
+        Args:
+            ip: fallback destination when no nodes are listed
+            port: UDP port every node listens on
+            universe: 15-bit Port-Address (net, subnet and universe together)
+            packet_size: channels per packet; rounded up to even, 2-512
+            nodes: IP addresses to unicast to, instead of `ip`
+            node_table: NodeTable of discovered nodes, or None to not use
+                discovery
+        """
+        self.ip = ip
+        self.port = port
+        self.universe = universe
+        self.packet_size = max(2, min(packet_size + packet_size % 2, 512))
+        self.nodes = list(nodes or [])
+
+        self._packet = bytearray(
+            build_artdmx_header(universe, self.packet_size) + bytes(self.packet_size)
+        )
+        self._data = memoryview(self._packet)[ARTDMX_HEADER_SIZE:]
+        self._sequence = 0
+        self._static_destinations = tuple((node, port) for node in self.nodes)
+        self._fallback_destinations = ((ip, port),)
+        self.node_table = node_table
+        self.source_port = None  # Local UDP port frames are sent from, once connected
+        # "ip:port" -> error, for the destinations the last frame didn't reach
+        self.failed_destinations = {}
+        self._socket = None
+
+    @classmethod
+    def from_settings(cls, settings, node_table=None, **services):
+        try:
+            return cls(
+                ip=str(settings.get('ip', '255.255.255.255')),
+                port=int(settings.get('port', ARTNET_PORT)),
+                universe=int(settings.get('universe', 0)),
+                packet_size=int(settings.get('packet_size', 512)),
+                nodes=[str(node) for node in settings.get('nodes', [])],
+                node_table=node_table if settings.get('discovery', True) else None,
+            )
+        except (TypeError, ValueError) as e:
+            raise DMXBackendError(f"Invalid Art-Net settings: {e}") from e
+
+    def connect(self):
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Needed for the 255.255.255.255 default; harmless for unicast
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            # Fix the source port now, so Art-Net input can recognise (and
+            # ignore) our own broadcasts arriving back at this host
+            self._socket.bind(('', 0))
+            self.source_port = self._socket.getsockname()[1]
+            # A full send buffer fails the frame instead of stalling the
+            # output thread; DMXController backs off if it keeps happening
+            self._socket.setblocking(False)
+        except OSError as e:
+            raise DMXBackendError(f"Could not open Art-Net socket: {e}") from e
+
+    def get_destinations(self):
+        """Where the next frame goes, and why: (destinations, source)"""
+        if self._static_destinations:
+            return self._static_destinations, 'static'
+        if self.node_table is not None:
+            discovered = self.node_table.destinations(self.universe)
+            if discovered:
+                return discovered, 'discovered'
+        return self._fallback_destinations, 'fallback'
+
+    def send(self, frame):
+        if self._socket is None:
+            raise DMXBackendError('Art-Net socket is not open')
+
+        # Sequence runs 1-255; 0 would tell receivers not to reorder
+        self._sequence = self._sequence % 255 + 1
+        self._packet[SEQUENCE_OFFSET] = self._sequence
+        self._data[:] = frame[:self.packet_size]
+
+        # Every node gets the frame even if an earlier one failed
+        destinations = self.get_destinations()[0]
+        failed = {}
+        for destination in destinations:
+            try:
+                self._socket.sendto(self._packet, destination)
+            except OSError as e:
+                failed[f"{destination[0]}:{destination[1]}"] = str(e)
+        self.failed_destinations = failed
+        if failed and len(failed) == len(destinations):
+            raise DMXBackendError('; '.join(f"{node}: {error}" for node, error in failed.items()))
+
+    def disconnect(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def get_connection_status(self):
+        destinations, source = self.get_destinations()
+        return {
+            'backend': self.name,
+            'universe': self.universe,
+            'destinations': [f"{ip}:{port}" for ip, port in destinations],
+            'destination_source': source,
+            'failed_destinations': dict(self.failed_destinations),
+        }
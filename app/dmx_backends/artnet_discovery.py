@@ -0,0 +1,292 @@
+"""
+Art-Net Discovery - ArtPoll/ArtPollReply node table, and the Art-Net input socket
+"""
+import socket
+import threading
+import time
+
+from flask import current_app
+
+from app.dmx_backends.artnet import ARTNET_PORT, PROTOCOL_VERSION, port_address
+
+
+ARTNET_ID = b'Art-Net\x00'
+OP_POLL = 0x2000
+OP_POLL_REPLY = 0x2100
+
+# ArtPollReply fields used here (Art-Net 4, Table 8)
+REPLY_MIN_LENGTH = 207
+PORT_TYPE_OUTPUT = 0x80  # PortTypes bit: this port can output DMX512
+
+
+def build_artpoll():
+    """An ArtPoll asking every node to reply (to us, on port 6454)"""
+    return (
+        ARTNET_ID
+        + OP_POLL.to_bytes(2, 'little')
+        + PROTOCOL_VERSION.to_bytes(2, 'big')
+        + bytes([0x00, 0x00])  # Flags, DiagPriority: no diagnostics
+    )
+
+
+def parse_artpoll_reply(packet):
+    """
+    Decode the parts of an ArtPollReply the node table needs.
+
+    Returns {'ip', 'bind_index', 'name', 'universes'} or None if the packet
+    is too short to be a reply. `universes` lists the Port-Address of every
+    port that outputs DMX.
+    """
+    if len(packet) < REPLY_MIN_LENGTH:
+        return None
+
+    net, subnet = packet[18], packet[19]
+    port_count = min(int.from_bytes(packet[172:174], 'big'), 4)
+    port_types = packet[174:178]
+    sw_out = packet[190:194]
+    universes = [
+        port_address(net, subnet, sw_out[i])
+        for i in range(port_count)
+        if port_types[i] & PORT_TYPE_OUTPUT
+    ]
+    bind_index = packet[211] if len(packet) > 211 else 0
+    return {
+        'ip': socket.inet_ntoa(bytes(packet[10:14])),
+        'bind_index': bind_index,
+        'name': bytes(packet[26:44]).split(b'\x00', 1)[0].decode('ascii', 'replace'),
+        'universes': universes,
+    }
+
+
+class NodeTable:
+    """
+    Art-Net nodes seen recently, and which universes each one outputs.
+
+    Entries are keyed by (ip, bind index), since a node with more than four
+    ports answers with one reply per group of four. Each expires EXPIRY
+    seconds after its last reply. The send path only ever reads
+    destinations(), which is a dict replaced wholesale whenever the table
+    changes, so it never takes the lock.
+    """
+
+    # A node that has missed three polls in a row is gone
+    EXPIRY = 10.0
+
+    def __init__(self, port=ARTNET_PORT):
+        self.port = port
+        self._lock = threading.Lock()
+        self._entries = {}  # (ip, bind index) -> {'name', 'universes', 'last_seen'}
+        self._by_universe = {}  # Port-Address -> tuple of (ip, port)
+
+    def update(self, reply, now):
+        """Record one ArtPollReply (see parse_artpoll_reply)"""
+        key = (reply['ip'], reply['bind_index'])
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = {
+                'name': reply['name'],
+                'universes': tuple(reply['universes']),
+                'last_seen': now,
+            }
+            if previous is None or previous['universes'] != tuple(reply['universes']):
+                self._rebuild()
+                return True
+        return False
+
+    def expire(self, now):
+        """Drop nodes not heard from within EXPIRY. Returns the dropped IPs."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if now - entry['last_seen'] > self.EXPIRY]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._rebuild()
+        return [ip for ip, _ in stale]
+
+    def clear(self):
+        """Forget every node"""
+        with self._lock:
+            self._entries = {}
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute the per-universe destinations. Caller must hold _lock."""
+        by_universe = {}
+        for (ip, _), entry in sorted(self._entries.items()):
+            for universe in entry['universes']:
+                destinations = by_universe.setdefault(universe, [])
+                if (ip, self.port) not in destinations:
+                    destinations.append((ip, self.port))
+        self._by_universe = {universe: tuple(d) for universe, d in by_universe.items()}
+
+    def destinations(self, universe):
+        """Every known node outputting a universe, as (ip, port) tuples (maybe empty)"""
+        return self._by_universe.get(universe, ())
+
+    def get_nodes(self, now=None):
+        """Every known node, for display"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entries = sorted(self._entries.items())
+        nodes = {}
+        for (ip, _), entry in entries:
+            node = nodes.setdefault(ip, {'ip': ip, 'name': entry['name'], 'universes': [],
+                                         'last_seen_s': round(now - entry['last_seen'], 1)})
+            node['universes'].extend(entry['universes'])
+            node['last_seen_s'] = min(node['last_seen_s'], round(now - entry['last_seen'], 1))
+        return list(nodes.values())
+
+
+class ArtNetListener:
+    """
+    Owns the controller's Art-Net port (6454): polls for nodes while a poll
+    target is set, keeps the NodeTable current from their replies, and
+    hands any other Art-Net packet to the handler registered for its opcode.
+
+    ArtPollReply always comes back to port 6454, so this socket has to be
+    bound there; it is the one place this process receives Art-Net.
+    """
+
+    # Art-Net asks controllers to poll every 2.5-3 seconds
+    POLL_INTERVAL = 3.0
+    # Longest the thread blocks in recvfrom() before checking poll/expiry
+    RECEIVE_TIMEOUT = 0.5
+
+    def __init__(self, node_table, port=ARTNET_PORT, bind_address=''):
+        """
+        Args:
+            node_table: NodeTable to keep current
+            port: UDP port to listen on and poll to
+            bind_address: local address to listen on ('' for every interface)
+        """
+        self.node_table = node_table
+        self.port = port
+        self.bind_address = bind_address
+        self.poll_address = None  # None: don't poll
+        self._next_poll = 0.0
+        self._handlers = {OP_POLL_REPLY: self._handle_poll_reply}
+        self._socket = None
+        self._thread = None
+        self._running = False
+
+    def add_handler(self, opcode, handler):
+        """
+        Route packets with an Art-Net opcode to handler(packet, sender, now),
+        called on the listener thread. `sender` is the (ip, port) the packet
+        came from; the packet is a memoryview valid only for the duration of
+        the call.
+        """
+        self._handlers[opcode] = handler
+
+    def set_poll_target(self, address):
+        """
+        Start polling an address (the broadcast address, usually), or stop
+        polling with None. Known nodes are forgotten when polling stops, so
+        output falls back to the configured address straight away.
+        """
+        if address == self.poll_address:
+            return
+        self.poll_address = address
+        self._next_poll = 0.0
+        if address is None:
+            self.node_table.clear()
+
+    def start(self):
+        """Bind the Art-Net port and start the listener thread"""
+        if self._thread is not None:
+            return
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # Share the port with other Art-Net software on this machine
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self._socket.bind((self.bind_address, self.port))
+            self._socket.settimeout(self.RECEIVE_TIMEOUT)
+        except OSError as e:
+            self._socket = None
+            if current_app:
+                current_app.logger.error(
+                    f"Art-Net listener could not bind port {self.port}: {e}. "
+                    f"Node discovery and Art-Net input are unavailable."
+                )
+            return
+
+        # Log from the thread through the app that started it
+        app = current_app._get_current_object() if current_app else None
+
+        self._running = True
+        self._next_poll = 0.0
+        self._thread = threading.Thread(target=self._run, args=(app,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the listener thread and release the port"""
+        if self._thread is None:
+            return
+        self._running = False
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        self._socket.close()
+        self._socket = None
+
+    def is_running(self):
+        return self._thread is not None
+
+    def _run(self, app):
+        """Run the receive loop, inside the starting app's context if there was one"""
+        if app is None:
+            self._receive_loop()
+            return
+        with app.app_context():
+            self._receive_loop()
+
+    def _receive_loop(self):
+        """Poll on schedule, expire stale nodes, and dispatch what arrives"""
+        poll = build_artpoll()
+        buffer = bytearray(2048)
+        view = memoryview(buffer)
+        while self._running:
+            now = time.monotonic()
+            address = self.poll_address
+            if address is not None and now >= self._next_poll:
+                self._next_poll = now + self.POLL_INTERVAL
+                try:
+                    self._socket.sendto(poll, (address, self.port))
+                except OSError:
+                    pass  # The output path reports network trouble already
+            for ip in self.node_table.expire(now):
+                if current_app:
+                    current_app.logger.info(f"Art-Net node {ip} stopped answering polls")
+
+            try:
+                length, sender = self._socket.recvfrom_into(buffer)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._running:
+                    time.sleep(self.RECEIVE_TIMEOUT)
+                continue
+
+            if length < 12 or buffer[:8] != ARTNET_ID:
+                continue
+            handler = self._handlers.get(int.from_bytes(buffer[8:10], 'little'))
+            if handler is None:
+                continue
+            try:
+                handler(view[:length], sender, time.monotonic())
+            except Exception as e:
+                if current_app:
+                    current_app.logger.error(
+                        f"Error handling Art-Net packet from {sender[0]}: {e}"
+                    )
+
+    def _handle_poll_reply(self, packet, sender, now):
+        reply = parse_artpoll_reply(packet)
+        if reply is None:
+            return
+        if self.node_table.update(reply, now) and current_app:
+            current_app.logger.info(
+                f"Art-Net node {reply['ip']} ('{reply['name']}') outputs "
+                f"universes {reply['universes']}"
+            )
@@ -0,0 +1,62 @@
+"""
+DMX Backend - The interface DMXController sends frames through
+"""
+from abc import ABC, abstractmethod
+
+
+class DMXBackendError(Exception):
+    """
+    Any failure to connect or transmit, whatever the transport. Backends
+    translate their own exceptions (socket.error, ...) into this, so
+    DMXController only ever has one exception type to catch.
+    """
+
+
+class DMXBackend(ABC):
+    """
+    One output transport. DMXController owns the timing: it calls send()
+    once per output tick with the composed frame, from its output thread or
+    a request thread, never from both at once.
+    """
+
+    name = None  # Key in the config's `output` section, e.g. 'artnet'
+
+    @classmethod
+    @abstractmethod
+    def from_settings(cls, settings, **services):
+        """
+        Construct the backend from its sub-object of the `output` config.
+
+        Args:
+            settings: this backend's sub-object of the `output` config
+            services: shared objects from the integration layer (such as
+                node_table), and the whole `output` section as `output`; a
+                backend ignores the ones it doesn't use
+
+        Raises:
+            DMXBackendError: if a setting is missing or malformed
+        """
+
+    @abstractmethod
+    def connect(self):
+        """Open the transport. Raises DMXBackendError on failure."""
+
+    @abstractmethod
+    def send(self, frame):
+        """
+        Transmit one frame.
+
+        Args:
+            frame: bytes of 512 DMX channel values
+
+        Raises:
+            DMXBackendError: if the frame could not be sent
+        """
+
+    @abstractmethod
+    def disconnect(self):
+        """Close the transport. Safe to call more than once."""
+
+    def get_connection_status(self):
+        """Backend-specific details for /api/connection/status"""
+        return {'backend': self.name}
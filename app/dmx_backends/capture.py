@@ -0,0 +1,219 @@
+"""
+Capture Backend - Records every transmitted frame to a binary file
+"""
+import os
+import struct
+import time
+
+import numpy as np
+
+from app.dmx_backends.base import DMXBackend, DMXBackendError
+
+
+# Relative capture paths are resolved against the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CAPTURE_PATH = 'captures/capture-%Y%m%d-%H%M%S.dmxrec'
+
+# File layout: one 32-byte header, then fixed-size records back to back, so
+# record n starts at HEADER_SIZE + n * RECORD_SIZE and the whole file maps
+# onto a numpy structured array (see open_capture()).
+#
+# Header: magic, format version, record size, slots per record, and the
+# wall-clock and monotonic times the file was started, so a monotonic
+# timestamp can be placed on the calendar.
+MAGIC = b'DMXREC\x00\x00'
+FORMAT_VERSION = 1
+SLOTS = 512
+HEADER = struct.Struct('<8sHHI d d')
+HEADER_SIZE = HEADER.size
+RECORD_TIME = struct.Struct('<d')
+# Record: time.monotonic() when the frame was sent, then the 512 slots
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('slots', 'u1', SLOTS)])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+def resolve_capture_path(path, now=None):
+    """Expand strftime fields in a capture path and anchor it at the project root"""
+    path = time.strftime(path, time.localtime(now))
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT, path)
+
+
+def read_capture_header(f):
+    """
+    Read and check a capture file's header.
+
+    Returns {'version', 'started_wall', 'started_monotonic'}.
+
+    Raises:
+        ValueError: if the file is not a capture this code can read
+    """
+    raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError('File is too short to be a DMX capture')
+    magic, version, record_size, slots, started_wall, started_monotonic = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError('Not a DMX capture file')
+    if version != FORMAT_VERSION or record_size != RECORD_SIZE or slots != SLOTS:
+        raise ValueError(
+            f"Unsupported capture format (version {version}, "
+            f"{record_size}-byte records of {slots} slots)"
+        )
+    return {
+        'version': version,
+        'started_wall': started_wall,
+        'started_monotonic': started_monotonic,
+    }
+
+
+def open_capture(path):
+    """
+    Map a capture file read-only.
+
+    Returns (header, records): records is a numpy structured array with
+    `time` and `slots` fields, backed by the file rather than loaded. A
+    trailing partial record (the process stopped mid-write) is left out.
+    """
+    with open(path, 'rb') as f:
+        header = read_capture_header(f)
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+    if count == 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+    return header, records
+
+
+class CaptureBackend(DMXBackend):
+    """
+    Appends every frame to a capture file, and optionally sends it on
+    through another backend too.
+
+    Each send writes one prebuilt RECORD_SIZE buffer into a buffered file,
+    so recording costs a 512-byte copy and, mostly, no syscall; the buffer
+    is flushed every FLUSH_INTERVAL seconds and on disconnect.
+
+    A forwarding failure is reported in the status (`forward_error`) but not
+    raised, so DMXController never backs off and the capture keeps every
+    frame the engine produced, even while the network is down.
+    """
+
+    name = 'capture'
+
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self, path=DEFAULT_CAPTURE_PATH, forward=None):
+        """
+        Args:
+            path: capture file; strftime fields are expanded on connect, and
+                a relative path is taken from the project root
+            forward: DMXBackend to also send every frame through, or None
+                to capture only
+        """
+        self.path = path
+        self.forward = forward
+        self.file_path = None  # Resolved path, once connected
+        self.frames = 0  # Recorded since connect
+        self.forward_error = None  # Last forwarding failure, until a send succeeds
+
+        self._record = bytearray(RECORD_SIZE)
+        self._slots = memoryview(self._record)[RECORD_TIME.size:]
+        self._file = None
+        self._next_flush = 0.0
+
+    @classmethod
+    def from_settings(cls, settings, output=None, **services):
+        forward_name = settings.get('forward') or None
+        if forward_name == cls.name:
+            raise DMXBackendError('Capture cannot forward to itself')
+
+        forward = None
+        if forward_name is not None:
+            # Imported here: the factory imports this module
+            from app.dmx_backends.factory import create_backend
+            forward = create_backend({**(output or {}), 'backend': forward_name}, **services)
+
+        path = settings.get('path') or DEFAULT_CAPTURE_PATH
+        if not isinstance(path, str):
+            raise DMXBackendError('Invalid capture settings: path must be text')
+        return cls(path=path, forward=forward)
+
+    @property
+    def source_port(self):
+        """The forwarded backend's source port, for Art-Net input's loopback check"""
+        return getattr(self.forward, 'source_port', None)
+
+    def connect(self):
+        self.file_path = resolve_capture_path(self.path)
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            self._file = open(self.file_path, 'a+b')
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() == 0:
+                self._file.write(HEADER.pack(
+                    MAGIC, FORMAT_VERSION, RECORD_SIZE, SLOTS, time.time(), time.monotonic()
+                ))
+            else:
+                # Appending to an earlier capture: it must be the same format,
+                # and a partial last record is cut off so records stay aligned
+                self._file.seek(0)
+                read_capture_header(self._file)
+                size = self._file.seek(0, os.SEEK_END)
+                self._file.truncate(size - (size - HEADER_SIZE) % RECORD_SIZE)
+                self._file.seek(0, os.SEEK_END)
+        except (OSError, ValueError) as e:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            raise DMXBackendError(f"Could not open capture file {self.file_path}: {e}") from e
+
+        self.frames = 0
+        if self.forward is not None:
+            try:
+                self.forward.connect()
+            except DMXBackendError as e:
+                self.forward_error = str(e)
+
+    def send(self, frame):
+        if self._file is None:
+            raise DMXBackendError('Capture file is not open')
+
+        now = time.monotonic()
+        RECORD_TIME.pack_into(self._record, 0, now)
+        self._slots[:len(frame)] = frame
+        try:
+            self._file.write(self._record)
+            if now >= self._next_flush:
+                self._next_flush = now + self.FLUSH_INTERVAL
+                self._file.flush()
+        except OSError as e:
+            raise DMXBackendError(f"Capture write failed: {e}") from e
+        self.frames += 1
+
+        if self.forward is not None:
+            try:
+                self.forward.send(frame)
+                self.forward_error = None
+            except DMXBackendError as e:
+                self.forward_error = str(e)
+
+    def disconnect(self):
+        if self.forward is not None:
+            self.forward.disconnect()
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def get_connection_status(self):
+        status = {
+            'backend': self.name,
+            'capture_path': self.file_path,
+            'captured_frames': self.frames,
+        }
+        if self.forward is not None:
+            forwarded = self.forward.get_connection_status()
+            status['forward'] = forwarded.pop('backend')
+            status['forward_error'] = self.forward_error
+            status.update(forwarded)
+        return status
@@ -0,0 +1,36 @@
+"""
+Backend Factory - Builds the configured output backend
+"""
+from app.dmx_backends.artnet import ArtNetBackend
+from app.dmx_backends.base import DMXBackendError
+from app.dmx_backends.capture import CaptureBackend
+from app.dmx_backends.null import NullBackend
+from app.dmx_backends.sacn import SACNBackend
+
+
+# Implemented backends, by their key in the config's `output` section
+BACKENDS = {
+    backend.name: backend
+    for backend in (ArtNetBackend, SACNBackend, CaptureBackend, NullBackend)
+}
+
+
+def create_backend(output, **services):
+    """
+    Construct (but don't connect) the backend the `output` config selects.
+
+    Args:
+        output: the config's `output` section, {'backend': name, name: {...}}
+        services: passed on to the backend's from_settings(), along with
+            the whole `output` section as `output`
+
+    Raises:
+        DMXBackendError: if the backend is unknown or its settings are invalid
+    """
+    name = output.get('backend', 'artnet')
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise DMXBackendError(
+            f"Unknown output backend '{name}' (available: {', '.join(BACKENDS)})"
+        )
+    return backend_class.from_settings(output.get(name) or {}, output=output, **services)
@@ -0,0 +1,32 @@
+"""
+Null Backend - Discards every frame
+"""
+from app.dmx_backends.base import DMXBackend
+
+
+class NullBackend(DMXBackend):
+    """
+    Accepts frames and sends them nowhere. For load tests and benchmarks of
+    everything upstream of the wire, on a machine with no lighting network.
+    """
+
+    name = 'null'
+
+    def __init__(self):
+        self.frames = 0
+
+    @classmethod
+    def from_settings(cls, settings, **services):
+        return cls()
+
+    def connect(self):
+        pass
+
+    def send(self, frame):
+        self.frames += 1
+
+    def disconnect(self):
+        pass
+
+    def get_connection_status(self):
+        return {'backend': self.name, 'discarded_frames': self.frames}
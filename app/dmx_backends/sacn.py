@@ -0,0 +1,205 @@
+"""
+sACN Backend - E1.31 (Streaming ACN) output over UDP multicast
+"""
+import socket
+import uuid
+
+from app.dmx_backends.base import DMXBackend, DMXBackendError
+
+
+SACN_PORT = 5568
+
+VECTOR_ROOT_E131_DATA = 0x00000004
+VECTOR_E131_DATA_PACKET = 0x00000002
+VECTOR_DMP_SET_PROPERTY = 0x02
+
+# Offsets into a data packet (E1.31 section 4, Table 4-1)
+SEQUENCE_OFFSET = 111
+OPTIONS_OFFSET = 112
+DMP_DATA_OFFSET = 126  # First slot after the 0x00 start code
+
+OPTION_PREVIEW = 0x80  # For visualisers and preview desks, not live output
+OPTION_TERMINATED = 0x40  # Source is going away; receivers release it now
+
+# Stable per host, so receivers see the same source across restarts
+DEFAULT_CID = uuid.uuid5(uuid.NAMESPACE_DNS, f"dmx-life.{socket.gethostname()}")
+
+
+def multicast_group(universe):
+    """The standard multicast address for a universe, 239.255.<hi>.<lo>"""
+    return f"239.255.{universe >> 8}.{universe & 0xFF}"
+
+
+def _flags_and_length(length):
+    """PDU flags (0x7) in the top nibble, PDU length in the low 12 bits"""
+    return (0x7000 | length).to_bytes(2, 'big')
+
+
+def build_data_packet(cid, source_name, universe, priority, preview, slots):
+    """
+    A complete E1.31 data packet with every field but the sequence number
+    and the slot values filled in.
+
+    Args:
+        cid: uuid.UUID identifying this source
+        source_name: up to 63 bytes of UTF-8
+        universe: 1-63999
+        priority: 0-200 (100 is the default; the highest source on a
+            universe wins at the receiver)
+        preview: mark the data as preview-only
+        slots: number of DMX slots, 1-512
+    """
+    dmp_length = 10 + 1 + slots  # DMP header, start code, slots
+    framing_length = 77 + dmp_length
+    root_length = 22 + framing_length
+
+    root = (
+        (0x0010).to_bytes(2, 'big')  # Preamble size
+        + (0x0000).to_bytes(2, 'big')  # Postamble size
+        + b'ASC-E1.17\x00\x00\x00'
+        + _flags_and_length(root_length)
+        + VECTOR_ROOT_E131_DATA.to_bytes(4, 'big')
+        + cid.bytes
+    )
+    framing = (
+        _flags_and_length(framing_length)
+        + VECTOR_E131_DATA_PACKET.to_bytes(4, 'big')
+        + source_name.encode('utf-8')[:63].ljust(64, b'\x00')
+        + bytes([priority])
+        + (0).to_bytes(2, 'big')  # Synchronization address: none
+        + bytes([0])  # Sequence number, per frame
+        + bytes([OPTION_PREVIEW if preview else 0])
+        + universe.to_bytes(2, 'big')
+    )
+    dmp = (
+        _flags_and_length(dmp_length)
+        + bytes([VECTOR_DMP_SET_PROPERTY, 0xA1])  # Vector, address & data type
+        + (0x0000).to_bytes(2, 'big')  # First property address
+        + (0x0001).to_bytes(2, 'big')  # Address increment
+        + (1 + slots).to_bytes(2, 'big')  # Property value count
+        + bytes([0x00])  # DMX start code
+    )
+    packet = root + framing + dmp
+    assert len(packet) == DMP_DATA_OFFSET
+    return packet + bytes(slots)
+
+
+class SACNBackend(DMXBackend):
+    """
+    Sends each frame as one E1.31 data packet to the universe's standard
+    multicast group, so only receivers that joined it get the traffic.
+
+    Like ArtNetBackend, the whole packet is built once and each frame only
+    rewrites the sequence byte and the slot data.
+    """
+
+    name = 'sacn'
+
+    # Stream-terminated packets sent on disconnect (E1.31 6.2.6 asks for 3)
+    TERMINATE_COUNT = 3
+
+    def __init__(self, universe=1, priority=100, preview=False,
+                 source_name='DMX Life', interface=None, slots=512, cid=DEFAULT_CID):
+        """
+        Args:
+            universe: sACN universe, 1-63999
+            priority: 0-200
+            preview: mark output as preview data (receivers driving real
+                fixtures ignore it)
+            source_name: shown by receivers that list sources
+            interface: local IPv4 address to send multicast from, or None to
+                let the routing table choose
+            slots: DMX slots per packet, 1-512
+            cid: uuid.UUID identifying this source
+        """
+        self.universe = universe
+        self.priority = priority
+        self.preview = preview
+        self.source_name = source_name
+        self.interface = interface
+        self.slots = slots
+
+        self._packet = bytearray(
+            build_data_packet(cid, source_name, universe, priority, preview, slots)
+        )
+        self._data = memoryview(self._packet)[DMP_DATA_OFFSET:]
+        self._sequence = 0
+        self.destination = (multicast_group(universe), SACN_PORT)
+        self._socket = None
+
+    @classmethod
+    def from_settings(cls, settings, **services):
+        try:
+            universe = int(settings.get('universe', 1))
+            priority = int(settings.get('priority', 100))
+        except (TypeError, ValueError) as e:
+            raise DMXBackendError(f"Invalid sACN settings: {e}") from e
+        if not 1 <= universe <= 63999:
+            raise DMXBackendError(f"Invalid sACN settings: universe {universe} is not 1-63999")
+        if not 0 <= priority <= 200:
+            raise DMXBackendError(f"Invalid sACN settings: priority {priority} is not 0-200")
+        return cls(
+            universe=universe,
+            priority=priority,
+            preview=bool(settings.get('preview', False)),
+            source_name=str(settings.get('source_name') or 'DMX Life'),
+            interface=settings.get('interface') or None,
+        )
+
+    def connect(self):
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # One hop: the venue LAN, never routed beyond it
+            self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            # Keep loopback on, so a listener on this machine sees the output
+            self._socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+            if self.interface:
+                self._socket.setsockopt(
+                    socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(self.interface)
+                )
+            # Never stall the output thread (see ArtNetBackend.connect)
+            self._socket.setblocking(False)
+        except OSError as e:
+            self._socket = None
+            raise DMXBackendError(f"Could not open sACN socket: {e}") from e
+
+    def _next_sequence(self):
+        self._sequence = (self._sequence + 1) % 256
+        self._packet[SEQUENCE_OFFSET] = self._sequence
+
+    def send(self, frame):
+        if self._socket is None:
+            raise DMXBackendError('sACN socket is not open')
+
+        self._next_sequence()
+        self._data[:] = frame[:self.slots]
+        try:
+            self._socket.sendto(self._packet, self.destination)
+        except OSError as e:
+            raise DMXBackendError(f"{self.destination[0]}: {e}") from e
+
+    def disconnect(self):
+        if self._socket is None:
+            return
+
+        # Tell receivers this source is gone, so they fall back to another
+        # source (or their loss behaviour) now instead of after a timeout
+        self._packet[OPTIONS_OFFSET] |= OPTION_TERMINATED
+        for _ in range(self.TERMINATE_COUNT):
+            self._next_sequence()
+            try:
+                self._socket.sendto(self._packet, self.destination)
+            except OSError:
+                break
+        self._packet[OPTIONS_OFFSET] &= ~OPTION_TERMINATED & 0xFF
+
+        self._socket.close()
+        self._socket = None
+
+    def get_connection_status(self):
+        return {
+            'backend': self.name,
+            'universe': self.universe,
+            'priority': self.priority,
+            'destinations': [f"{self.destination[0]}:{self.destination[1]}"],
+        }
@@ -1,15 +1,64 @@
 """
 DMX Life Integration Layer - Provides backward-compatible API
 """
+import itertools
+import time
+
 from flask import current_app
 from app.config_manager import ConfigManager
+from app.config_watcher import ConfigWatcher, find_config_problem
 from app.scene_manager import SceneManager
 from app.dmx_controller_class import DMXController
+from app.dmx_backends import ArtNetListener, NodeTable, create_backend
+from app.effects import EffectsEngine
+from app.cue_sequencer import CueSequencer
+from app.scheduler import Scheduler
+from app.preview import PreviewOverlay
+from app.artnet_input import ArtNetInput
+from app.fixture_library import FixtureLibrary
+from app.live_state import LiveState
+from app.models.fixture import FixtureType
+from app import metrics
+from app.dmx_backends.artnet import OP_DMX
 
 # Global instances
 config_manager = None
 scene_manager = None
 dmx_controller = None
+effects_engine = None
+cue_sequencer = None
+scheduler = None
+preview_overlay = None
+artnet_input = None
+config_watcher = None
+live_state = None
+
+# The output and input sections the running backend and merge were built
+# from, so a reload only rebuilds them when they changed
+_applied_sections = {}
+
+# Counts swaps of the compiled state (the scene catalogue, effects and cue
+# lists). Responses built from that state are cached under this count rather
+# than the file's generation, which goes up as soon as config.json changes,
+# before the edit has been loaded.
+_compiled_generations = itertools.count(1)
+_compiled_generation = next(_compiled_generations)
+
+# Art-Net nodes found by polling, shared with every ArtNetBackend built, and
+# the listener that keeps it current. They outlive backend swaps, so a
+# settings change doesn't forget the nodes already found.
+node_table = NodeTable()
+artnet_listener = ArtNetListener(node_table)
+
+# Output state sampled when /metrics is scraped
+metrics.REGISTRY.gauge(
+    'dmxlife_output_connected', 'Whether the last send to the output succeeded (1) or not (0)',
+    lambda: int(dmx_controller.connection_status['connected']) if dmx_controller else None,
+)
+metrics.REGISTRY.gauge(
+    'dmxlife_output_backoff_seconds', 'Interval between send attempts while backing off (0: full rate)',
+    lambda: dmx_controller.connection_status['backoff_interval'] if dmx_controller else None,
+)
 
 # Connection status tracking (for monitoring)
 connection_status = {
@@ -23,15 +72,24 @@ current_dmx_values = bytearray(512)  # Default empty buffer
 
 
 def get_current_dmx_values():
-    """Get current DMX values as a point-in-time snapshot"""
+    """Get the DMX values last transmitted, effects included"""
     if not dmx_controller:
         return current_dmx_values
-    return dmx_controller.get_current_values()
+    return dmx_controller.get_output_values()
 
 
 def init_dmx_controller(app):
     """Initialize the DMX controller system with application context"""
-    global config_manager, scene_manager, dmx_controller
+    global config_manager, scene_manager, dmx_controller, effects_engine, cue_sequencer, scheduler
+    global preview_overlay, artnet_input, config_watcher, live_state
+
+    # Fixture profiles, compiled (or read from the compiled cache) before
+    # anything looks a type up; in an app context so that profiles left
+    # out are logged
+    with app.app_context():
+        FixtureType.use_library(FixtureLibrary.load(
+            app.config['FIXTURE_LIBRARY'], app.config['FIXTURE_CACHE_DIR']
+        ))
 
     # Initialize managers
     config_manager = ConfigManager(app.config['CONFIG_FILE'])
@@ -39,31 +97,94 @@ def init_dmx_controller(app):
 
     # Load scenes
     scene_manager.load_scenes()
-
-    # Get network settings
-    network_settings = config_manager.get_network_settings()
-
-    # Initialize DMX controller
-    dmx_controller = DMXController(
-        network_settings['artnet_ip'],
-        network_settings['universe'],
-        network_settings['packet_size'],
-        network_settings['refresh_rate']
+    _applied_sections.update(
+        output=config_manager.get_output_settings(), input=config_manager.get_input_settings()
     )
 
+    # Initialize DMX controller with the configured output backend. An
+    # unknown backend or malformed settings raise DMXBackendError here,
+    # naming the problem, rather than starting on some other transport.
+    dmx_controller = DMXController(_create_output_backend())
+
+    # Cue lists play over the scene stack, and effects over both, every
+    # output tick
+    cue_sequencer = CueSequencer()
+    cue_sequencer.load_cue_lists(config_manager.get_cue_lists(), scene_manager)
+    dmx_controller.add_frame_layer(cue_sequencer)
+
+    effects_engine = EffectsEngine()
+    effects_engine.load_effects(config_manager.get_effects(), config_manager.get_fixtures())
+    dmx_controller.add_frame_layer(effects_engine)
+
+    # A hardware console's Art-Net output merges over the show (but under
+    # the editor's preview). Our own Art-Net output is recognised by the
+    # port it is sent from, so broadcasts looping back aren't merged.
+    artnet_input = ArtNetInput(lambda: getattr(dmx_controller.backend, 'source_port', None))
+    artnet_input.configure(config_manager.get_input_settings())
+    artnet_listener.add_handler(OP_DMX, artnet_input.handle_artdmx)
+    dmx_controller.add_frame_layer(artnet_input)
+
+    # The scene editor's preview goes on top of everything while it's open.
+    # Links are looked up through the scene manager on every apply, so a
+    # fixture reload is picked up without re-creating the overlay.
+    preview_overlay = PreviewOverlay(lambda values: scene_manager.expand_links(values))
+    dmx_controller.add_frame_layer(preview_overlay)
+
+    # Triggers fire on the scheduler's own thread; give them an app context
+    # so they log exactly like the request path they share.
+    def apply_scheduled_trigger(trigger):
+        with app.app_context():
+            _apply_trigger(trigger)
+
+    scheduler = Scheduler(apply_scheduled_trigger)
+    scheduler.load_schedule(config_manager.get_schedule())
+
+    # An edited config.json copied over the running one is loaded without a
+    # restart; parsing and compiling happen on the watcher's thread
+    def reload_in_app_context():
+        with app.app_context():
+            reload_edited_config()
+
+    config_watcher = ConfigWatcher(config_manager, reload_in_app_context)
+
+    # The scenes that were up when the app last stopped come back, with the
+    # frame they showed, so a restart doesn't black out the rig
+    if app.config['LIVE_STATE']:
+        live_state = LiveState(f"{app.config['CONFIG_FILE']}.state", _live_state_snapshot)
+        with app.app_context():
+            _restore_live_state(live_state.load())
 
     # Register application lifecycle hooks
     @app.before_request
     def before_request():
-        if not hasattr(app, '_dmx_initialized'):
-            dmx_controller.start()
-            app._dmx_initialized = True
+        start_engine(app)
     
     @app.teardown_appcontext
     def teardown_dmx(exception=None):
         pass  # Keep DMX running
 
 
+def start_engine(app):
+    """
+    Start the output, scheduler, Art-Net listener, config watcher and live
+    state threads, once. Runs on the first request, or earlier from the
+    process that serves the app (see app.py), so that a restored live state
+    is on the rig straight away. Never called from create_app(): an app
+    built by a CLI command or the reloader's monitor must not transmit.
+    """
+    if hasattr(app, '_dmx_initialized'):
+        return
+    app._dmx_initialized = True
+    dmx_controller.start()
+    scheduler.start()
+    if app.config['ARTNET_LISTEN']:
+        artnet_listener.start()
+    if app.config['CONFIG_WATCH']:
+        config_watcher.start()
+    if live_state:
+        live_state.start()
+
+
 # Scene management functions (backward compatible API)
 
 def activate_scene(scene_name):
@@ -86,12 +207,68 @@ def activate_scene(scene_name):
 
     # Activate with smooth transition
     dmx_controller.set_with_transition(buffer)
+    _live_state_changed()
+    return True, active_scenes
+
+
+def set_scene_active(scene_name, active):
+    """Turn a scene on or off explicitly (not a toggle), with the same smooth
+    transition as activate_scene(). Returns (success, active_scene_names)."""
+    if not scene_manager or not dmx_controller:
+        if current_app:
+            current_app.logger.error("DMX system not initialized")
+        return False, []
+
+    buffer, success, active_scenes = scene_manager.set_scene_active(scene_name, active)
+
+    if not success:
+        return False, active_scenes
+
+    dmx_controller.set_with_transition(buffer)
+    _live_state_changed()
     return True, active_scenes
 
 
+def _live_state_snapshot():
+    """What LiveState saves: the active layers and the composition they show"""
+    return scene_manager.get_active_scenes(), dmx_controller.get_target_values()
+
+
+def _live_state_changed():
+    """Have LiveState save the layers and frame, once changes settle"""
+    if live_state:
+        live_state.mark_changed()
+
+
+def _restore_live_state(state):
+    """
+    Bring back a saved (layers, frame): the frame is what the output thread
+    sends first once start_engine() runs. Layers whose scene has gone are
+    dropped; if what the rest compose to differs from the saved frame (the
+    config changed while stopped), the output fades to it.
+    """
+    if state is None:
+        return
+    layers, frame = state
+    if not layers and not any(frame):
+        return
+    buffer = scene_manager.restore_layers(layers)
+    dmx_controller.preload(bytearray(frame))
+    if buffer != frame:
+        dmx_controller.set_with_transition(buffer)
+    if current_app:
+        current_app.logger.info(f"Resumed the live state: {scene_manager.get_active_scenes()}")
+
+
 def test_scene(channels):
-    """Test a scene immediately without transition"""
-    if not dmx_controller:
+    """Preview a full channel list in the scene editor overlay.
+
+    Kept for callers that still send a whole frame; it replaces the current
+    preview in one update and shows on the next output tick. Unless an
+    editor has the preview's event stream open, the output returns to the
+    scenes PreviewOverlay.UNWATCHED_TIMEOUT seconds later.
+    """
+    if not preview_overlay:
         if current_app:
             current_app.logger.error("DMX controller not initialized")
         return False
@@ -101,26 +278,46 @@ def test_scene(channels):
             current_app.logger.error("test_scene expects a list of channel values")
         return False
 
-    # Convert channels list to buffer. Values are validated here as well as at
-    # the API boundary so that a bad call cannot raise from the assignment
-    # below; bool is excluded because it is a subclass of int.
-    buffer = bytearray(512)
-    for channel, value in enumerate(channels):
-        if channel >= 512:
-            break
+    # Values are validated here as well as at the API boundary so that a bad
+    # call cannot reach the output thread; bool is excluded because it is a
+    # subclass of int.
+    for channel, value in enumerate(channels[:512]):
         if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= 255:
             if current_app:
                 current_app.logger.error(
                     f"test_scene rejected invalid value at channel {channel + 1}: {value!r}"
                 )
             return False
-        buffer[channel] = value
 
-    # Set immediately
-    dmx_controller.set_immediate(buffer)
+    preview_overlay.update(dict(enumerate(channels[:512])), reset=True)
+    return True
+
+
+def update_preview(channels, reset=False):
+    """Queue sparse {0-based channel: value} preview changes for the next
+    output tick. Returns the update's sequence number, or None."""
+    if not preview_overlay:
+        if current_app:
+            current_app.logger.error("DMX controller not initialized")
+        return None
+    return preview_overlay.update(channels, reset)
+
+
+def release_preview():
+    """End the scene editor preview, returning the output to the scenes"""
+    if not preview_overlay:
+        return False
+    preview_overlay.release()
     return True
 
 
+def subscribe_preview():
+    """Event generator acknowledging preview updates (see PreviewOverlay.subscribe)"""
+    if not preview_overlay:
+        return None
+    return preview_overlay.subscribe()
+
+
 def get_active_scene():
     """Get the most recently activated scene (backward compatible)"""
     if not scene_manager:
@@ -139,7 +336,12 @@ def get_highest_active_idx():
     """Get the highest active DMX channel index"""
     if not scene_manager:
         return 0
-    return scene_manager.get_highest_active_idx()
+    highest = scene_manager.get_highest_active_idx()
+    if cue_sequencer:
+        highest = max(highest, cue_sequencer.get_highest_active_idx())
+    if effects_engine:
+        highest = max(highest, effects_engine.get_highest_active_idx())
+    return highest
 
 
 def get_available_scenes():
@@ -149,6 +351,51 @@ def get_available_scenes():
     return scene_manager.get_available_scenes()
 
 
+def get_scene_page(offset=0, limit=None, group=None, query=None):
+    """Get one page of scene names, optionally of one group or matching a query. Returns (names, total)."""
+    if not scene_manager:
+        return [], 0
+    return scene_manager.list_scenes(offset, limit, group, query)
+
+
+def get_scene_groups():
+    """Get {group: [scene names in config order]} from the scene index"""
+    if not scene_manager:
+        return {}
+    return scene_manager.scenes.groups()
+
+
+def get_scene(name):
+    """Get one scene as stored in the config, or None, without reading the config"""
+    if not scene_manager:
+        return None
+    return scene_manager.scenes.as_json(name)
+
+
+def get_scene_count():
+    """Get the number of scenes"""
+    if not scene_manager:
+        return 0
+    return len(scene_manager.scenes)
+
+
+def _compiled_state_changed():
+    """Note that the compiled state was swapped; call after the swap"""
+    global _compiled_generation
+    _compiled_generation = next(_compiled_generations)
+
+
+def get_compiled_version():
+    """
+    Identify the scenes and effects the engine is running on, without
+    reading the config: a string that changes after every load or save that
+    swaps them (and across restarts), or None before initialization.
+    """
+    if not config_manager:
+        return None
+    return f"{config_manager.instance}-{_compiled_generation}"
+
+
 def save_scene(name, channel_values, enabled_fixtures=None, group=None):
     """Save a new scene"""
     if not scene_manager:
@@ -158,14 +405,132 @@ def save_scene(name, channel_values, enabled_fixtures=None, group=None):
     if len(scene_manager.scenes) >= current_app.config['MAX_SCENES'] and name not in scene_manager.scenes:
         return False
 
-    return scene_manager.save_scene(name, channel_values, enabled_fixtures, group)
+    success = scene_manager.save_scene(name, channel_values, enabled_fixtures, group)
+    if success:
+        # Cue frames are precomputed from scenes, so recompose them now
+        cue_sequencer.load_cue_lists(config_manager.get_cue_lists(), scene_manager)
+        _compiled_state_changed()
+    return success
 
 
 def delete_scene(name):
     """Delete a scene"""
     if not scene_manager:
         return False
-    return scene_manager.delete_scene(name)
+    success = scene_manager.delete_scene(name)
+    if success:
+        cue_sequencer.load_cue_lists(config_manager.get_cue_lists(), scene_manager)
+        _compiled_state_changed()
+        _live_state_changed()
+    return success
+
+
+# Effect functions
+
+def toggle_effect(effect_name):
+    """Start or stop an effect. Returns (success, active_effect_names)."""
+    if not effects_engine:
+        if current_app:
+            current_app.logger.error("Effects engine not initialized")
+        return False, []
+    return effects_engine.toggle_effect(effect_name)
+
+
+def get_available_effects():
+    """Get list of available effect names"""
+    if not effects_engine:
+        return []
+    return effects_engine.get_available_effects()
+
+
+def get_active_effects():
+    """Get the list of running effect names"""
+    if not effects_engine:
+        return []
+    return effects_engine.get_active_effects()
+
+
+def get_effects_frame_budget():
+    """Get the effects render cost against the per-frame budget"""
+    if not effects_engine:
+        return None
+    return effects_engine.get_frame_budget()
+
+
+# Cue list functions. Each returns (success, message); the cue itself starts
+# on the output thread's next tick.
+
+def cue_go(list_name):
+    """Advance a cue list to its next cue"""
+    if not cue_sequencer:
+        return False, 'Cue sequencer not initialized'
+    return cue_sequencer.go(list_name)
+
+
+def cue_back(list_name):
+    """Step a cue list back to its previous cue"""
+    if not cue_sequencer:
+        return False, 'Cue sequencer not initialized'
+    return cue_sequencer.back(list_name)
+
+
+def cue_goto(list_name, cue_label):
+    """Jump a cue list to a specific cue"""
+    if not cue_sequencer:
+        return False, 'Cue sequencer not initialized'
+    return cue_sequencer.goto(list_name, cue_label)
+
+
+def cue_release(list_name):
+    """Stop a cue list, handing its channels back to the scenes"""
+    if not cue_sequencer:
+        return False, 'Cue sequencer not initialized'
+    return cue_sequencer.release(list_name)
+
+
+def get_cue_lists():
+    """Get every cue list with its cue labels"""
+    if not cue_sequencer:
+        return {}
+    return cue_sequencer.get_cue_lists()
+
+
+def get_cue_state():
+    """Get the current cue of every playing list"""
+    if not cue_sequencer:
+        return {}
+    return cue_sequencer.get_state()
+
+
+# Scheduler functions
+
+def _apply_trigger(trigger):
+    """Apply one fired schedule trigger, through the same paths as the API"""
+    name = trigger.get('name')
+    if trigger.get('scene'):
+        active = trigger.get('state', 'on') == 'on'
+        success, _ = set_scene_active(trigger['scene'], active)
+        message = None
+    elif trigger.get('cue_list'):
+        if trigger.get('cue') is not None:
+            success, message = cue_goto(trigger['cue_list'], trigger['cue'])
+        else:
+            success, message = cue_go(trigger['cue_list'])
+    else:
+        success, message = False, 'names neither a scene nor a cue list'
+
+    if current_app:
+        if success:
+            current_app.logger.info(f"Schedule trigger '{name}' fired")
+        else:
+            current_app.logger.error(f"Schedule trigger '{name}' failed: {message or 'see above'}")
+
+
+def get_schedule():
+    """Get every scheduled trigger with its next fire time"""
+    if not scheduler:
+        return []
+    return scheduler.get_upcoming()
 
 
 # Configuration functions (backward compatible API)
@@ -177,6 +542,21 @@ def get_config():
     return config_manager.read()
 
 
+def get_config_generation():
+    """
+    Identify the config's current content without reading it.
+
+    Returns (version, last_modified): version is a string that changes
+    whenever the config does (it includes a per-process token, so it also
+    changes across restarts), and last_modified the file's modification
+    time, or None.
+    """
+    if not config_manager:
+        return None, None
+    generation, last_modified = config_manager.get_generation()
+    return f"{config_manager.instance}-{generation}", last_modified
+
+
 def save_config(config_data):
     """Save configuration settings"""
     if not config_manager:
@@ -188,55 +568,203 @@ def save_config(config_data):
         if not updated_config:
             return False
         
-        # If network settings changed, reconfigure DMX controller
-        network_keys = {'artnet_ip', 'universe', 'packet_size', 'refresh_rate'}
-        if network_keys & config_data.keys():
-            network_settings = config_manager.get_network_settings()
-            dmx_controller.reconfigure(
-                artnet_ip=network_settings['artnet_ip'],
-                universe=network_settings['universe'],
-                packet_size=network_settings['packet_size'],
-                refresh_rate=network_settings['refresh_rate']
-            )
+        # If output settings changed, swap in a backend built from them;
+        # the output thread keeps running throughout
+        if 'output' in config_data:
+            dmx_controller.reconfigure(_create_output_backend())
+
+        if 'input' in config_data:
+            artnet_input.configure(config_manager.get_input_settings())
+        _applied_sections.update(
+            output=config_manager.get_output_settings(), input=config_manager.get_input_settings()
+        )
         
-        # If scenes changed, reload
-        if 'scenes' in config_data:
+        # If scenes changed, reload. Scenes are composed against the fixture
+        # list (and its link copy map), so a fixture change reloads too.
+        if {'scenes', 'fixtures'} & config_data.keys():
             scene_manager.load_scenes()
+
+        # Cue frames are precomputed from scenes, which depend on fixtures
+        if {'cue_lists', 'scenes', 'fixtures'} & config_data.keys():
+            cue_sequencer.load_cue_lists(config_manager.get_cue_lists(), scene_manager)
+
+        if 'schedule' in config_data:
+            scheduler.load_schedule(config_manager.get_schedule())
+
+        # Effects resolve fixture names to channels when compiled, so a
+        # fixture change recompiles them as well
+        if {'effects', 'fixtures'} & config_data.keys():
+            effects_engine.load_effects(
+                config_manager.get_effects(), config_manager.get_fixtures()
+            )
+        _compiled_state_changed()
         
         return True
         
     except Exception as e:
+        _compiled_state_changed()  # Some parts may have been swapped already
         if current_app:
             current_app.logger.error(f"Error saving configuration: {e}")
         return False
 
 
+def _create_output_backend(output=None):
+    """
+    Build the configured output backend (from `output` if given, the
+    config's output section otherwise), and poll for Art-Net nodes only
+    while it's an Art-Net backend with discovery on. Polls go to the
+    configured address, the broadcast address unless the operator set one.
+    """
+    if output is None:
+        output = config_manager.get_output_settings()
+    artnet = output.get('artnet') or {}
+    if output.get('backend', 'artnet') == 'artnet' and artnet.get('discovery', True):
+        artnet_listener.set_poll_target(artnet.get('ip', '255.255.255.255'))
+    else:
+        artnet_listener.set_poll_target(None)
+    return create_backend(output, node_table=node_table)
+
+
+def get_artnet_nodes():
+    """Art-Net nodes that answered a recent poll, and the universes they output"""
+    return {
+        'polling': artnet_listener.poll_address is not None,
+        'listening': artnet_listener.is_running(),
+        'nodes': node_table.get_nodes(),
+    }
+
+
+def get_artnet_input_status():
+    """The Art-Net input merge settings and the console it is following"""
+    if not artnet_input:
+        return None
+    return artnet_input.get_status(time.monotonic())
+
+
 def get_connection_status():
-    """Get the current Art-Net connection status"""
+    """Get the current DMX output connection status"""
     if not dmx_controller:
         return connection_status.copy()
     return dmx_controller.get_connection_status()
 
 
-def load_configuration():
-    """Reload configuration from file (for backward compatibility)"""
+def load_configuration(config=None):
+    """
+    Reload everything compiled from the configuration (`config` if it has
+    already been read and checked, otherwise the file).
+
+    Each part is compiled to the side and swapped in whole under its own
+    lock, while the output thread keeps sending: active scenes stay active
+    (unless deleted) and fade to their new values, playing cue lists keep
+    their place, and the output backend and Art-Net input are rebuilt only
+    if their sections changed. A bad output section fails the reload before
+    anything has been swapped.
+    """
     if not config_manager or not scene_manager:
         return False
     
     try:
-        scene_manager.load_scenes()
-        
+        if config is None:
+            config = config_manager.read()
+        output = config.get('output', {})
+        backend = _create_output_backend(output) if output != _applied_sections.get('output') else None
+
+        scene_manager.load_scenes(config)
+        cue_sequencer.load_cue_lists(config.get('cue_lists', []), scene_manager)
+        effects_engine.load_effects(config.get('effects', []), config.get('fixtures', []))
+        scheduler.load_schedule(config.get('schedule', []))
+        if config.get('input', {}) != _applied_sections.get('input'):
+            artnet_input.configure(config.get('input', {}))
+        dmx_controller.set_with_transition(scene_manager.recompose())
+        _compiled_state_changed()
+        _live_state_changed()
+
         # Reconfigure DMX controller
-        network_settings = config_manager.get_network_settings()
-        dmx_controller.reconfigure(
-            artnet_ip=network_settings['artnet_ip'],
-            universe=network_settings['universe'],
-            packet_size=network_settings['packet_size'],
-            refresh_rate=network_settings['refresh_rate']
-        )
-        
+        if backend is not None:
+            dmx_controller.reconfigure(backend)
+        _applied_sections.update(output=output, input=config.get('input', {}))
         return True
     except Exception as e:
+        _compiled_state_changed()  # Some parts may have been swapped already
         if current_app:
             current_app.logger.error(f"Error loading configuration: {e}")
         return False
+
+
+def get_config_revisions(offset=0, limit=None):
+    """Get one page of the config history, newest first. Returns (revisions, total)."""
+    if not config_manager:
+        return [], 0
+    return config_manager.get_revisions(offset, limit)
+
+
+def get_config_revision(revision):
+    """Get the config as it was at a revision, or None"""
+    if not config_manager:
+        return None
+    return config_manager.get_revision(revision)
+
+
+def diff_config_revisions(old, new):
+    """Get the sections and scenes that changed between two revisions, or None"""
+    if not config_manager:
+        return None
+    return config_manager.diff_revisions(old, new)
+
+
+def restore_config_revision(revision):
+    """
+    Make a revision from the config history the current config, and load
+    it like an edited config.json: checked first, then swapped in while the
+    output keeps running. The restore is recorded as a new revision, so it
+    can be undone the same way.
+
+    Returns (success, message)
+    """
+    if not config_manager:
+        return False, 'Configuration unavailable'
+    config = config_manager.get_revision(revision)
+    if config is None:
+        return False, f"No revision {revision}"
+    problem = find_config_problem(config)
+    if problem:
+        return False, f"Revision {revision} cannot be used: {problem}"
+
+    try:
+        config_manager.write(config, note=f"restored revision {revision}")
+    except Exception:
+        return False, 'Failed to write the configuration (see log)'
+    if not load_configuration():
+        return False, 'Restored, but the configuration failed to load (see log)'
+    if current_app:
+        current_app.logger.info(f"Restored config revision {revision}")
+    return True, None
+
+
+def reload_edited_config():
+    """
+    Load a config.json edited outside the app (see ConfigWatcher). A file
+    that doesn't parse, or doesn't have the shape the engine needs, is
+    logged and ignored: the show keeps running on the previous config.
+    """
+    try:
+        config = config_manager.read()
+    except Exception:
+        problem = 'it could not be read (see above)'
+    else:
+        problem = find_config_problem(config)
+
+    if problem:
+        metrics.CONFIG_RELOAD_FAILURES.inc()
+        if current_app:
+            current_app.logger.error(f"Ignoring the edited config.json: {problem}; "
+                                     f"still running on the previous configuration")
+        return False
+
+    if not load_configuration(config):
+        metrics.CONFIG_RELOAD_FAILURES.inc()
+        return False
+    metrics.CONFIG_RELOADS.inc()
+    if current_app:
+        current_app.logger.info("Loaded the edited config.json")
+    return True
@@ -3,32 +3,39 @@ DMX Controller - Handles DMX hardware communication and smooth transitions
 """
 import time
 import threading
-import socket
+import numpy as np
 from flask import current_app
-from stupidArtnet import StupidArtnet
+from app import metrics
+from app.dmx_backends import DMXBackendError
 
 
 class DMXController:
-    """Manages DMX hardware output via Art-Net with smooth transitions"""
+    """Manages DMX output through a pluggable backend, with smooth transitions"""
     
     TRANSITION_DURATION = 3.0  # Transition duration in seconds
     UPDATE_RATE = 0.033  # ~30fps update rate
+
+    # After this many failed sends in a row, stop sending every tick and
+    # only probe: first after BACKOFF_INITIAL seconds, doubling per failed
+    # probe up to BACKOFF_MAX. One successful send returns to full rate.
+    FAILURES_BEFORE_BACKOFF = 3
+    BACKOFF_INITIAL = 0.25
+    BACKOFF_MAX = 5.0
     
-    def __init__(self, artnet_ip, universe, packet_size, refresh_rate):
+    def __init__(self, backend):
         """
         Initialize DMX controller
         
         Args:
-            artnet_ip: IP address for Art-Net output
-            universe: DMX universe number
-            packet_size: Number of DMX channels (typically 512)
-            refresh_rate: FPS for DMX output
+            backend: DMXBackend to send frames through (see
+                app.dmx_backends.create_backend); connected here
         """
-        self.artnet = StupidArtnet(artnet_ip, universe, packet_size, refresh_rate)
-        self.artnet.set_simplified(False)
-        self.artnet.set_net(0)
-        self.artnet.set_subnet(0)
-        
+        # Serialises send() against a backend swap, so reconfigure() never
+        # closes a backend while a frame is going out through it. Separate
+        # from _lock: holding it never blocks a buffer writer.
+        self._backend_lock = threading.Lock()
+        self.backend = backend
+
         # DMX value buffers. Every transmitted frame must correspond to
         # exactly one scene composition, never a mixture of two - _lock
         # guards current_values, target_values and transition_active/
@@ -45,64 +52,97 @@ class DMXController:
         self.transition_active = False
         self.transition_start_time = 0
 
+        # Per-tick frame layers (effects, ...), applied in order on top of
+        # the scene composition. Each has render(frame, now), operating in
+        # place on a numpy uint8 array; they run outside _lock.
+        self._frame_layers = []
+        # Last frame handed to the socket, layers included (for monitoring)
+        self.output_values = bytes(512)
+
         # Thread control
         self._thread = None
         self._running = False
         
-        # Connection status tracking
+        # Connection status tracking. The send counters and backoff state
+        # are only written under _backend_lock.
         self.connection_status = {
             'connected': True,
             'last_error_time': 0,
-            'error_message': None
+            'error_message': None,
+            'failed_sends': 0,  # Since start
+            'consecutive_failures': 0,
+            'backoff_interval': 0.0,  # Seconds between probes; 0 at full rate
+            'skipped_sends': 0,  # Frames not attempted while backing off
         }
-    
-    def _send_dmx_packet(self, buffer):
+        self._next_send_time = 0.0  # monotonic; frames before this are skipped
+        self._connect_backend(backend)
+
+    def _connect_backend(self, backend):
+        """Connect a backend, recording a failure in connection_status"""
+        try:
+            backend.connect()
+        except DMXBackendError as error:
+            self._record_send_error(error)
+
+    def _record_send_error(self, error):
+        """Mark the output disconnected, logging only the first failure"""
+        was_connected = self.connection_status['connected']
+        self.connection_status['connected'] = False
+        self.connection_status['last_error_time'] = time.time()
+        self.connection_status['error_message'] = str(error)
+
+        # Only log once when connection is first lost (not repeatedly)
+        if was_connected:
+            if current_app:
+                current_app.logger.warning(f"DMX output connection lost: {error}")
+
+    def _send_dmx_packet(self, buffer, now):
         """
-        Send DMX packet with connection status tracking
+        Send DMX packet with connection status tracking, unless backing off
         
         Args:
-            buffer: bytearray(512) with DMX values
+            buffer: bytes(512) with DMX values
+            now: time.monotonic() for this frame
         """
-        packet = bytearray()
-        packet.extend(self.artnet.packet_header)
-        packet.extend(buffer)
-        
-        try:
-            self.artnet.socket_client.sendto(packet, (self.artnet.target_ip, self.artnet.port))
-            
-            # Send artsync if enabled (suppress errors)
-            if self.artnet.if_sync:
-                try:
-                    self.artnet.make_artsync_header()
-                    self.artnet.socket_client.sendto(
-                        self.artnet.artsync_header, 
-                        (self.artnet.target_ip, self.artnet.port)
+        status = self.connection_status
+        with self._backend_lock:
+            if now < self._next_send_time:
+                status['skipped_sends'] += 1
+                metrics.SENDS_SKIPPED.inc()
+                return
+
+            try:
+                self.backend.send(buffer)
+            except DMXBackendError as error:
+                metrics.SEND_FAILURES.inc()
+                status['failed_sends'] += 1
+                status['consecutive_failures'] += 1
+                if status['consecutive_failures'] >= self.FAILURES_BEFORE_BACKOFF:
+                    status['backoff_interval'] = min(
+                        max(status['backoff_interval'] * 2, self.BACKOFF_INITIAL),
+                        self.BACKOFF_MAX,
                     )
-                except socket.error:
-                    pass  # Silently ignore artsync errors
-            
-            # Update connection status on successful send
-            if not self.connection_status['connected']:
-                self.connection_status['connected'] = True
-                self.connection_status['error_message'] = None
-                if current_app:
-                    current_app.logger.info("Art-Net connection restored")
-                    
-        except socket.error as error:
-            current_time = time.time()
-            
-            # Update connection status
-            was_connected = self.connection_status['connected']
-            self.connection_status['connected'] = False
-            self.connection_status['last_error_time'] = current_time
-            self.connection_status['error_message'] = str(error)
-            
-            # Only log once when connection is first lost (not repeatedly)
-            if was_connected:
-                if current_app:
-                    current_app.logger.warning(f"Art-Net connection lost: {error}")
-        finally:
-            self.artnet.sequence = (self.artnet.sequence + 1) % 256
+                    self._next_send_time = now + status['backoff_interval']
+                self._record_send_error(error)
+                return
+
+            status['consecutive_failures'] = 0
+            status['backoff_interval'] = 0.0
+            self._next_send_time = 0.0
+        metrics.FRAMES_SENT.inc()
+
+        # Update connection status on successful send
+        if not status['connected']:
+            status['connected'] = True
+            status['error_message'] = None
+            if current_app:
+                current_app.logger.info("DMX output connection restored")
+
+    def _reset_backoff(self):
+        """Send the next frame at full rate. Caller must hold _backend_lock."""
+        self.connection_status['consecutive_failures'] = 0
+        self.connection_status['backoff_interval'] = 0.0
+        self._next_send_time = 0.0
     
     def start(self):
         """Start the DMX output thread"""
@@ -110,9 +150,6 @@ class DMXController:
             return
         
         self._running = True
-        # Note: We don't call self.artnet.start() because it starts its own thread
-        # and calls show() which prints errors. We manage our own thread instead.
-        
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
         
@@ -125,28 +162,69 @@ class DMXController:
             return
         
         self._running = False
-        # Note: We don't call self.artnet.stop() because we manage our own thread
-        
         self._thread.join(timeout=2.0)
         self._thread = None
         
         if current_app:
             current_app.logger.info("DMX controller thread stopped")
     
+    def add_frame_layer(self, layer):
+        """
+        Register a layer to be applied on top of the scene composition every
+        tick. Layers apply in registration order.
+
+        Args:
+            layer: object with render(frame, now), where frame is a numpy
+                uint8 array of 512 channels to modify in place and now is the
+                output thread's time.monotonic() for this tick
+        """
+        self._frame_layers.append(layer)
+
+    def _render_frame(self, frame, now):
+        """Apply the frame layers to a composed snapshot, returning the bytes to send"""
+        if self._frame_layers:
+            output = np.frombuffer(frame, dtype=np.uint8).copy()
+            for layer in self._frame_layers:
+                layer.render(output, now)
+            frame = output.tobytes()
+        self.output_values = frame
+        return frame
+
     def _run(self):
         """Main thread loop - handles smooth transitions and DMX output"""
+        previous_tick = None
         while self._running:
             time.sleep(self.UPDATE_RATE)
 
+            tick = time.perf_counter()
+            if previous_tick is not None:
+                period = tick - previous_tick
+                metrics.FRAME_PERIOD.observe(period)
+                metrics.FRAME_JITTER.observe(abs(period - self.UPDATE_RATE))
+            previous_tick = tick
+
             with self._lock:
+                locked = time.perf_counter()
                 if self.transition_active:
+                    metrics.FADE_TICKS.inc()
                     self._update_transition()
+                    metrics.TRANSITION_DURATION.observe(time.perf_counter() - locked)
                 # Snapshot under the lock; the send itself happens outside
                 # it so a slow or unreachable node can't stall a writer.
                 frame = bytes(self.current_values)
+            self._observe_lock(tick, locked)
+
+            # Layers run outside the lock too: they hold their own state.
+            # Always send DMX values (for connection monitoring), except
+            # while backing off from an unreachable output
+            now = time.monotonic()
+            self._send_dmx_packet(self._render_frame(frame, now), now)
 
-            # Always send DMX values (for connection monitoring)
-            self._send_dmx_packet(frame)
+    @staticmethod
+    def _observe_lock(requested, acquired):
+        """Record one _lock acquisition: requested/acquired are perf_counter() times"""
+        metrics.LOCK_WAIT.observe(acquired - requested)
+        metrics.LOCK_HOLD.observe(time.perf_counter() - acquired)
 
     def _update_transition(self):
         """Update DMX values during a transition. Caller must hold _lock."""
@@ -179,7 +257,9 @@ class DMXController:
         if not isinstance(buffer, bytearray) or len(buffer) != 512:
             raise ValueError("Buffer must be bytearray of length 512")
 
+        requested = time.perf_counter()
         with self._lock:
+            acquired = time.perf_counter()
             # Update target values
             for i in range(512):
                 self.target_values[i] = buffer[i]
@@ -187,6 +267,7 @@ class DMXController:
             # Start transition
             self.transition_active = True
             self.transition_start_time = time.time()
+        self._observe_lock(requested, acquired)
 
     def set_immediate(self, buffer):
         """
@@ -198,7 +279,9 @@ class DMXController:
         if not isinstance(buffer, bytearray) or len(buffer) != 512:
             raise ValueError("Buffer must be bytearray of length 512")
 
+        requested = time.perf_counter()
         with self._lock:
+            acquired = time.perf_counter()
             # Update both current and target
             for i in range(512):
                 self.current_values[i] = buffer[i]
@@ -209,52 +292,67 @@ class DMXController:
 
             # Snapshot under the lock; send outside it, matching the thread.
             frame = bytes(self.current_values)
+        self._observe_lock(requested, acquired)
+
+        now = time.monotonic()
+        self._send_dmx_packet(self._render_frame(frame, now), now)
+
+    def preload(self, buffer):
+        """
+        Set DMX values without a transition or a send: the frame the output
+        thread starts from (a restored live state)
+
+        Args:
+            buffer: bytearray(512) with DMX values
+        """
+        if not isinstance(buffer, bytearray) or len(buffer) != 512:
+            raise ValueError("Buffer must be bytearray of length 512")
 
-        self._send_dmx_packet(frame)
+        with self._lock:
+            self.current_values[:] = buffer
+            self.target_values[:] = buffer
+            self.transition_active = False
 
     def get_current_values(self):
         """Get current DMX values as a point-in-time snapshot (for monitoring)"""
         with self._lock:
             return bytes(self.current_values)
     
+    def get_target_values(self):
+        """Get the scene composition being shown or faded to, frame layers excluded"""
+        with self._lock:
+            return bytes(self.target_values)
+
+    def get_output_values(self):
+        """Get the last transmitted frame, frame layers included (for monitoring)"""
+        return self.output_values
+
     def get_connection_status(self):
-        """Get connection status (for monitoring)"""
-        return self.connection_status.copy()
+        """Get connection status plus the backend's own details (for monitoring)"""
+        status = self.connection_status.copy()
+        status.update(self.backend.get_connection_status())
+        return status
     
-    def reconfigure(self, artnet_ip=None, universe=None, packet_size=None, refresh_rate=None):
+    def reconfigure(self, backend):
         """
-        Reconfigure the Art-Net connection
-        
+        Switch to a new backend (new settings, or a different transport)
+        without stopping the output thread.
+
+        The new backend is connected before the swap, so the frame after it
+        goes out through the new settings and no tick is skipped; the old
+        one is disconnected once no send can still be using it.
+
         Args:
-            artnet_ip: New IP address (optional)
-            universe: New universe (optional)
-            packet_size: New packet size (optional)
-            refresh_rate: New refresh rate (optional)
+            backend: DMXBackend to send through from now on
         """
-        # Stop current instance
-        was_running = self._running
-        if was_running:
-            self.stop()
-        
-        # Get current settings if not provided
-        if artnet_ip is None:
-            artnet_ip = self.artnet.target_ip
-        if universe is None:
-            universe = self.artnet.universe
-        if packet_size is None:
-            packet_size = self.artnet.packet_size
-        if refresh_rate is None:
-            refresh_rate = self.artnet.fps
-        
-        # Reinitialize Art-Net
-        self.artnet = StupidArtnet(artnet_ip, universe, packet_size, refresh_rate)
-        self.artnet.set_simplified(False)
-        self.artnet.set_net(0)
-        self.artnet.set_subnet(0)
-        
-        # Restart if it was running
-        if was_running:
-            self.start()
-        
+        self._connect_backend(backend)
+        with self._backend_lock:
+            previous, self.backend = self.backend, backend
+            # New settings get a full-rate attempt straight away
+            self._reset_backoff()
+        previous.disconnect()
+
         if current_app:
-            current_app.logger.info(f"DMX controller reconfigured: {artnet_ip}, universe {universe}")
+            current_app.logger.info(
+                f"DMX controller reconfigured: {backend.get_connection_status()}"
+            )
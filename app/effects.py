@@ -0,0 +1,282 @@
+"""
+Effects Engine - Waveform and chase effects layered over the scene stack
+"""
+import math
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+
+
+# Waveform codes used in the compiled arrays. 'chase' is a square wave whose
+# duty cycle is one fixture's share of the group, so exactly one fixture is
+# lit at a time as the phase offsets walk it along the group.
+WAVEFORMS = {'sine': 0, 'saw': 1, 'square': 2, 'random': 3, 'chase': 4}
+
+# How an effect's output combines with what the scene stack already put on a
+# channel: 'override' replaces it, 'htp' (highest takes precedence) keeps
+# whichever is brighter.
+MODES = ('override', 'htp')
+
+
+class _EffectBatch:
+    """
+    Every active effect's channels concatenated into flat arrays, so a tick
+    evaluates all of them with a handful of array operations instead of a
+    Python loop per channel. Built off the output thread whenever the active
+    set changes, and never mutated afterwards - the output thread reads
+    whichever batch reference is current without taking a lock.
+    """
+
+    def __init__(self, compiled_effects, start_times):
+        def cat(key, dtype):
+            return np.concatenate([effect[key] for effect in compiled_effects]).astype(dtype)
+
+        self.index = cat('index', np.intp)
+        self.phase = cat('phase', np.float64)
+        self.rate = cat('rate', np.float64)
+        self.low = cat('low', np.float64)
+        self.span = cat('span', np.float64)
+        self.duty = cat('duty', np.float64)
+        self.seed = cat('seed', np.float64)
+        code = cat('code', np.int8)
+        htp = cat('htp', bool)
+        self.start = np.concatenate([
+            np.full(len(effect['index']), start_times[effect['name']])
+            for effect in compiled_effects
+        ])
+
+        self.sine = code == WAVEFORMS['sine']
+        self.saw = code == WAVEFORMS['saw']
+        self.pulse = (code == WAVEFORMS['square']) | (code == WAVEFORMS['chase'])
+        self.random = code == WAVEFORMS['random']
+        self.htp = htp
+        self.override = ~htp
+
+
+class EffectsEngine:
+    """Runs waveform and chase effects across fixture groups, once per output tick"""
+
+    DMX_RATE_HZ = 44  # Maximum refresh rate of a full 512-channel DMX universe
+    STATS_SMOOTHING = 0.05  # Weight of the newest frame in the running average
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.effects = {}  # Compiled effect name -> arrays, see _compile_effect
+        self.active_effects = {}  # effect name -> monotonic start time, insertion-ordered
+        self._batch = None
+
+        # Per-frame render cost, written by the output thread only
+        self._frame_stats = {'last_ms': 0.0, 'average_ms': 0.0, 'peak_ms': 0.0}
+
+    def load_effects(self, definitions, fixtures):
+        """
+        Compile effect definitions against the current fixture list.
+
+        Invalid definitions are logged and skipped rather than failing the
+        whole set, so one bad effect can't take the others off the rig.
+        """
+        compiled = {}
+        fixtures_by_name = {fixture.get('name'): fixture for fixture in fixtures}
+        for definition in definitions:
+            try:
+                effect = self._compile_effect(definition, fixtures_by_name)
+            except (KeyError, TypeError, ValueError) as e:
+                if current_app:
+                    current_app.logger.error(
+                        f"Skipping effect '{definition.get('name')}': {e}"
+                    )
+                continue
+            compiled[effect['name']] = effect
+
+        with self._lock:
+            self.effects = compiled
+            # Drop any running effects that no longer exist
+            self.active_effects = {
+                name: started for name, started in self.active_effects.items()
+                if name in self.effects
+            }
+            self._rebuild_batch()
+        return True
+
+    def _compile_effect(self, definition, fixtures_by_name):
+        """
+        Turn one effect definition into per-channel arrays.
+
+        Each fixture in the group gets a phase offset of spread * i / n, so a
+        spread of 1.0 distributes the group evenly over one full cycle and a
+        spread of 0 runs every fixture in unison.
+        """
+        name = definition['name']
+        code = WAVEFORMS[definition.get('waveform', 'sine')]
+        mode = definition.get('mode', 'override')
+        if mode not in MODES:
+            raise ValueError(f"unknown mode '{mode}'")
+
+        group = []
+        for fixture_name in definition['fixtures']:
+            if fixture_name not in fixtures_by_name:
+                raise ValueError(f"unknown fixture '{fixture_name}'")
+            group.append(fixtures_by_name[fixture_name])
+        if not group:
+            raise ValueError('no fixtures')
+
+        # Checked again here, not only by the setup API: a hand-edited or
+        # restored config reaches this without it, and a level outside
+        # 0-255 would wrap around in the uint8 frame
+        rate = float(definition.get('rate', 1.0))
+        spread = float(definition.get('spread', 1.0))
+        for key, value in (('rate', rate), ('spread', spread)):
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"{key} must be a non-negative number")
+        low = int(definition.get('low', 0))
+        high = int(definition.get('high', 255))
+        for key, value in (('low', low), ('high', high)):
+            if not 0 <= value <= 255:
+                raise ValueError(f"{key} must be in 0-255")
+        duty = 1.0 / len(group) if code == WAVEFORMS['chase'] else 0.5
+
+        index, phase = [], []
+        for position, fixture in enumerate(group):
+            start_channel = fixture.get('start_channel', 1) - 1  # 0-based
+            channel_count = fixture.get('channel_count', 1)
+            for channel in definition['channels']:  # 1-based within the fixture
+                if not 1 <= channel <= channel_count:
+                    continue
+                dmx_index = start_channel + channel - 1
+                if 0 <= dmx_index < 512:
+                    index.append(dmx_index)
+                    phase.append(spread * position / len(group))
+
+        if not index:
+            raise ValueError('no channels within the fixtures it names')
+
+        count = len(index)
+        return {
+            'name': name,
+            'index': np.array(index, dtype=np.intp),
+            'phase': np.array(phase, dtype=np.float64),
+            'rate': np.full(count, rate),
+            'low': np.full(count, float(low)),
+            'span': np.full(count, float(high - low)),
+            'duty': np.full(count, duty),
+            # Distinct per channel so 'random' fixtures don't all jump together
+            'seed': np.array(index, dtype=np.float64) * 0.618034,
+            'code': np.full(count, code, dtype=np.int8),
+            'htp': np.full(count, mode == 'htp'),
+        }
+
+    def _rebuild_batch(self):
+        """Recompile the concatenated arrays for the active set. Caller must hold _lock."""
+        self._frame_stats['peak_ms'] = 0.0
+        if not self.active_effects:
+            self._batch = None
+            return
+        self._batch = _EffectBatch(
+            [self.effects[name] for name in self.active_effects], self.active_effects
+        )
+
+    def get_available_effects(self):
+        """Get list of available effect names"""
+        return list(self.effects.keys())
+
+    def get_active_effects(self):
+        """Get the list of running effect names, oldest first"""
+        return list(self.active_effects.keys())
+
+    def get_highest_active_idx(self):
+        """Get the highest DMX channel index any running effect writes, or 0"""
+        batch = self._batch
+        if batch is None:
+            return 0
+        return int(batch.index.max())
+
+    def toggle_effect(self, name):
+        """
+        Start or stop an effect. A started effect begins at phase zero.
+
+        Returns: (success, active_effect_names)
+        """
+        with self._lock:
+            if name not in self.effects:
+                if current_app:
+                    current_app.logger.error(f"Effect '{name}' not found")
+                return False, list(self.active_effects.keys())
+
+            if name in self.active_effects:
+                del self.active_effects[name]
+            else:
+                self.active_effects[name] = time.monotonic()
+            self._rebuild_batch()
+            return True, list(self.active_effects.keys())
+
+    def render(self, frame, now):
+        """
+        Apply every running effect onto a composed frame (in place).
+
+        Args:
+            frame: numpy uint8 array of 512 channels, already holding the
+                scene stack's output for this tick
+            now: the output thread's monotonic clock for this tick
+        """
+        batch = self._batch
+        if batch is None:
+            return
+
+        started = time.perf_counter()
+
+        position = (now - batch.start) * batch.rate + batch.phase
+        cycle = np.floor(position)
+        x = position - cycle
+
+        level = np.empty_like(x)
+        level[batch.sine] = 0.5 - 0.5 * np.cos(2 * math.pi * x[batch.sine])
+        level[batch.saw] = x[batch.saw]
+        level[batch.pulse] = x[batch.pulse] < batch.duty[batch.pulse]
+        # Stateless per-cycle noise: the same cycle always yields the same
+        # level, so 'random' holds one value per cycle without stored state.
+        noise = np.sin(cycle[batch.random] * 12.9898 + batch.seed[batch.random]) * 43758.5453
+        level[batch.random] = noise - np.floor(noise)
+
+        values = np.rint(batch.low + batch.span * level).astype(np.uint8)
+
+        frame[batch.index[batch.override]] = values[batch.override]
+        if batch.htp.any():
+            index = batch.index[batch.htp]
+            frame[index] = np.maximum(frame[index], values[batch.htp])
+
+        self._record_frame_cost((time.perf_counter() - started) * 1000.0)
+
+    def _record_frame_cost(self, elapsed_ms):
+        """Fold one frame's render time into the running statistics"""
+        stats = self._frame_stats
+        stats['last_ms'] = elapsed_ms
+        stats['average_ms'] += (elapsed_ms - stats['average_ms']) * self.STATS_SMOOTHING
+        stats['peak_ms'] = max(stats['peak_ms'], elapsed_ms)
+
+    def get_frame_budget(self):
+        """
+        Report the render cost against the frame budget at the full DMX rate.
+
+        `estimated_capacity` extrapolates the running average per effect to
+        how many effects of similar size would fit in one frame at 44 Hz, so
+        it is only meaningful while at least one effect is running.
+        """
+        stats = dict(self._frame_stats)
+        budget_ms = 1000.0 / self.DMX_RATE_HZ
+        running = len(self.active_effects)
+
+        capacity = None
+        if running and stats['average_ms'] > 0:
+            capacity = int(budget_ms / (stats['average_ms'] / running))
+
+        return {
+            'budget_ms': round(budget_ms, 3),
+            'last_ms': round(stats['last_ms'], 3),
+            'average_ms': round(stats['average_ms'], 3),
+            'peak_ms': round(stats['peak_ms'], 3),
+            'budget_used': round(stats['average_ms'] / budget_ms, 4),
+            'running_effects': running,
+            'estimated_capacity': capacity,
+        }
@@ -0,0 +1,323 @@
+"""
+Fixture Library - Loads fixture profiles from JSON files, compiled and cached
+"""
+import hashlib
+import json
+import os
+import re
+
+from flask import current_app
+
+
+# Profiles shipped with the app, one file per fixture, laid out like the Open
+# Fixture Library's fixtures/ directory: <manufacturer>/<fixture>.json
+DEFAULT_LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixture_profiles')
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache')
+
+# Bumped whenever compile_profile()'s output changes shape, so caches built
+# by an older version are not reused
+COMPILER_VERSION = 1
+CACHE_PREFIX = 'fixture-library-'
+
+# Open Fixture Library index files that sit among the fixtures
+INDEX_FILES = {'manufacturers.json', 'register.json'}
+
+# Channels whose every capability is one of these are hidden from the scene
+# editor unless the profile says otherwise: things an operator shouldn't
+# touch during a show
+HIDDEN_CAPABILITIES = {
+    'Maintenance', 'NoFunction', 'Effect', 'EffectSpeed', 'EffectDuration',
+    'EffectParameter', 'SoundSensitivity', 'Speed',
+}
+
+PERCENT = re.compile(r'^(\d+(?:\.\d+)?)%$')
+
+
+class ProfileError(ValueError):
+    """A fixture profile that cannot be compiled"""
+
+
+def _role(definition):
+    """
+    The channel's role from its capabilities: the capability type, with the
+    colour for colour intensities ("ColorIntensity/Red"), or "Multiple" for
+    a channel whose DMX ranges do different things. None if undescribed.
+    """
+    if 'capability' in definition:
+        capabilities = [definition['capability']]
+    else:
+        capabilities = definition.get('capabilities') or []
+    roles = set()
+    for capability in capabilities:
+        if not isinstance(capability, dict) or not isinstance(capability.get('type'), str):
+            raise ProfileError('every capability needs a type')
+        if capability['type'] == 'NoFunction':
+            continue
+        role = capability['type']
+        if role == 'ColorIntensity' and isinstance(capability.get('color'), str):
+            role = f"{role}/{capability['color']}"
+        roles.add(role)
+    if not roles:
+        return 'NoFunction' if capabilities else None
+    return roles.pop() if len(roles) == 1 else 'Multiple'
+
+
+def _default_bytes(key, definition):
+    """
+    A channel's default value split into one byte per channel of its
+    resolution: the coarse channel, then each fine alias.
+
+    OFL defaults are a DMX value at the channel's full resolution (0-65535
+    for a 16-bit channel, or 0-255 for any channel) or a percentage.
+    """
+    byte_count = 1 + len(definition.get('fineChannelAliases', []))
+    maximum = 256 ** byte_count - 1
+    value = definition.get('defaultValue', 0)
+
+    if isinstance(value, str):
+        match = PERCENT.match(value)
+        if not match or float(match.group(1)) > 100:
+            raise ProfileError(f"channel '{key}': defaultValue must be a DMX value or a percentage")
+        value = round(float(match.group(1)) / 100 * maximum)
+    elif isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= maximum:
+        raise ProfileError(f"channel '{key}': defaultValue must be 0-{maximum}")
+    elif byte_count > 1 and value <= 255:
+        # A coarse-only default on a fine channel: scale it up
+        value <<= 8 * (byte_count - 1)
+
+    return [(value >> (8 * shift)) & 0xFF for shift in reversed(range(byte_count))]
+
+
+def compile_profile(profile, source):
+    """
+    Compile one OFL fixture definition into fixture types, one per mode.
+
+    A single-mode fixture is known by its name; each mode of a multi-mode
+    fixture by "<name> - <mode name>". A compiled type is:
+
+        {'channels': [{'name', 'default', 'visible', 'role'[, 'fine_of']}],
+         'fine_pairs': [[coarse offset, fine offset], ...],
+         'source': <file>}
+
+    Offsets are 0-based within the mode. A fine channel's `fine_of` names
+    the offset of its coarse channel. Besides the OFL format, an optional
+    top-level "dmxlife": {"hiddenChannels": [...]} overrides which channels
+    the scene editor hides.
+
+    Returns {type name: compiled type}.
+
+    Raises:
+        ProfileError: naming what is wrong with the profile
+    """
+    if not isinstance(profile, dict):
+        raise ProfileError('a fixture profile must be a JSON object')
+    name = profile.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ProfileError('name is required')
+    available = profile.get('availableChannels')
+    if not isinstance(available, dict) or not available:
+        raise ProfileError('availableChannels must be a non-empty object')
+    modes = profile.get('modes')
+    if not isinstance(modes, list) or not modes:
+        raise ProfileError('modes must be a non-empty list')
+
+    # Every channel key a mode may use: the available channels and their
+    # fine aliases, each with its role, default byte and coarse channel
+    channels = {}
+    for key, definition in available.items():
+        if not isinstance(definition, dict):
+            raise ProfileError(f"channel '{key}' must be an object")
+        aliases = definition.get('fineChannelAliases', [])
+        if not isinstance(aliases, list) or not all(isinstance(a, str) for a in aliases):
+            raise ProfileError(f"channel '{key}': fineChannelAliases must be a list of names")
+        try:
+            role = _role(definition)
+        except ProfileError as e:
+            raise ProfileError(f"channel '{key}': {e}") from None
+        defaults = _default_bytes(key, definition)
+        for index, channel_key in enumerate([key] + aliases):
+            if channel_key in channels:
+                raise ProfileError(f"channel '{channel_key}' is defined twice")
+            channels[channel_key] = {
+                'role': role,
+                'default': defaults[index],
+                'coarse': key if index else None,
+            }
+
+    extension = profile.get('dmxlife', {})
+    hidden = extension.get('hiddenChannels') if isinstance(extension, dict) else None
+    if hidden is not None:
+        if not isinstance(hidden, list) or not all(h in channels for h in hidden):
+            raise ProfileError('dmxlife.hiddenChannels must list channels of this fixture')
+        hidden = set(hidden)
+
+    types = {}
+    for mode in modes:
+        if not isinstance(mode, dict) or not isinstance(mode.get('name'), str):
+            raise ProfileError('every mode needs a name')
+        keys = mode.get('channels')
+        if not isinstance(keys, list) or not 0 < len(keys) <= 512:
+            raise ProfileError(f"mode '{mode['name']}': channels must list 1-512 channels")
+
+        compiled = []
+        offsets = {}
+        for offset, key in enumerate(keys):
+            if key is None:
+                # An unused slot, still counted in the footprint
+                compiled.append({'name': f"Unused {offset + 1}", 'default': 0,
+                                 'visible': False, 'role': 'NoFunction'})
+                continue
+            if not isinstance(key, str):
+                raise ProfileError(f"mode '{mode['name']}': matrix channel insertion is not supported")
+            channel = channels.get(key)
+            if channel is None:
+                raise ProfileError(f"mode '{mode['name']}' uses unknown channel '{key}'")
+            role = channel['role']
+            if hidden is not None:
+                visible = key not in hidden
+            else:
+                visible = role not in HIDDEN_CAPABILITIES and channel['coarse'] is None
+            compiled.append({'name': key, 'default': channel['default'],
+                             'visible': visible, 'role': role})
+            offsets[key] = offset
+
+        fine_pairs = []
+        for offset, key in enumerate(keys):
+            coarse = key and channels[key]['coarse']
+            if coarse in offsets:
+                compiled[offset]['fine_of'] = offsets[coarse]
+                fine_pairs.append([offsets[coarse], offset])
+
+        type_name = name if len(modes) == 1 else f"{name} - {mode['name']}"
+        if type_name in types:
+            raise ProfileError(f"mode '{mode['name']}' is defined twice")
+        types[type_name] = {'channels': compiled, 'fine_pairs': fine_pairs, 'source': source}
+    return types
+
+
+def _read_profile_files(directory):
+    """Every profile file under directory as (relative path, bytes), in path order"""
+    files = []
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for file_name in sorted(names):
+            if not file_name.endswith('.json') or file_name.startswith('.'):
+                continue
+            if root == directory and file_name in INDEX_FILES:
+                continue
+            path = os.path.join(root, file_name)
+            with open(path, 'rb') as f:
+                files.append((os.path.relpath(path, directory).replace(os.sep, '/'), f.read()))
+    return files
+
+
+def compile_library(files):
+    """
+    Compile profile files; a bad file is reported and left out, never
+    allowed to stop the rest loading.
+
+    Returns (types, errors): errors is a list of [file, message].
+    """
+    types = {}
+    errors = []
+    for source, raw in files:
+        try:
+            compiled = compile_profile(json.loads(raw), source)
+        except (ValueError, UnicodeDecodeError) as e:  # ProfileError and JSON errors
+            errors.append([source, str(e)])
+            continue
+        duplicates = sorted(set(compiled) & set(types))
+        if duplicates:
+            errors.append([source, f"fixture type '{duplicates[0]}' is already defined by "
+                                   f"{types[duplicates[0]]['source']}"])
+            continue
+        types.update(compiled)
+    return types, errors
+
+
+class FixtureLibrary:
+    """
+    Fixture types by name, compiled from a directory of profile files.
+
+    load() hashes the files' content and reuses the compiled index cached
+    under that hash if there is one, so a start-up with an unchanged library
+    reads one compact file instead of parsing and validating every profile.
+    Lookups are a dict access.
+    """
+
+    def __init__(self, types, digest, errors=()):
+        """
+        Args:
+            types: {type name: compiled type}, see compile_profile()
+            digest: short hash of the library's content, changing whenever
+                any profile (or the compiler) does
+            errors: [file, message] for each profile left out
+        """
+        self.types = types
+        self.digest = digest
+        self.errors = list(errors)
+
+    @classmethod
+    def load(cls, directory=DEFAULT_LIBRARY_DIR, cache_dir=DEFAULT_CACHE_DIR):
+        files = _read_profile_files(directory)
+        content = hashlib.sha256(f"compiler {COMPILER_VERSION}\n".encode())
+        for source, raw in files:
+            content.update(f"{source}\n{len(raw)}\n".encode())
+            content.update(raw)
+        digest = content.hexdigest()[:16]
+
+        cache_path = os.path.join(cache_dir, f"{CACHE_PREFIX}{digest}.json") if cache_dir else None
+        library = cls._read_cache(cache_path, digest)
+        if library is None:
+            types, errors = compile_library(files)
+            library = cls(types, digest, errors)
+            library._write_cache(cache_dir, cache_path)
+
+        if library.errors and current_app:
+            current_app.logger.warning("\n".join(
+                ["Fixture profiles left out of the library:"] +
+                [f"  {source}: {message}" for source, message in library.errors]
+            ))
+        return library
+
+    @classmethod
+    def _read_cache(cls, cache_path, digest):
+        """The library cached for this digest, or None if absent or unreadable"""
+        if cache_path is None:
+            return None
+        try:
+            with open(cache_path) as f:
+                cached = json.load(f)
+            if cached.get('digest') != digest:
+                return None
+            return cls(cached['types'], digest, cached['errors'])
+        except (OSError, ValueError, KeyError, AttributeError):
+            return None
+
+    def _write_cache(self, cache_dir, cache_path):
+        """
+        Store the compiled index and remove caches of earlier library
+        versions. Best-effort: a read-only disk just means compiling again
+        at the next start-up.
+        """
+        if cache_path is None:
+            return
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'digest': self.digest, 'types': self.types, 'errors': self.errors},
+                          f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+            for file_name in os.listdir(cache_dir):
+                path = os.path.join(cache_dir, file_name)
+                if file_name.startswith(CACHE_PREFIX) and path != cache_path:
+                    os.remove(path)
+        except OSError as e:
+            if current_app:
+                current_app.logger.warning(f"Could not cache the compiled fixture library: {e}")
+
+    def get(self, type_name):
+        """The compiled type, or None if the library has no such type"""
+        return self.types.get(type_name)
@@ -0,0 +1,106 @@
+"""
+HTTP Cache - Validators, 304s and gzip for responses built from slow-changing data
+"""
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+
+# Bodies smaller than this go uncompressed: gzip's header and the CPU cost
+# outweigh the saving
+GZIP_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+
+# Revalidate every time, but only private (browser) caches may store it:
+# every response is behind the login
+REVALIDATE = 'private, no-cache'
+# For URLs versioned by a content hash: the content at one URL never changes
+IMMUTABLE = 'private, max-age=31536000, immutable'
+
+
+class _CompressedBodies:
+    """
+    Gzipped bodies by ETag, least recently used dropped first.
+
+    An ETag names one exact body, so the compressed form can be reused by
+    every client asking for the same version instead of being compressed
+    per request.
+    """
+
+    def __init__(self, size=32):
+        self.size = size
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag, body):
+        with self._lock:
+            compressed = self._bodies.get(etag)
+            if compressed is not None:
+                self._bodies.move_to_end(etag)
+                return compressed
+        compressed = gzip.compress(body, GZIP_LEVEL)
+        with self._lock:
+            self._bodies[etag] = compressed
+            while len(self._bodies) > self.size:
+                self._bodies.popitem(last=False)
+        return compressed
+
+
+_compressed = _CompressedBodies()
+
+
+def is_not_modified(etag, last_modified=None):
+    """
+    Whether the request's validators match, so a 304 can be sent without
+    building the body. If-None-Match wins over If-Modified-Since when both
+    are sent; ETags compare weakly, since gzip and identity are the same
+    content.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def cached_response(body, etag, last_modified=None, cache_control=REVALIDATE,
+                    mimetype='application/json'):
+    """
+    Build a response for `body` (bytes) carrying its validators, as a 304 if
+    the request's validators match, and gzipped if the client accepts it
+    and the body is large enough.
+
+    Args:
+        body: the full response body
+        etag: opaque tag naming this exact body; sent weak (W/"...")
+        last_modified: POSIX time the underlying data last changed, or None
+        cache_control: Cache-Control header value
+    """
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified, cache_control)
+
+    response = Response(mimetype=mimetype)
+    if len(body) >= GZIP_MIN_SIZE and 'gzip' in request.accept_encodings:
+        response.set_data(_compressed.get(etag, body))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response.set_data(body)
+    _set_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def not_modified_response(etag, last_modified=None, cache_control=REVALIDATE):
+    """An empty 304 carrying the same validators a full response would"""
+    response = Response(status=304)
+    _set_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def _set_validators(response, etag, last_modified, cache_control):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = int(last_modified)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
@@ -0,0 +1,172 @@
+"""
+Live State - The active scenes and output frame, kept on disk across restarts
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+
+from flask import current_app
+
+# 'DMXS', format version, CRC-32 of everything after the header
+HEADER = struct.Struct('<4sHI')
+MAGIC = b'DMXS'
+FORMAT_VERSION = 1
+NAME_LENGTH = struct.Struct('<H')
+
+
+def pack_state(layers, frame):
+    """
+    The state file's bytes: a header, the 512-byte frame, then each active
+    layer's name as a 2-byte length and UTF-8, oldest layer first.
+    """
+    payload = bytearray(bytes(frame[:512]).ljust(512, b'\0'))
+    for name in layers:
+        encoded = name.encode('utf-8')
+        payload += NAME_LENGTH.pack(len(encoded)) + encoded
+    return HEADER.pack(MAGIC, FORMAT_VERSION, zlib.crc32(payload)) + payload
+
+
+def unpack_state(data):
+    """(layers, frame) from pack_state()'s bytes; ValueError if they aren't a valid state"""
+    if len(data) < HEADER.size + 512:
+        raise ValueError('too short')
+    magic, version, crc = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError('not a live state file of this version')
+    payload = memoryview(data)[HEADER.size:]
+    if zlib.crc32(payload) != crc:
+        raise ValueError('checksum mismatch')
+
+    frame = bytes(payload[:512])
+    layers = []
+    offset = 512
+    while offset < len(payload):
+        if offset + NAME_LENGTH.size > len(payload):
+            raise ValueError('truncated layer name')
+        (length,) = NAME_LENGTH.unpack_from(payload, offset)
+        offset += NAME_LENGTH.size
+        if offset + length > len(payload):
+            raise ValueError('truncated layer name')
+        layers.append(bytes(payload[offset:offset + length]).decode('utf-8'))
+        offset += length
+    return layers, frame
+
+
+class LiveState:
+    """
+    Saves the active scene layers and the composed output frame to a small
+    binary file, so a restart resumes the show instead of going dark.
+
+    mark_changed() is all a hot path does; a writer thread saves once
+    changes have been quiet for DEBOUNCE seconds, or at the latest
+    MAX_DELAY seconds after the first unsaved one, so a burst of toggles is
+    one write and a crash loses at most the last few seconds. The state is
+    read from `snapshot` when it is written, never copied per change, and a
+    state identical to the one on disk isn't written again.
+    """
+
+    DEBOUNCE = 1.0
+    MAX_DELAY = 5.0
+
+    def __init__(self, path, snapshot):
+        """
+        Args:
+            path: the state file
+            snapshot: callable returning (active layer names, frame bytes)
+        """
+        self.path = path
+        self.snapshot = snapshot
+        self._condition = threading.Condition()
+        self._first_change = None  # monotonic times; None when all is saved
+        self._last_change = None
+        self._stopping = False
+        self._written = None
+        self._thread = None
+
+    def load(self):
+        """
+        The saved (layers, frame), or None if there is no usable state file.
+        A damaged file is logged and ignored: the show then starts dark, as
+        it would without one.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            if current_app:
+                current_app.logger.warning(f"Could not read the live state file: {e}")
+            return None
+        try:
+            state = unpack_state(data)
+        except (ValueError, UnicodeDecodeError) as e:
+            if current_app:
+                current_app.logger.warning(f"Ignoring the live state file '{self.path}': {e}")
+            return None
+        self._written = data
+        return state
+
+    def save(self):
+        """Write the current state now, atomically and durably, if it changed"""
+        layers, frame = self.snapshot()
+        data = pack_state(layers, frame)
+        if data == self._written:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._written = data
+        except OSError as e:
+            # Best-effort: losing the state only costs a dark restart
+            if current_app:
+                current_app.logger.error(f"Error saving the live state: {e}")
+
+    def mark_changed(self):
+        """Note that the layers or frame changed; saved after the debounce"""
+        with self._condition:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify()
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread, saving any pending change first"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._first_change is None and not self._stopping:
+                    self._condition.wait()
+                if self._first_change is None:
+                    return
+                due = min(self._last_change + self.DEBOUNCE, self._first_change + self.MAX_DELAY)
+                delay = due - time.monotonic()
+                if delay > 0 and not self._stopping:
+                    self._condition.wait(delay)
+                    continue
+                self._first_change = self._last_change = None
+            self.save()
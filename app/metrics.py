@@ -0,0 +1,228 @@
+"""
+Metrics - Counters and histograms for /metrics, in the Prometheus text format
+"""
+import bisect
+import threading
+import time
+
+from flask import g, request
+
+
+class Counter:
+    """A monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, '', self.value
+
+
+class Gauge:
+    """A value read from a callable when scraped, so nothing updates it on a hot path"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, read):
+        self.name = name
+        self.help = help_text
+        self.read = read
+
+    def samples(self):
+        value = self.read()
+        if value is not None:
+            yield self.name, '', value
+
+
+class Histogram:
+    """
+    Observations counted into fixed buckets.
+
+    The bucket counts are one list allocated up front; observe() is a
+    bisect into the bounds and two additions under a lock, with nothing
+    allocated per event. Buckets are stored per bucket and made cumulative
+    only when scraped.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets, labels=''):
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(sorted(buckets))
+        self.labels = labels  # Pre-rendered 'key="value"', or ''
+        self._counts = [0] * (len(self.bounds) + 1)  # Last is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        prefix = f"{self.labels}," if self.labels else ''
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            yield f"{self.name}_bucket", f'{prefix}le="{bound}"', cumulative
+        cumulative += counts[-1]
+        yield f"{self.name}_bucket", f'{prefix}le="+Inf"', cumulative
+        yield f"{self.name}_sum", self.labels, total
+        yield f"{self.name}_count", self.labels, cumulative
+
+
+class HistogramFamily:
+    """Histograms sharing a name and buckets, one per value of a label"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label, buckets):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, value):
+        """The histogram for one label value, created on first use"""
+        child = self._children.get(value)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(value, Histogram(
+                    self.name, self.help, self.buckets, f'{self.label}="{value}"'
+                ))
+        return child
+
+    def samples(self):
+        for value in sorted(self._children):
+            yield from self._children[value].samples()
+
+
+class Registry:
+    """Every metric this process exposes, in registration order"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help_text):
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name, help_text, read):
+        return self._register(Gauge(name, help_text, read))
+
+    def histogram(self, name, help_text, buckets):
+        return self._register(Histogram(name, help_text, buckets))
+
+    def histogram_family(self, name, help_text, label, buckets):
+        return self._register(HistogramFamily(name, help_text, label, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """The text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Bucket bounds, in seconds
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+                0.001, 0.0025, 0.005, 0.01, 0.025)
+PERIOD_BUCKETS = (0.020, 0.025, 0.030, 0.032, 0.034, 0.036, 0.040, 0.050, 0.075, 0.1, 0.25)
+JITTER_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+REQUEST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Output engine (DMXController)
+FRAMES_SENT = REGISTRY.counter(
+    'dmxlife_frames_sent_total', 'Frames handed to the output backend successfully')
+SEND_FAILURES = REGISTRY.counter(
+    'dmxlife_send_failures_total', 'Frames the output backend failed to send')
+SENDS_SKIPPED = REGISTRY.counter(
+    'dmxlife_sends_skipped_total', 'Frames not sent while backing off from a failing output')
+FRAME_PERIOD = REGISTRY.histogram(
+    'dmxlife_frame_period_seconds', 'Time between consecutive output ticks', PERIOD_BUCKETS)
+FRAME_JITTER = REGISTRY.histogram(
+    'dmxlife_frame_jitter_seconds', 'Distance of each tick period from the nominal rate',
+    JITTER_BUCKETS)
+FADE_TICKS = REGISTRY.counter(
+    'dmxlife_fade_ticks_total', 'Output ticks that advanced a scene crossfade')
+TRANSITION_DURATION = REGISTRY.histogram(
+    'dmxlife_transition_update_seconds', 'Time spent in one crossfade update', FAST_BUCKETS)
+LOCK_WAIT = REGISTRY.histogram(
+    'dmxlife_buffer_lock_wait_seconds', 'Time spent waiting for the DMX buffer lock',
+    FAST_BUCKETS)
+LOCK_HOLD = REGISTRY.histogram(
+    'dmxlife_buffer_lock_hold_seconds', 'Time the DMX buffer lock was held', FAST_BUCKETS)
+
+# Scenes and config
+SCENE_TOGGLE = REGISTRY.histogram(
+    'dmxlife_scene_toggle_seconds', 'Time to switch a scene on or off and recompose',
+    FAST_BUCKETS)
+CONFIG_READ = REGISTRY.histogram(
+    'dmxlife_config_read_seconds', 'Time to read and parse config.json', REQUEST_BUCKETS)
+CONFIG_READ_BYTES = REGISTRY.histogram(
+    'dmxlife_config_read_bytes', 'Size of config.json as read', BYTES_BUCKETS)
+CONFIG_WRITE = REGISTRY.histogram(
+    'dmxlife_config_write_seconds', 'Time to write config.json durably', REQUEST_BUCKETS)
+CONFIG_WRITE_BYTES = REGISTRY.histogram(
+    'dmxlife_config_write_bytes', 'Size of config.json as written', BYTES_BUCKETS)
+CONFIG_REVISION = REGISTRY.histogram(
+    'dmxlife_config_revision_seconds', 'Time to record a config revision in the history',
+    REQUEST_BUCKETS)
+CONFIG_LOCK_WAIT = REGISTRY.histogram(
+    'dmxlife_config_lock_wait_seconds', 'Time spent waiting for the config file lock',
+    REQUEST_BUCKETS)
+CONFIG_RELOADS = REGISTRY.counter(
+    'dmxlife_config_reloads_total', 'Outside edits to config.json loaded while running')
+CONFIG_RELOAD_FAILURES = REGISTRY.counter(
+    'dmxlife_config_reload_failures_total', 'Outside edits to config.json rejected as unusable')
+
+# Web tier
+REQUEST_LATENCY = REGISTRY.histogram_family(
+    'dmxlife_request_seconds', 'Time to produce a response, by endpoint', 'endpoint',
+    REQUEST_BUCKETS)
+
+
+def init_app(app):
+    """Time every request, labelled by its endpoint (the route's function name)"""
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_request_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.get('metrics_request_start')
+        if start is not None:
+            REQUEST_LATENCY.labels(request.endpoint or 'unmatched').observe(
+                time.perf_counter() - start
+            )
+        return response
+
+
+def render():
+    return REGISTRY.render()
@@ -1,6 +1,7 @@
 """
 Models for DMX fixtures and scenes
 """
+from app.fixture_library import FixtureLibrary
 
 
 class Fixture:
@@ -36,67 +37,51 @@ class Fixture:
 
 
 class FixtureType:
-    """Represents a type of DMX fixture with channel definitions"""
-    
-    # Common fixture types
-    TYPES = {
-        'Generic': {
-            'channels': [
-                {'name': 'Dimmer', 'default': 0, 'visible': True}
-            ]
-        },
-        'RGB': {
-            'channels': [
-                {'name': 'Red', 'default': 0, 'visible': True},
-                {'name': 'Green', 'default': 0, 'visible': True},
-                {'name': 'Blue', 'default': 0, 'visible': True}
-            ]
-        },
-        'ShowTec LEDPAR 56': {
-            'channels': [
-                {'name': 'Red', 'default': 0, 'visible': True},
-                {'name': 'Green', 'default': 0, 'visible': True},
-                {'name': 'Blue', 'default': 0, 'visible': True},
-                {'name': 'Full Color', 'default': 0, 'visible': False},
-                {'name': 'Strobe en Speed', 'default': 0, 'visible': False},
-                {'name': 'Modi', 'default': 0, 'visible': False}
-            ]
-        },
-        'Performer 2000 - 13ch tour': {
-            'channels': [
-                {'name': 'dimmer', 'default': 0, 'visible': True},
-                {'name': 'Rood', 'default': 0, 'visible': True},
-                {'name': 'Groen', 'default': 0, 'visible': True},
-                {'name': 'Blauw', 'default': 0, 'visible': True},
-                {'name': 'Amber', 'default': 0, 'visible': True},
-                {'name': 'Limoen', 'default': 0, 'visible': True},
-                {'name': 'Kleur', 'default': 0, 'visible': True},
-                {'name': 'Macro', 'default': 0, 'visible': False},
-                {'name': 'Stroboscoop', 'default': 0, 'visible': False},
-                {'name': 'Zoom kl->gr', 'default': 0, 'visible': True},
-                {'name': 'Programma', 'default': 0, 'visible': False},
-                {'name': 'P-Snelheid', 'default': 0, 'visible': False},
-                {'name': 'Dimmersnelheid', 'default': 0, 'visible': False}
-            ]
-        },
-        'Compac Par 18 Tri': {
-            'channels': [
-                {'name': 'Dimmer', 'default': 0, 'visible': True},
-                {'name': 'Rood', 'default': 0, 'visible': True},
-                {'name': 'Groen', 'default': 0, 'visible': True},
-                {'name': 'Blauw', 'default': 0, 'visible': True}
-            ]
-        },
-    }
-    
+    """
+    Fixture types and their channel definitions, looked up in the fixture
+    library (`app/fixture_library.py`): profile files, compiled once and
+    cached. The library is loaded on first use, or set by the app at
+    start-up from its configured directory.
+    """
+
+    # Channels for an unknown type when the library has no Generic profile
+    FALLBACK_CHANNELS = [{'name': 'Dimmer', 'default': 0, 'visible': True}]
+
+    _library = None
+
+    @classmethod
+    def use_library(cls, library):
+        """Look types up in this FixtureLibrary from now on"""
+        cls._library = library
+
+    @classmethod
+    def get_library(cls):
+        """The FixtureLibrary in use, loading the bundled profiles if none was set"""
+        if cls._library is None:
+            cls._library = FixtureLibrary.load()
+        return cls._library
+
+    @classmethod
+    def get_catalogue(cls):
+        """
+        Every type's compiled definition, and a hash of the library's content.
+
+        Returns (types, digest): types maps each type name to its
+        definition, and digest changes whenever any profile does.
+        """
+        library = cls.get_library()
+        return library.types, library.digest
+
     @classmethod
     def get_types(cls):
         """Get available fixture types"""
-        return list(cls.TYPES.keys())
+        return sorted(cls.get_library().types)
     
     @classmethod
     def get_channels(cls, fixture_type):
         """Get channels for a fixture type"""
-        if fixture_type in cls.TYPES:
-            return cls.TYPES[fixture_type]['channels']
-        return cls.TYPES['Generic']['channels']
+        library = cls.get_library()
+        definition = library.get(fixture_type) or library.get('Generic')
+        if definition is None:
+            return cls.FALLBACK_CHANNELS
+        return definition['channels']
@@ -0,0 +1,154 @@
+"""
+Scene Preview - Live scene-editor overlay fed by sparse channel updates
+"""
+import threading
+import time
+
+import numpy as np
+from flask import current_app
+
+
+class PreviewOverlay:
+    """
+    Frame layer showing the scene being edited, on top of everything else.
+
+    The editor posts only the channels that changed, as {index: value}.
+    Updates are merged into a pending dict (a newer value for a channel
+    replaces an older one) and render() takes whatever is pending once per
+    output tick, so a burst of slider events between two ticks costs one
+    merge on the output thread, not one frame each.
+
+    While a preview is active it owns all 512 channels, exactly like the old
+    full-frame test did: a channel the editor hasn't set is dark. The
+    preview lasts until it is released, which happens when the editor's
+    event stream closes (see subscribe()) or it asks explicitly, or, with
+    no event stream open, UNWATCHED_TIMEOUT seconds after the last update:
+    a one-off test frame (POST /setup/api/config/scenes/test) must not
+    keep the output from the scenes for good.
+    """
+
+    # Longest silence on an event stream. A write is the only way to notice
+    # a client that went away, so this also bounds how long an abandoned
+    # preview stays on the output.
+    KEEPALIVE = 15.0
+    UNWATCHED_TIMEOUT = 10.0
+
+    def __init__(self, expand_links):
+        """
+        Args:
+            expand_links: callable copying master fixture ranges onto their
+                linked fixtures in place (SceneManager.expand_links)
+        """
+        self.expand_links = expand_links
+        self._condition = threading.Condition()
+        self._pending = {}  # 0-based channel -> value, not yet applied
+        self._reset_pending = False  # clear the frame before applying _pending
+        self._release_pending = False
+        self._sequence = 0  # last update accepted
+        self._applied_sequence = 0  # last update on the wire
+        self._subscribers = 0
+        self._updated_at = 0.0  # monotonic time of the last update()
+
+        # Written by the output thread only
+        self._values = np.zeros(512, dtype=np.uint8)
+        self._active = False
+
+    def update(self, channels, reset=False):
+        """
+        Queue sparse channel values for the next output tick.
+
+        Args:
+            channels: {0-based channel: value} with values already validated
+            reset: clear every channel first (starting a new preview)
+
+        Returns: the sequence number this update will be acknowledged with
+        """
+        with self._condition:
+            if reset:
+                self._pending = {}
+                self._reset_pending = True
+            self._release_pending = False
+            self._pending.update(channels)
+            self._updated_at = time.monotonic()
+            self._sequence += 1
+            return self._sequence
+
+    def release(self):
+        """End the preview, handing the output back to the scene stack"""
+        with self._condition:
+            self._pending = {}
+            self._reset_pending = False
+            self._release_pending = True
+            self._sequence += 1
+        if current_app:
+            current_app.logger.info("Scene preview released")
+
+    def is_active(self):
+        """Whether a preview currently owns the output"""
+        return self._active
+
+    def subscribe(self):
+        """
+        Event generator for one editor: yields (sequence, active) each time
+        the output thread puts a newer update on the wire, or None after
+        KEEPALIVE seconds without one.
+
+        The preview is released when the last subscriber goes away, so a
+        closed or crashed editor tab can't leave its scene on the rig.
+        """
+        with self._condition:
+            self._subscribers += 1
+            seen = self._applied_sequence
+        try:
+            yield self._applied_sequence, self._active
+            while True:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: self._applied_sequence != seen, timeout=self.KEEPALIVE
+                    )
+                    changed = self._applied_sequence != seen
+                    seen = self._applied_sequence
+                yield (seen, self._active) if changed else None
+        finally:
+            with self._condition:
+                self._subscribers -= 1
+                last = self._subscribers == 0
+            if last and self._active:
+                self.release()
+
+    def render(self, frame, now):
+        """
+        Apply pending updates and, while active, write the preview frame.
+
+        Args:
+            frame: numpy uint8 array of 512 channels to overwrite in place
+            now: the output thread's monotonic clock for this tick
+        """
+        # Unlocked peek: the common idle tick costs one comparison
+        if self._sequence != self._applied_sequence:
+            with self._condition:
+                pending, self._pending = self._pending, {}
+                reset, self._reset_pending = self._reset_pending, False
+                release, self._release_pending = self._release_pending, False
+                sequence = self._sequence
+
+            if release:
+                self._active = False
+            else:
+                if reset:
+                    self._values[:] = 0
+                if pending:
+                    self._values[list(pending.keys())] = list(pending.values())
+                self.expand_links(self._values)
+                self._active = True
+
+            with self._condition:
+                self._applied_sequence = sequence
+                self._condition.notify_all()
+
+        if self._active:
+            if self._subscribers == 0 and now - self._updated_at > self.UNWATCHED_TIMEOUT:
+                # Nobody is editing: hand the output back from the next tick
+                self.release()
+                return
+            frame[:] = self._values
@@ -0,0 +1,143 @@
+"""
+Scene Catalogue - Scenes indexed by name and group, held compactly
+"""
+import itertools
+import sys
+from collections.abc import Mapping
+
+
+class _Scene:
+    """One stored scene; channels are packed, fixture names interned"""
+
+    __slots__ = ('position', 'group', 'enabled', 'channels')
+
+    def __init__(self, position, group, enabled, channels):
+        self.position = position
+        self.group = group
+        self.enabled = enabled
+        self.channels = channels
+
+
+def _pack_channels(values):
+    """Channel values as bytes; anything that isn't a DMX value becomes 0"""
+    values = values or []
+    packed = bytearray(min(len(values), 512))
+    for channel, value in enumerate(values[:512]):
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 255:
+            packed[channel] = value
+    return bytes(packed)
+
+
+class SceneCatalogue(Mapping):
+    """
+    Every scene in the config by name, in config order, with an index of
+    each group's members.
+
+    A scene is kept as its group, its enabled fixture names and its channel
+    values packed into 512 bytes - about a tenth of the parsed JSON list -
+    and the fixture names are interned, so thousands of scenes enabling the
+    same fixtures share the strings. catalogue[name] builds the dict the
+    compositor reads, {'name', 'channels', 'enabledFixtures', 'group'},
+    only for the scenes being composed.
+
+    Each scene also knows its index in the config's scenes list, so saving
+    or deleting one needs no search (see ConfigManager.save_scene()).
+    """
+
+    def __init__(self, scenes=()):
+        self._scenes = {}  # name -> _Scene, in config order
+        self._groups = {}  # group -> {name: None}, an ordered set
+        for scene in scenes:
+            self.put(scene['name'], scene.get('channels', []),
+                     scene.get('enabledFixtures'), scene.get('group'))
+
+    def __getitem__(self, name):
+        scene = self._scenes[name]
+        return {
+            'name': name,
+            'channels': scene.channels,
+            'enabledFixtures': scene.enabled,
+            'group': scene.group,
+        }
+
+    def __contains__(self, name):
+        return name in self._scenes
+
+    def __iter__(self):
+        return iter(self._scenes)
+
+    def __len__(self):
+        return len(self._scenes)
+
+    def put(self, name, channels, enabled_fixtures=None, group=None):
+        """Add a scene at the end, or replace one in place"""
+        enabled = tuple(
+            sys.intern(fixture) for fixture in enabled_fixtures or () if isinstance(fixture, str)
+        )
+        existing = self._scenes.get(name)
+        if existing is None:
+            position = len(self._scenes)
+        else:
+            position = existing.position
+            self._groups[existing.group].pop(name, None)
+        self._scenes[name] = _Scene(position, group, enabled, _pack_channels(channels))
+        self._groups.setdefault(group, {})[name] = None
+
+    def remove(self, name):
+        """Drop a scene; later scenes move up a place, as in the config list"""
+        scene = self._scenes.pop(name, None)
+        if scene is None:
+            return
+        self._groups[scene.group].pop(name, None)
+        for other in self._scenes.values():
+            if other.position > scene.position:
+                other.position -= 1
+
+    def position(self, name):
+        """The scene's index in the config's scenes list, or None"""
+        scene = self._scenes.get(name)
+        return scene.position if scene is not None else None
+
+    def group_of(self, name):
+        scene = self._scenes.get(name)
+        return scene.group if scene is not None else None
+
+    def as_json(self, name):
+        """The scene as stored in the config, or None if there is no such scene"""
+        scene = self._scenes.get(name)
+        if scene is None:
+            return None
+        return {
+            'name': name,
+            'channels': list(scene.channels),
+            'enabledFixtures': list(scene.enabled),
+            'group': scene.group,
+        }
+
+    def group_names(self, group):
+        """The names of a group's scenes in config order (the index tracks membership)"""
+        members = self._groups.get(group, {})
+        return sorted(members, key=lambda name: self._scenes[name].position)
+
+    def groups(self):
+        """{group: [names in config order]} for every group that has scenes"""
+        return {group: self.group_names(group) for group, members in self._groups.items() if members}
+
+    def page(self, offset=0, limit=None, group=None, query=None):
+        """
+        One page of scene names in config order, and how many match in all.
+
+        Args:
+            group: only this group's scenes (looked up in the group index)
+            query: only names containing this text, case-insensitively
+        Returns: (names, total)
+        """
+        names = self._scenes if group is None else self.group_names(group)
+        if query:
+            needle = query.casefold()
+            names = [name for name in names if needle in name.casefold()]
+        end = None if limit is None else offset + limit
+        if isinstance(names, dict):
+            # Unfiltered: slice without copying the whole name list
+            return list(itertools.islice(names, offset, end)), len(names)
+        return names[offset:end], len(names)
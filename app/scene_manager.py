@@ -1,7 +1,12 @@
 """
 Scene Manager - Handles scene logic and DMX buffer building
 """
+import threading
+import time
+
 from flask import current_app
+from app import metrics
+from app.scene_catalogue import SceneCatalogue
 
 
 # Groups where only one member may be active at a time. Any group not in
@@ -17,26 +22,90 @@ class SceneManager:
         self.config_manager = config_manager
         self.active_layers = {}  # scene_name -> True, insertion-ordered (oldest first)
         self.highest_active_idx = 0
-        self.scenes = {}  # Cache of scene name -> full scene dict
+        self.scenes = SceneCatalogue()  # Every scene, by name and group
+        self.fixtures = []  # Cache of the fixture list, as of load_scenes()
+        # Linked-fixture copy map: master name -> [(master start, slave
+        # start, count), ...], all 0-based. See _compile_copy_map.
+        self.copy_map = {}
+        # Held while the layers change or a frame is composed, so a reload
+        # swaps scenes and fixtures in between, never in the middle
+        self._lock = threading.Lock()
+
+    def load_scenes(self, config=None):
+        """
+        Load scenes, and the fixtures they are composed against, from
+        configuration (`config` if it has already been read).
 
-    def load_scenes(self):
-        """Load scenes from configuration"""
+        Everything is compiled first and swapped in together, so a toggle
+        composes against either the old set or the new one. Active layers
+        are kept, except those whose scene no longer exists.
+        """
         try:
-            scenes_list = self.config_manager.get_scenes()
-            self.scenes = {scene['name']: scene for scene in scenes_list}
-            # Drop any active layers referring to scenes that no longer exist
-            self.active_layers = {
-                name: True for name in self.active_layers if name in self.scenes
-            }
+            if config is None:
+                config = self.config_manager.read()
+            fixtures = config.get('fixtures', [])
+            copy_map = self._compile_copy_map(fixtures)
+            scenes = SceneCatalogue(config.get('scenes', []))
+            with self._lock:
+                self.fixtures = fixtures
+                self.copy_map = copy_map
+                self.scenes = scenes
+                # Drop any active layers referring to scenes that no longer exist
+                self.active_layers = {
+                    name: True for name in self.active_layers if name in scenes
+                }
             return True
         except Exception as e:
             if current_app:
                 current_app.logger.error(f"Error loading scenes: {e}")
             return False
 
+    @staticmethod
+    def _compile_copy_map(fixtures):
+        """
+        Compile fixture links into the copy map the compositor fans out with.
+
+        Scenes store values for a master fixture only; every fixture linked
+        to it receives a copy of the master's range at composition time, so
+        linked fixtures can never drift apart. Each copy is a (master start,
+        slave start, count) slice triple; a slave with fewer channels than
+        its master gets the leading part of the master's range.
+        """
+        by_name = {fixture.get('name'): fixture for fixture in fixtures}
+        copy_map = {}
+        for fixture in fixtures:
+            master = by_name.get(fixture.get('linked_to'))
+            if master is None or master is fixture:
+                continue
+            source = master.get('start_channel', 1) - 1  # 0-based
+            target = fixture.get('start_channel', 1) - 1
+            count = min(
+                master.get('channel_count', 1), fixture.get('channel_count', 1),
+                512 - source, 512 - target,
+            )
+            if source < 0 or target < 0 or count <= 0:
+                continue
+            copy_map.setdefault(master['name'], []).append((source, target, count))
+        return copy_map
+
+    def is_linked_slave(self, fixture_name):
+        """Whether a fixture follows a master rather than holding its own values"""
+        fixture = next((f for f in self.fixtures if f.get('name') == fixture_name), None)
+        return fixture is not None and fixture.get('linked_to') in self.copy_map
+
+    def expand_links(self, buffer):
+        """Copy every master fixture's range onto its linked fixtures (in place)"""
+        for copies in self.copy_map.values():
+            for source, target, count in copies:
+                buffer[target:target + count] = buffer[source:source + count]
+
     def get_available_scenes(self):
         """Get list of available scene names"""
-        return list(self.scenes.keys())
+        return list(self.scenes)
+
+    def list_scenes(self, offset=0, limit=None, group=None, query=None):
+        """One page of scene names, filtered; see SceneCatalogue.page(). Returns (names, total)."""
+        return self.scenes.page(offset, limit, group, query)
 
     def get_active_scenes(self):
         """Get the list of currently active scene names, oldest layer first"""
@@ -51,8 +120,13 @@ class SceneManager:
         """Get the highest active DMX channel index"""
         return self.highest_active_idx
 
-    def _apply_scene(self, buffer, scene):
-        """Apply one scene's channel values onto an existing buffer (in place)"""
+    def _apply_scene(self, buffer, scene, claimed=None):
+        """
+        Apply one scene's channel values onto an existing buffer (in place).
+
+        If `claimed` is given (a bytearray(512)), every channel this scene
+        writes is marked in it as well.
+        """
         channel_values = scene['channels']
         enabled_fixtures = scene.get('enabledFixtures') or []
 
@@ -62,13 +136,27 @@ class SceneManager:
             for channel, value in enumerate(channel_values):
                 if 0 <= channel < 512 and value:
                     buffer[channel] = value
+                    if claimed is not None:
+                        claimed[channel] = 1
                     self.highest_active_idx = max(self.highest_active_idx, channel)
+            # Linked fixtures follow their master's non-zero channels too
+            for copies in self.copy_map.values():
+                for source, target, count in copies:
+                    for i, value in enumerate(channel_values[source:source + count]):
+                        if value:
+                            buffer[target + i] = value
+                            if claimed is not None:
+                                claimed[target + i] = 1
+                            self.highest_active_idx = max(self.highest_active_idx, target + i)
             return
 
-        fixtures = self.config_manager.get_fixtures()
-        for fixture in fixtures:
-            if fixture.get('name', '') not in enabled_fixtures:
+        enabled_masters = []
+        for fixture in self.fixtures:
+            name = fixture.get('name', '')
+            if name not in enabled_fixtures:
                 continue
+            if name in self.copy_map:
+                enabled_masters.append(name)
 
             start_channel = fixture.get('start_channel', 1) - 1  # 0-based
             channel_count = fixture.get('channel_count', 1)
@@ -79,6 +167,33 @@ class SceneManager:
                 channel = start_channel + i
                 if 0 <= channel < 512 and channel < len(channel_values):
                     buffer[channel] = channel_values[channel]
+                    if claimed is not None:
+                        claimed[channel] = 1
+
+        # Fan each enabled master out to its linked fixtures. This runs after
+        # every fixture has been written, so it also overrides whatever an
+        # older scene stored for a slave itself.
+        for name in enabled_masters:
+            for source, target, count in self.copy_map[name]:
+                buffer[target:target + count] = buffer[source:source + count]
+                if claimed is not None:
+                    claimed[target:target + count] = b'\x01' * count
+                self.highest_active_idx = max(self.highest_active_idx, target + count - 1)
+
+    def restore_layers(self, names):
+        """
+        Make `names` (oldest first) the active layers, as saved by LiveState,
+        skipping any scene that no longer exists, and return the buffer
+        they compose to.
+        """
+        with self._lock:
+            self.active_layers = {name: True for name in names if name in self.scenes}
+            return self._rebuild_buffer()
+
+    def recompose(self):
+        """Rebuild the buffer from the active layers as they stand, e.g. after a reload"""
+        with self._lock:
+            return self._rebuild_buffer()
 
     def _rebuild_buffer(self):
         """Recompute the full 512-channel buffer from all currently active layers"""
@@ -90,6 +205,25 @@ class SceneManager:
                 self._apply_scene(buffer, scene)
         return buffer
 
+    def compose_scenes(self, scene_names):
+        """
+        Compose an arbitrary list of scenes, in order, without touching the
+        active layer set - used to precompute cue frames.
+
+        Returns: (buffer, claimed) - the composed bytearray(512), and a
+        bytearray(512) with 1 for every channel any of the scenes wrote.
+        Unknown scene names raise KeyError.
+        """
+        buffer = bytearray(512)
+        claimed = bytearray(512)
+        with self._lock:
+            highest_active_idx = self.highest_active_idx
+            for name in scene_names:
+                self._apply_scene(buffer, self.scenes[name], claimed)
+            # Composing off to the side must not disturb what the monitor reports
+            self.highest_active_idx = highest_active_idx
+        return buffer, claimed
+
     def toggle_scene(self, scene_name):
         """
         Toggle a scene on or off and rebuild the DMX buffer from all
@@ -104,50 +238,87 @@ class SceneManager:
 
         Returns: (buffer, success, active_scene_names)
         """
-        if scene_name not in self.scenes:
-            if current_app:
-                current_app.logger.error(f"Scene '{scene_name}' not found")
-            return None, False, self.get_active_scenes()
+        return self.set_scene_active(scene_name, scene_name not in self.active_layers)
 
-        try:
-            if scene_name in self.active_layers:
-                del self.active_layers[scene_name]
-            else:
-                group = self.scenes[scene_name].get('group')
-                if group in EXCLUSIVE_GROUPS:
-                    for other in list(self.active_layers):
-                        if self.scenes.get(other, {}).get('group') == group:
-                            del self.active_layers[other]
-                self.active_layers[scene_name] = True
-
-            buffer = self._rebuild_buffer()
+    def set_scene_active(self, scene_name, active):
+        """
+        Turn a scene on or off explicitly and rebuild the DMX buffer, with
+        the same group rules as toggle_scene(). Turning on an already-active
+        scene (or off an inactive one) leaves the layers as they are, which
+        is what a scheduled trigger wants where a click wants a toggle.
 
-            if current_app:
-                current_app.logger.info(f"Active layers now: {list(self.active_layers.keys())}")
+        Returns: (buffer, success, active_scene_names)
+        """
+        with self._lock:
+            if scene_name not in self.scenes:
+                if current_app:
+                    current_app.logger.error(f"Scene '{scene_name}' not found")
+                return None, False, self.get_active_scenes()
 
-            return buffer, True, self.get_active_scenes()
+            try:
+                started = time.perf_counter()
+                if not active:
+                    self.active_layers.pop(scene_name, None)
+                elif scene_name not in self.active_layers:
+                    # Only the active layers are looked at, however many scenes
+                    # the catalogue holds
+                    group = self.scenes.group_of(scene_name)
+                    if group in EXCLUSIVE_GROUPS:
+                        for other in list(self.active_layers):
+                            if self.scenes.group_of(other) == group:
+                                del self.active_layers[other]
+                    self.active_layers[scene_name] = True
 
-        except Exception as e:
-            if current_app:
-                current_app.logger.error(f"Error toggling scene: {e}")
-            return None, False, self.get_active_scenes()
+                buffer = self._rebuild_buffer()
+                metrics.SCENE_TOGGLE.observe(time.perf_counter() - started)
+
+                if current_app:
+                    current_app.logger.info(f"Active layers now: {list(self.active_layers.keys())}")
+
+                return buffer, True, self.get_active_scenes()
+
+            except Exception as e:
+                if current_app:
+                    current_app.logger.error(f"Error toggling scene: {e}")
+                return None, False, self.get_active_scenes()
+
+    def strip_linked_values(self, channels, enabled_fixtures):
+        """
+        Drop what a scene holds for linked fixtures before it is stored.
+
+        Their channels are zeroed and they are removed from enabledFixtures:
+        a linked fixture's output always comes from its master via the copy
+        map, so storing it as well would only be a copy that could go stale.
+
+        Returns: (channels, enabled_fixtures) - new lists; inputs are untouched
+        """
+        channels = list(channels)
+        for copies in self.copy_map.values():
+            for _, target, count in copies:
+                for channel in range(target, min(target + count, len(channels))):
+                    channels[channel] = 0
+
+        if enabled_fixtures is not None:
+            enabled_fixtures = [
+                name for name in enabled_fixtures if not self.is_linked_slave(name)
+            ]
+        return channels, enabled_fixtures
 
     def save_scene(self, name, channels, enabled_fixtures=None, group=None):
-        """Save a scene (delegates to config manager)"""
-        success = self.config_manager.save_scene(name, channels, enabled_fixtures, group)
-        if success:
-            self.scenes[name] = {
-                'name': name,
-                'channels': channels,
-                'enabledFixtures': enabled_fixtures if enabled_fixtures is not None else [],
-                'group': group,
-            }
+        """Save a scene (delegates to config manager), storing master values only"""
+        channels, enabled_fixtures = self.strip_linked_values(channels, enabled_fixtures)
+        with self._lock:
+            success = self.config_manager.save_scene(name, channels, enabled_fixtures, group,
+                                                     position=self.scenes.position(name))
+            if success:
+                self.scenes.put(name, channels, enabled_fixtures, group)
         return success
 
     def delete_scene(self, name):
         """Delete a scene (delegates to config manager)"""
-        success = self.config_manager.delete_scene(name)
-        if success:
-            self.scenes.pop(name, None)
-            self.active_layers.pop(name, None)
+        with self._lock:
+            success = self.config_manager.delete_scene(name, position=self.scenes.position(name))
+            if success:
+                self.scenes.remove(name)
+                self.active_layers.pop(name, None)
         return success
@@ -0,0 +1,162 @@
+"""
+Scheduler - Time-of-day scene and cue triggers
+"""
+import datetime
+import heapq
+import itertools
+import threading
+import time
+
+from flask import current_app
+
+
+# Day names accepted in a trigger's `days`, in datetime.weekday() order
+DAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def parse_time_of_day(value):
+    """Parse 'HH:MM' into a datetime.time, raising ValueError if malformed"""
+    hours, minutes = value.split(':')
+    return datetime.time(int(hours), int(minutes))
+
+
+def next_fire_time(trigger, after):
+    """
+    Next local datetime strictly after `after` at which a trigger fires.
+
+    Args:
+        trigger: definition with 'at' ('HH:MM') and optional 'days' (a list
+            of DAYS entries; omitted or empty means every day)
+        after: naive local datetime
+    """
+    at = parse_time_of_day(trigger['at'])
+    days = {DAYS.index(day) for day in trigger.get('days') or DAYS}
+    candidate = datetime.datetime.combine(after.date(), at)
+    if candidate <= after:
+        candidate += datetime.timedelta(days=1)
+    while candidate.weekday() not in days:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+class Scheduler:
+    """
+    Fires daily and weekly triggers from a heap ordered by next fire time.
+
+    The thread sleeps on a condition until the earliest deadline (or until
+    the schedule is replaced), fires it, and pushes that trigger back with
+    its following fire time. Nothing is persisted beyond the definitions:
+    after a restart every next fire time is recomputed from the clock, and
+    a trigger whose time passed while the process was down is not replayed.
+    """
+
+    # Longest single sleep. Deadlines are wall-clock times while the sleep
+    # itself is monotonic, so waking at least this often lets a clock step
+    # (NTP settling after boot, a manual change) be noticed.
+    MAX_SLEEP = 300.0
+    # A deadline missed by more than this (the clock jumped forward, or the
+    # machine was suspended) is skipped rather than fired late.
+    MISFIRE_GRACE = 60.0
+
+    def __init__(self, apply_trigger):
+        """
+        Args:
+            apply_trigger: callable taking one trigger definition, invoked on
+                the scheduler thread when that trigger fires
+        """
+        self.apply_trigger = apply_trigger
+        self._condition = threading.Condition()
+        self._heap = []  # (fire timestamp, tie-breaker, fire datetime, trigger)
+        self._counter = itertools.count()
+        self._thread = None
+        self._running = False
+
+    def load_schedule(self, definitions):
+        """Replace the schedule, computing every trigger's next fire time from now"""
+        now = datetime.datetime.now()
+        heap = []
+        for trigger in definitions:
+            if not trigger.get('enabled', True):
+                continue
+            try:
+                fire_at = next_fire_time(trigger, now)
+            except (KeyError, TypeError, ValueError) as e:
+                if current_app:
+                    current_app.logger.error(
+                        f"Skipping schedule trigger '{trigger.get('name')}': {e}"
+                    )
+                continue
+            heap.append((fire_at.timestamp(), next(self._counter), fire_at, trigger))
+        heapq.heapify(heap)
+
+        with self._condition:
+            self._heap = heap
+            self._condition.notify()
+        return True
+
+    def get_upcoming(self):
+        """Get every scheduled trigger with its next fire time, soonest first"""
+        with self._condition:
+            entries = sorted(self._heap)
+        return [
+            {'name': trigger.get('name'), 'next_fire': fire_at.isoformat(timespec='minutes')}
+            for _, _, fire_at, trigger in entries
+        ]
+
+    def start(self):
+        """Start the scheduler thread"""
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the scheduler thread"""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _run(self):
+        """Sleep until the next deadline, fire it, reschedule it, repeat"""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                timestamp, _, fire_at, trigger = self._heap[0]
+                delay = timestamp - time.time()
+                if delay > 0:
+                    # Re-check from the top after waking: the deadline may
+                    # have arrived, or the schedule may have been replaced.
+                    self._condition.wait(timeout=min(delay, self.MAX_SLEEP))
+                    continue
+
+                following = next_fire_time(trigger, fire_at)
+                heapq.heapreplace(
+                    self._heap,
+                    (following.timestamp(), next(self._counter), following, trigger)
+                )
+
+            # Fire outside the lock, so a slow trigger can't block a reload
+            if -delay > self.MISFIRE_GRACE:
+                if current_app:
+                    current_app.logger.warning(
+                        f"Skipped schedule trigger '{trigger.get('name')}' due at "
+                        f"{fire_at.isoformat(timespec='minutes')} (missed by {-delay:.0f}s)"
+                    )
+                continue
+            try:
+                self.apply_trigger(trigger)
+            except Exception as e:
+                if current_app:
+                    current_app.logger.error(
+                        f"Error firing schedule trigger '{trigger.get('name')}': {e}"
+                    )
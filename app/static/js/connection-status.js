@@ -1,5 +1,5 @@
 // Connection status monitoring
-// Can be included on any page that needs to show Art-Net connection status
+// Can be included on any page that needs to show DMX output connection status
 
 document.addEventListener('DOMContentLoaded', function() {
     const statusIndicator = document.getElementById('statusIndicator');
@@ -10,16 +10,27 @@ document.addEventListener('DOMContentLoaded', function() {
         return;
     }
     
+    // Display names of the output backends
+    const PROTOCOL_NAMES = {
+        artnet: 'Art-Net',
+        sacn: 'sACN',
+        capture: 'Capture',
+        null: 'Output Off'
+    };
+    
     function checkConnectionStatus() {
         fetch('/api/connection/status')
             .then(response => response.json())
             .then(data => {
+                const protocol = PROTOCOL_NAMES[data.backend] || 'DMX Output';
                 if (data.connected) {
                     statusIndicator.className = 'status-indicator connected';
-                    statusText.textContent = 'Art-Net Connected';
+                    statusText.textContent = `${protocol} Connected`;
                 } else {
                     statusIndicator.className = 'status-indicator disconnected';
-                    statusText.textContent = 'Art-Net Host Down';
+                    statusText.textContent = data.backoff_interval
+                        ? `${protocol} Host Down (retrying every ${data.backoff_interval}s)`
+                        : `${protocol} Host Down`;
                 }
             })
             .catch(error => {
@@ -1,5 +1,10 @@
 // Fixtures setup JavaScript
 
+// Every fixture type's channel definitions in one response. The page is
+// rendered with a URL versioned by the catalogue's content hash, so the
+// browser keeps it until the catalogue changes.
+const fixtureProfilesUrl = document.currentScript.dataset.fixtureProfiles || '/setup/api/fixture-profiles';
+
 document.addEventListener('DOMContentLoaded', function() {
     // DOM elements
     const fixtureList = document.getElementById('fixture-list');
@@ -18,6 +23,7 @@ document.addEventListener('DOMContentLoaded', function() {
     // State
     let fixtures = [];
     let editingFixtureIndex = -1;
+    let fixtureProfiles = null; // Promise of {type name: {channels: [...]}}
     
     // Initialize
     loadFixtures();
@@ -35,7 +41,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Functions
     function loadFixtures() {
-        fetch('/setup/api/config')
+        // Only the section this page edits; the browser revalidates it with
+        // the ETag, so an unchanged config costs an empty 304
+        fetch('/setup/api/config?fields=fixtures')
             .then(response => response.json())
             .then(data => {
                 fixtures = data.fixtures || [];
@@ -122,12 +130,26 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
+    function getFixtureType(fixtureType) {
+        // Fetched on first use and shared by every later lookup
+        if (!fixtureProfiles) {
+            fixtureProfiles = fetch(fixtureProfilesUrl)
+                .then(response => response.json())
+                .then(data => data.types)
+                .catch(error => {
+                    fixtureProfiles = null; // Try again next time
+                    throw error;
+                });
+        }
+        // Unknown types fall back to Generic, as on the server
+        return fixtureProfiles.then(types => types[fixtureType] || types['Generic']);
+    }
+    
     function updateChannelList() {
         const fixtureType = fixtureTypeSelect.value;
         
         // Get channel configuration for this fixture type
-        fetch(`/setup/api/fixture-types/${fixtureType}`)
-            .then(response => response.json())
+        getFixtureType(fixtureType)
             .then(data => {
                 renderChannelList(data.channels);
             })
@@ -210,8 +232,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const fixtureType = fixtureTypeSelect.value;
         
         // Get channel count for this fixture type
-        fetch(`/setup/api/fixture-types/${fixtureType}`)
-            .then(response => response.json())
+        getFixtureType(fixtureType)
             .then(data => {
                 const channelCount = data.channels.length;
                 
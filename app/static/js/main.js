@@ -1,17 +1,75 @@
 // Main JavaScript for scene selection interface
 
 document.addEventListener('DOMContentLoaded', function() {
-    // Get all scene buttons
-    const sceneButtons = document.querySelectorAll('.scene-button');
+    // Get all scene and effect buttons
+    const sceneButtons = document.querySelectorAll('.scene-button[data-scene]');
+    const effectButtons = document.querySelectorAll('.effect-button');
+    const sceneContainer = document.querySelector('.scene-container');
+    const sceneFilter = document.getElementById('scene-filter');
 
-    // Add click handlers to scene buttons
-    sceneButtons.forEach(button => {
+    // Buttons by scene name, so marking the active scenes touches only the
+    // buttons whose state changes, however many scenes the page holds
+    const sceneButtonsByName = new Map();
+    sceneButtons.forEach(btn => sceneButtonsByName.set(btn.getAttribute('data-scene'), btn));
+    let shownActiveScenes = new Set();
+
+    // The buttons are rendered once and shared by every page load, so the
+    // active ones are marked here, from the lists the page was served with
+    showActiveScenes(JSON.parse(sceneContainer.dataset.activeScenes || '[]'));
+    showActiveEffects(JSON.parse(sceneContainer.dataset.activeEffects || '[]'));
+
+    // One click handler for every scene button
+    sceneContainer.addEventListener('click', function(event) {
+        const button = event.target.closest('.scene-button[data-scene]');
+        if (button) {
+            toggleScene(button.getAttribute('data-scene'));
+        }
+    });
+
+    effectButtons.forEach(button => {
         button.addEventListener('click', function() {
-            const sceneName = this.getAttribute('data-scene');
-            toggleScene(sceneName);
+            toggleEffect(this.getAttribute('data-effect'));
         });
     });
 
+    if (sceneFilter) {
+        sceneFilter.addEventListener('input', filterScenes);
+    }
+
+    function showActiveScenes(sceneNames) {
+        const activeScenes = new Set(sceneNames);
+        shownActiveScenes.forEach(name => {
+            const btn = sceneButtonsByName.get(name);
+            if (btn && !activeScenes.has(name)) btn.classList.remove('active');
+        });
+        activeScenes.forEach(name => {
+            const btn = sceneButtonsByName.get(name);
+            if (btn) btn.classList.add('active');
+        });
+        shownActiveScenes = activeScenes;
+    }
+
+    function filterScenes() {
+        // Hide the scenes whose name doesn't contain the filter text, and
+        // every group left without a visible scene
+        const needle = sceneFilter.value.trim().toLowerCase();
+        sceneButtons.forEach(btn => {
+            const matches = !needle || btn.getAttribute('data-scene').toLowerCase().includes(needle);
+            btn.hidden = !matches;
+        });
+        sceneContainer.querySelectorAll('.scene-group').forEach(group => {
+            if (group.classList.contains('scene-group-effects')) return;
+            group.hidden = !group.querySelector('.scene-button[data-scene]:not([hidden])');
+        });
+    }
+
+    function showActiveEffects(effectNames) {
+        const activeEffects = new Set(effectNames);
+        effectButtons.forEach(btn => {
+            btn.classList.toggle('active', activeEffects.has(btn.getAttribute('data-effect')));
+        });
+    }
+
     // Function to toggle a scene on/off. The server rebuilds the DMX buffer
     // from every currently active scene and returns the full active list, so
     // the UI just mirrors that list rather than guessing locally.
@@ -26,10 +84,7 @@ document.addEventListener('DOMContentLoaded', function() {
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                const activeScenes = new Set(data.active_scenes || []);
-                sceneButtons.forEach(btn => {
-                    btn.classList.toggle('active', activeScenes.has(btn.getAttribute('data-scene')));
-                });
+                showActiveScenes(data.active_scenes || []);
             } else {
                 alert('Failed to activate scene: ' + data.message);
             }
@@ -39,4 +94,28 @@ document.addEventListener('DOMContentLoaded', function() {
             alert('Error activating scene. See console for details.');
         });
     }
+
+    // Effects run on top of whatever scenes are active; like scenes, the
+    // server returns every running effect and the buttons mirror that list.
+    function toggleEffect(effectName) {
+        fetch('/api/effects/toggle', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ effect: effectName })
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                showActiveEffects(data.active_effects || []);
+            } else {
+                alert('Failed to toggle effect: ' + data.message);
+            }
+        })
+        .catch(error => {
+            console.error('Error toggling effect:', error);
+            alert('Error toggling effect. See console for details.');
+        });
+    }
 });
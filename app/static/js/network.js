@@ -3,21 +3,111 @@
 document.addEventListener('DOMContentLoaded', function() {
     // Get network form
     const networkForm = document.getElementById('network-form');
+    const backendSelect = document.getElementById('output-backend');
+    
+    // Show only the selected backend's settings
+    function showBackendSettings() {
+        document.querySelectorAll('.backend-settings').forEach(section => {
+            section.style.display = section.dataset.backend === backendSelect.value ? '' : 'none';
+        });
+    }
+    backendSelect.addEventListener('change', showBackendSettings);
+    showBackendSettings();
+    
+    // Read each backend's settings from its fields
+    const backendSettings = {
+        artnet: () => ({
+            ip: document.getElementById('artnet-ip').value,
+            port: parseInt(document.getElementById('artnet-port').value),
+            universe: parseInt(document.getElementById('artnet-universe').value),
+            nodes: document.getElementById('artnet-nodes').value
+                .split(/[\s,]+/)
+                .filter(node => node !== ''),
+            discovery: document.getElementById('artnet-discovery').checked
+        }),
+        sacn: () => ({
+            universe: parseInt(document.getElementById('sacn-universe').value),
+            priority: parseInt(document.getElementById('sacn-priority').value),
+            source_name: document.getElementById('sacn-source-name').value,
+            interface: document.getElementById('sacn-interface').value.trim(),
+            preview: document.getElementById('sacn-preview').checked
+        }),
+        capture: () => ({
+            path: document.getElementById('capture-path').value.trim(),
+            forward: document.getElementById('capture-forward').value
+        }),
+        null: () => ({})
+    };
+    
+    // List the nodes discovery has found, refreshed while the page is open
+    const discoveredList = document.getElementById('artnet-discovered');
+    function refreshDiscoveredNodes() {
+        fetch('/setup/api/network/nodes')
+            .then(response => response.json())
+            .then(data => {
+                discoveredList.innerHTML = '';
+                if (!data.polling) {
+                    return;
+                }
+                if (data.nodes.length === 0) {
+                    const item = document.createElement('li');
+                    item.textContent = data.listening
+                        ? 'No nodes have answered yet'
+                        : 'Not listening: the Art-Net port is in use by another program';
+                    discoveredList.appendChild(item);
+                    return;
+                }
+                data.nodes.forEach(node => {
+                    const item = document.createElement('li');
+                    item.textContent = `${node.ip} ${node.name ? '(' + node.name + ')' : ''} `
+                        + `universes ${node.universes.join(', ') || 'none'}`;
+                    discoveredList.appendChild(item);
+                });
+            })
+            .catch(error => console.error('Error fetching Art-Net nodes:', error));
+    }
+    refreshDiscoveredNodes();
+    setInterval(refreshDiscoveredNodes, 5000);
+    
+    // Show which console the input is following, if any
+    const inputStatus = document.getElementById('input-status');
+    function refreshInputStatus() {
+        fetch('/setup/api/network/input')
+            .then(response => response.json())
+            .then(status => {
+                if (!status || !status.enabled) {
+                    inputStatus.textContent = '';
+                } else if (status.source) {
+                    inputStatus.textContent = `Following ${status.source}.`;
+                } else {
+                    inputStatus.textContent = 'No console is sending.';
+                }
+            })
+            .catch(error => console.error('Error fetching Art-Net input status:', error));
+    }
+    refreshInputStatus();
+    setInterval(refreshInputStatus, 5000);
     
     // Add submit handler
     networkForm.addEventListener('submit', function(e) {
         e.preventDefault();
         
         // Get form data
+        const backend = backendSelect.value;
         const formData = {
-            artnet_ip: document.getElementById('artnet-ip').value,
-            artnet_port: parseInt(document.getElementById('artnet-port').value),
-            universe: parseInt(document.getElementById('artnet-universe').value),
-            refresh_rate: parseInt(document.getElementById('refresh-rate').value)
+            backend: backend,
+            [backend]: backendSettings[backend](),
+            refresh_rate: parseInt(document.getElementById('refresh-rate').value),
+            input: {
+                enabled: document.getElementById('input-enabled').checked,
+                universe: parseInt(document.getElementById('input-universe').value),
+                merge: document.getElementById('input-merge').value,
+                timeout: parseFloat(document.getElementById('input-timeout').value)
+            }
         };
         
         // Validate form data
-        if (!formData.artnet_ip) {
+        if (backend === 'artnet' && !formData.artnet.ip) {
             alert('IP address is required');
             return;
         }
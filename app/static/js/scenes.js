@@ -1,5 +1,15 @@
 // Scenes setup JavaScript
 
+// Every fixture type's channel definitions in one response. The page is
+// rendered with a URL versioned by the catalogue's content hash, so the
+// browser keeps it until the catalogue changes.
+const fixtureProfilesUrl = document.currentScript.dataset.fixtureProfiles || '/setup/api/fixture-profiles';
+
+// Scene names listed per request. The list is paged and searched on the
+// server, and a scene's channels are fetched only when it is opened, so
+// the page stays light however many scenes there are.
+const SCENE_PAGE_SIZE = 100;
+
 document.addEventListener('DOMContentLoaded', function() {
     // DOM elements
     const sceneList = document.getElementById('scene-list');
@@ -11,42 +21,65 @@ document.addEventListener('DOMContentLoaded', function() {
     const cancelEditBtn = document.getElementById('cancel-edit');
     const fixtureControls = document.getElementById('fixture-controls');
     const sceneCounter = document.getElementById('scene-counter');
+    const sceneSearch = document.getElementById('scene-search');
+    const sceneListMore = document.getElementById('scene-list-more');
     
     // State
-    let scenes = [];
+    let sceneNames = []; // The names listed so far, for the current search
+    let sceneMatches = 0; // How many scenes match the current search
+    let sceneCount = 0; // How many scenes there are in all
+    let sceneSearchTimer = null;
     let fixtures = [];
-    let fixtureTypes = {}; // Cache for fixture types
+    let fixtureTypes = {}; // Channel definitions by fixture type name
     let editingSceneName = null;
     let maxScenes = 10;
     
+    // Live preview state: the frame last sent (null until a preview is
+    // started), plus flags coalescing slider events into single requests
+    let previewSent = null;
+    let previewScheduled = false;
+    let previewInFlight = false;
+    let previewDirty = false;
+    
     // Initialize
     loadData();
+    openPreviewStream();
     
     // Event listeners
     addSceneBtn.addEventListener('click', createNewScene);
     deleteSceneBtn.addEventListener('click', deleteScene);
-    testSceneBtn.addEventListener('click', testScene);
+    testSceneBtn.addEventListener('click', restartPreview);
     cancelEditBtn.addEventListener('click', cancelEdit);
     sceneForm.addEventListener('submit', saveScene);
+    sceneListMore.addEventListener('click', () => loadScenePage(false));
+    sceneSearch.addEventListener('input', function() {
+        // Search once typing pauses, not on every keystroke
+        clearTimeout(sceneSearchTimer);
+        sceneSearchTimer = setTimeout(() => loadScenePage(true), 200);
+    });
     
     // Functions
     function loadData() {
-        fetch('/setup/api/config')
-            .then(response => response.json())
-            .then(data => {
-                scenes = data.scenes || [];
+        // Only the sections the editor needs; the browser revalidates them
+        // with the ETag, so an unchanged config costs an empty 304
+        Promise.all([
+            fetch('/setup/api/config?fields=MAX_SCENES,fixtures').then(response => response.json()),
+            fetch(fixtureProfilesUrl).then(response => response.json()),
+            fetchScenePage(0, '')
+        ])
+            .then(([data, profiles, page]) => {
                 fixtures = data.fixtures || [];
                 maxScenes = data.MAX_SCENES || 10;
-                
-                // Preload fixture types for better performance
-                preloadFixtureTypes();
+                fixtureTypes = profiles.types || {};
+                sceneNames = page.scenes;
+                sceneMatches = sceneCount = page.total;
                 
                 renderSceneList();
                 updateSceneCounter();
                 
                 // Auto-select first scene if available, otherwise create new scene
-                if (scenes.length > 0) {
-                    editScene(scenes[0].name);
+                if (sceneNames.length > 0) {
+                    editScene(sceneNames[0]);
                 } else {
                     createNewScene();
                 }
@@ -57,29 +90,64 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
     
+    function fetchScenePage(offset, query) {
+        const params = new URLSearchParams({offset: offset, limit: SCENE_PAGE_SIZE});
+        if (query) params.set('q', query);
+        return fetch(`/api/scenes?${params}`).then(response => response.json());
+    }
+    
+    function fetchScene(sceneName) {
+        // One scene's full definition, or null if there is no such scene
+        return fetch(`/setup/api/config/scenes/${encodeURIComponent(sceneName)}`)
+            .then(response => response.status === 404 ? null : response.json());
+    }
+    
+    function loadScenePage(reset) {
+        // The first page of the current search (reset), or the next one
+        const query = sceneSearch.value.trim();
+        fetchScenePage(reset ? 0 : sceneNames.length, query)
+            .then(page => {
+                if (query !== sceneSearch.value.trim()) return; // Superseded
+                sceneNames = reset ? page.scenes : sceneNames.concat(page.scenes);
+                sceneMatches = page.total;
+                if (!query) sceneCount = page.total;
+                renderSceneList();
+                updateSceneCounter();
+            })
+            .catch(error => {
+                console.error('Error loading scenes:', error);
+            });
+    }
+    
     function updateSceneCounter() {
-        sceneCounter.textContent = `(${scenes.length}/${maxScenes})`;
+        sceneCounter.textContent = `(${sceneCount}/${maxScenes})`;
         
         // Disable add button if max scenes reached
-        addSceneBtn.disabled = scenes.length >= maxScenes;
+        addSceneBtn.disabled = sceneCount >= maxScenes;
     }
     
     function renderSceneList() {
         sceneList.innerHTML = '';
+        sceneListMore.hidden = sceneNames.length >= sceneMatches;
         
-        if (scenes.length === 0) {
-            sceneList.innerHTML = '<p class="no-scenes">No scenes configured yet.</p>';
+        if (sceneNames.length === 0) {
+            sceneList.innerHTML = sceneSearch.value.trim()
+                ? '<p class="no-scenes">No scenes match.</p>'
+                : '<p class="no-scenes">No scenes configured yet.</p>';
             return;
         }
         
-        scenes.forEach(scene => {
+        const items = document.createDocumentFragment();
+        sceneNames.forEach(name => {
             const sceneEl = document.createElement('div');
             sceneEl.className = 'scene-item';
-            sceneEl.textContent = scene.name;
-            sceneEl.setAttribute('data-scene', scene.name);
-            sceneEl.addEventListener('click', () => editScene(scene.name));
-            sceneList.appendChild(sceneEl);
+            sceneEl.textContent = name;
+            sceneEl.setAttribute('data-scene', name);
+            if (name === editingSceneName) sceneEl.classList.add('active');
+            sceneEl.addEventListener('click', () => editScene(name));
+            items.appendChild(sceneEl);
         });
+        sceneList.appendChild(items);
     }
     
     function createNewScene() {
@@ -100,29 +168,33 @@ document.addEventListener('DOMContentLoaded', function() {
     function editScene(sceneName) {
         editingSceneName = sceneName;
         
-        // Find scene in array
-        const scene = scenes.find(s => s.name === sceneName);
-        if (!scene) return;
-        
-        sceneNameInput.value = scene.name;
-        
         // Set active state in scene list
         const activeScene = sceneList.querySelector('.scene-item.active');
         if (activeScene) {
             activeScene.classList.remove('active');
         }
         
-        const sceneEl = sceneList.querySelector(`[data-scene="${sceneName}"]`);
+        const sceneEl = sceneList.querySelector(`[data-scene="${CSS.escape(sceneName)}"]`);
         if (sceneEl) {
             sceneEl.classList.add('active');
         }
         
-        // Get enabled fixtures (default to all if not specified in the scene)
-        const enabledFixtures = scene.enabledFixtures || [];
-        
-        renderFixtureControls(scene.channels, enabledFixtures);
-        testScene();
-
+        fetchScene(sceneName)
+            .then(scene => {
+                // Another scene was opened while this one loaded
+                if (!scene || editingSceneName !== sceneName) return;
+                
+                sceneNameInput.value = scene.name;
+                
+                // Get enabled fixtures (default to all if not specified in the scene)
+                const enabledFixtures = scene.enabledFixtures || [];
+                
+                renderFixtureControls(scene.channels, enabledFixtures);
+                restartPreview();
+            })
+            .catch(error => {
+                console.error('Error loading scene:', error);
+            });
     }
     
     function renderFixtureControls(channelValues = [], enabledFixtures = []) {
@@ -145,15 +217,24 @@ document.addEventListener('DOMContentLoaded', function() {
             const fixtureEnableLabel = document.createElement('label');
             fixtureEnableLabel.className = 'fixture-enable-label';
             
+            // A linked fixture has no values of its own: the server copies
+            // its master's values onto it, so it mirrors the master here and
+            // can't be edited or enabled separately.
+            const master = linkedMaster(fixture);
+            
             const fixtureEnableCheckbox = document.createElement('input');
             fixtureEnableCheckbox.type = 'checkbox';
             fixtureEnableCheckbox.className = 'fixture-enable';
             fixtureEnableCheckbox.checked = editingSceneName ? 
-                (enabledFixtures.includes(fixture.name)) : true; // Default enabled for new scenes
+                (enabledFixtures.includes(master ? master.name : fixture.name)) : true; // Default enabled for new scenes
             fixtureEnableCheckbox.setAttribute('data-fixture-name', fixture.name);
+            if (master) {
+                fixtureEnableCheckbox.disabled = true;
+                fixtureEnableCheckbox.setAttribute('data-linked-to', master.name);
+            }
             
             fixtureEnableLabel.appendChild(fixtureEnableCheckbox);
-            fixtureEnableLabel.appendChild(document.createTextNode(' Enable'));
+            fixtureEnableLabel.appendChild(document.createTextNode(master ? ' Follows master' : ' Enable'));
             
             // Fixture name
             const fixtureHeader = document.createElement('h4');            // Add visual indicator for linked fixtures
@@ -174,6 +255,7 @@ document.addEventListener('DOMContentLoaded', function() {
             // Toggle channel controls visibility based on enable state
             fixtureEnableCheckbox.addEventListener('change', function() {
                 channelsContainer.style.opacity = this.checked ? '1' : '0.5';
+                syncLinkedCheckboxes(fixture, this.checked);
                 testScene(); // Update preview
             });
             
@@ -182,9 +264,15 @@ document.addEventListener('DOMContentLoaded', function() {
             
             for (let i = 0; i < fixture.channel_count; i++) {
                 const channelIndex = fixture.start_channel + i - 1; // 0-based index
-                const channelValue = channelValues[channelIndex] || 0;
+                // Linked fixtures show what they will actually output: the
+                // master's value, not anything an older scene stored for them
+                const sourceIndex = master ? master.start_channel + i - 1 : channelIndex;
+                const channelValue = channelValues[sourceIndex] || 0;
                 
                 const channelEl = createChannelControl(fixture, i, channelIndex, channelValue);
+                if (master) {
+                    channelEl.querySelector('input[type="range"]').disabled = true;
+                }
                 channelsContainer.appendChild(channelEl);
             }
             
@@ -198,31 +286,13 @@ document.addEventListener('DOMContentLoaded', function() {
         const channelContainer = document.createElement('div');
         channelContainer.className = 'channel-control';
         
-        // Get channel name from fixture type (with caching)
+        // Get channel name from fixture type; unknown types fall back to
+        // Generic, as on the server
         let channelName = `Channel ${channelOffset + 1}`;
-        
-        // Check cache first
-        if (fixtureTypes[fixture.type]) {
-            const channelInfo = fixtureTypes[fixture.type].channels[channelOffset];
-            if (channelInfo) {
-                channelName = channelInfo.name;
-            }
-        } else {
-            // Fetch and cache fixture type data
-            fetch(`/setup/api/fixture-types/${fixture.type}`)
-                .then(response => response.json())
-                .then(data => {
-                    // Cache the fixture type data
-                    fixtureTypes[fixture.type] = data;
-                    
-                    const channelInfo = data.channels[channelOffset];
-                    if (channelInfo) {
-                        channelLabel.textContent = channelInfo.name;
-                    }
-                })
-                .catch(error => {
-                    console.error('Error loading fixture type details:', error);
-                });
+        const fixtureType = fixtureTypes[fixture.type] || fixtureTypes['Generic'];
+        const channelInfo = fixtureType && fixtureType.channels[channelOffset];
+        if (channelInfo) {
+            channelName = channelInfo.name;
         }
         
         // Label
@@ -272,14 +342,8 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
-        // Check if editing or creating new
-        if (!editingSceneName && scenes.some(s => s.name === sceneName)) {
-            alert('A scene with this name already exists');
-            return;
-        }
-        
         // Check max scenes limit for new scenes
-        if (!editingSceneName && scenes.length >= maxScenes) {
+        if (!editingSceneName && sceneCount >= maxScenes) {
             alert(`Maximum ${maxScenes} scenes allowed`);
             return;
         }
@@ -293,17 +357,19 @@ document.addEventListener('DOMContentLoaded', function() {
             channels[i] = 0;
         }
         
-        // Set channel values from sliders
+        // Set channel values from sliders. Linked fixtures' (disabled)
+        // sliders are skipped: only master values are stored.
         sliders.forEach(slider => {
+            if (slider.disabled) return;
             const dmxIndex = parseInt(slider.getAttribute('data-dmx-index'));
             channels[dmxIndex] = parseInt(slider.value);
         });
         
-        // Get enabled fixtures
+        // Get enabled fixtures (linked fixtures follow their master)
         const enabledFixtures = [];
         const fixtureCheckboxes = fixtureControls.querySelectorAll('.fixture-enable');
         fixtureCheckboxes.forEach(checkbox => {
-            if (checkbox.checked) {
+            if (checkbox.checked && !checkbox.disabled) {
                 enabledFixtures.push(checkbox.getAttribute('data-fixture-name'));
             }
         });
@@ -315,36 +381,36 @@ document.addEventListener('DOMContentLoaded', function() {
             enabledFixtures: enabledFixtures
         };
         
-        // Send to server
-        fetch('/setup/api/config/scenes', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify(sceneData)
-        })
-        .then(response => response.json())
-        .then(data => {
-            if (data.success) {
-                // Update local data and refresh UI
-                if (editingSceneName) {
-                    // Update existing scene
-                    const index = scenes.findIndex(s => s.name === editingSceneName);
-                    if (index !== -1) {
-                        scenes[index] = sceneData;
-                    }
+        // A new scene must not overwrite one that exists: not every name
+        // is listed here, so ask the server
+        const isNew = !editingSceneName;
+        const checkName = isNew ? fetchScene(sceneName) : Promise.resolve(null);
+        checkName
+        .then(existing => {
+            if (existing) {
+                alert('A scene with this name already exists');
+                return;
+            }
+            // Send to server
+            return fetch('/setup/api/config/scenes', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify(sceneData)
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    if (isNew) sceneCount++;
+                    createNewScene();
+                    loadScenePage(true);
+                    updateSceneCounter();
+                    alert('Scene saved successfully!');
                 } else {
-                    // Add new scene
-                    scenes.push(sceneData);
+                    alert('Failed to save scene: ' + data.message);
                 }
-                
-                renderSceneList();
-                updateSceneCounter();
-                createNewScene();
-                alert('Scene saved successfully!');
-            } else {
-                alert('Failed to save scene: ' + data.message);
-            }
+            });
         })
         .catch(error => {
             console.error('Error saving scene:', error);
@@ -362,12 +428,6 @@ document.addEventListener('DOMContentLoaded', function() {
             return;
         }
         
-        // Remove from scenes array
-        const index = scenes.findIndex(s => s.name === editingSceneName);
-        if (index !== -1) {
-            scenes.splice(index, 1);
-        }
-        
         // Update scenes list on server
         fetch('/setup/api/config/scenes', {
             method: 'DELETE',
@@ -380,9 +440,10 @@ document.addEventListener('DOMContentLoaded', function() {
         })
         .then(response => response.json())
         .then(data => {
-            renderSceneList();
-            updateSceneCounter();
+            if (data.success) sceneCount--;
             createNewScene();
+            loadScenePage(true);
+            updateSceneCounter();
         })
         .catch(error => {
             console.error('Error deleting scene:', error);
@@ -390,7 +451,7 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    function testScene() {
+    function collectPreviewChannels() {
         // Collect channel values from form
         const channels = [];
         
@@ -408,10 +469,11 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
         
-        // Set channel values from sliders, but only for enabled fixtures
+        // Set channel values from sliders, but only for enabled fixtures.
+        // Linked fixtures are left out; the server copies their master.
         fixtures.forEach(fixture => {
-            // Skip disabled fixtures
-            if (!enabledFixtureNames.includes(fixture.name)) {
+            // Skip disabled and linked fixtures
+            if (!enabledFixtureNames.includes(fixture.name) || linkedMaster(fixture)) {
                 return;
             }
             
@@ -429,28 +491,117 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
         
-        // Test scene
-        fetch('/setup/api/config/scenes/test', {
+        return channels;
+    }
+    
+    function testScene() {
+        // Coalesce: however many sliders move before the next animation
+        // frame, the preview is sent once
+        if (previewScheduled) return;
+        previewScheduled = true;
+        requestAnimationFrame(flushPreview);
+    }
+    
+    function restartPreview() {
+        // Resend the whole frame, replacing whatever the preview showed
+        previewSent = null;
+        testScene();
+    }
+    
+    function flushPreview() {
+        previewScheduled = false;
+        
+        // One request in flight at a time; changes made meanwhile are
+        // picked up by the flush that follows it
+        if (previewInFlight) {
+            previewDirty = true;
+            return;
+        }
+        
+        // Send only the channels that differ from what was sent last.
+        // Without a previous frame, send the non-zero ones and reset the rest.
+        const channels = collectPreviewChannels();
+        const reset = previewSent === null;
+        const changed = {};
+        let changedCount = 0;
+        channels.forEach((value, index) => {
+            if (reset ? value !== 0 : value !== previewSent[index]) {
+                changed[index] = value;
+                changedCount++;
+            }
+        });
+        if (!reset && changedCount === 0) return;
+        
+        previewSent = channels;
+        previewInFlight = true;
+        fetch('/setup/api/preview', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                channels: channels
+                channels: changed,
+                reset: reset
             })
         })
         .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                console.error('Error updating preview:', data.message);
+                previewSent = null;
+            }
+        })
         .catch(error => {
-            console.error('Error testing scene:', error);
-            alert('Error testing scene. See console for details.');
+            console.error('Error updating preview:', error);
+            previewSent = null; // Resend everything next time
+        })
+        .finally(() => {
+            previewInFlight = false;
+            if (previewDirty) {
+                previewDirty = false;
+                testScene();
+            }
         });
     }
     
+    function openPreviewStream() {
+        // The open stream keeps the preview alive; the server releases it
+        // once this page (and any other editor) has closed its stream.
+        const stream = new EventSource('/setup/api/preview/stream');
+        stream.onmessage = function(event) {
+            const state = JSON.parse(event.data);
+            // Released from elsewhere: the next change starts a new preview
+            if (!state.active && previewSent !== null && !previewInFlight) {
+                previewSent = null;
+            }
+        };
+    }
+    
     function cancelEdit() {
         createNewScene();
     }
     
+    function linkedMaster(fixture) {
+        // The master a fixture follows, or null if it holds its own values
+        if (!fixture.linked_to) return null;
+        return fixtures.find(f => f.name === fixture.linked_to && f !== fixture) || null;
+    }
+    
+    function syncLinkedCheckboxes(masterFixture, checked) {
+        // Linked fixtures are enabled exactly when their master is
+        const linkedCheckboxes = fixtureControls.querySelectorAll(
+            `.fixture-enable[data-linked-to="${CSS.escape(masterFixture.name)}"]`
+        );
+        linkedCheckboxes.forEach(checkbox => {
+            checkbox.checked = checked;
+            const channelsContainer = checkbox.closest('.fixture-control').querySelector('.channel-controls');
+            channelsContainer.style.opacity = checked ? '1' : '0.5';
+        });
+    }
+    
     function copyValueToLinkedFixtures(sourceFixture, channelOffset, value) {
+        // Display only: mirror the master's value on its linked fixtures'
+        // sliders. Nothing here is saved - the server applies the link.
         // Find fixtures linked to the source fixture by name
         fixtures.forEach((fixture) => {
             // Skip if this is the source fixture or if it's not linked to the source
@@ -478,23 +629,4 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     }
-    
-    function preloadFixtureTypes() {
-        // Get unique fixture types
-        const uniqueTypes = [...new Set(fixtures.map(f => f.type))];
-        
-        // Preload fixture type data for all unique types
-        uniqueTypes.forEach(type => {
-            if (!fixtureTypes[type]) {
-                fetch(`/setup/api/fixture-types/${type}`)
-                    .then(response => response.json())
-                    .then(data => {
-                        fixtureTypes[type] = data;
-                    })
-                    .catch(error => {
-                        console.error(`Error preloading fixture type ${type}:`, error);
-                    });
-            }
-        });
-    }
 });
@@ -0,0 +1,136 @@
+"""
+Static Assets - Fingerprinted, precompressed copies of app/static, cached forever
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import abort, request, send_file, url_for
+
+try:
+    import brotli  # Optional: adds .br variants when installed
+except ImportError:
+    brotli = None
+
+# Fingerprinted names never change content, so browsers may keep them for
+# a year without asking again. Public: static files need no login.
+IMMUTABLE = 'public, max-age=31536000, immutable'
+COMPRESSIBLE = ('.css', '.js', '.svg', '.html', '.json', '.txt')
+
+
+def fingerprint(filename, content):
+    """'js/scenes.js' -> 'js/scenes.<first 12 hex of sha256>.js'"""
+    stem, extension = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+
+
+class StaticAssets:
+    """
+    Copies every file under the static folder to a content-hashed name in
+    the build directory, next to .gz (and, with the brotli package, .br)
+    variants compressed once at maximum level.
+
+    Built at start-up; a file whose fingerprinted copy already exists is
+    not written again, so restarts with unchanged assets only hash them.
+    Templates link assets with asset_url(), and /assets/<name> serves the
+    best variant the client accepts, with immutable caching.
+    """
+
+    def __init__(self, static_folder, build_dir):
+        self.static_folder = static_folder
+        self.build_dir = build_dir
+        self.urls = {}  # 'js/scenes.js' -> 'js/scenes.<hash>.js'
+        self.files = {}  # 'js/scenes.<hash>.js' -> mimetype
+
+    def build(self):
+        for root, dirs, names in os.walk(self.static_folder):
+            dirs.sort()
+            for name in sorted(names):
+                source = os.path.join(root, name)
+                filename = os.path.relpath(source, self.static_folder).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    content = f.read()
+                hashed = fingerprint(filename, content)
+                self._write(hashed, content)
+                self.urls[filename] = hashed
+                self.files[hashed] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        self._prune()
+
+    def _write(self, hashed, content):
+        """Write the copy and its compressed variants, unless already built"""
+        target = os.path.join(self.build_dir, hashed)
+        variants = [(target, lambda: content)]
+        if hashed.endswith(COMPRESSIBLE):
+            variants.append((f"{target}.gz", lambda: gzip.compress(content, 9, mtime=0)))
+            if brotli is not None:
+                variants.append((f"{target}.br", lambda: brotli.compress(content)))
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        for path, produce in variants:
+            if os.path.exists(path):
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(produce())
+            os.replace(tmp_path, path)
+
+    def _prune(self):
+        """Remove copies of earlier versions of the assets"""
+        for root, _, names in os.walk(self.build_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                hashed = os.path.relpath(path, self.build_dir).replace(os.sep, '/')
+                for extension in ('.br', '.gz'):
+                    if hashed.endswith(extension):
+                        hashed = hashed[:-len(extension)]
+                if hashed not in self.files:
+                    os.remove(path)
+
+    def url(self, filename):
+        """The fingerprinted URL of a static file, or the plain one if it isn't built"""
+        hashed = self.urls.get(filename)
+        if hashed is None:
+            return url_for('static', filename=filename)
+        return url_for('assets', filename=hashed)
+
+    def serve(self, filename):
+        """Send a fingerprinted asset: brotli, then gzip, then as is"""
+        mimetype = self.files.get(filename)
+        if mimetype is None:
+            abort(404)
+        path = os.path.join(self.build_dir, filename)
+        encoding = None
+        for candidate, extension in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in request.accept_encodings and os.path.exists(path + extension):
+                path += extension
+                encoding = candidate
+                break
+
+        response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+def init_app(app):
+    """
+    Build the fingerprinted assets and expose asset_url() to templates.
+
+    In debug mode assets are served from app/static as before, so edits show
+    up on reload without a restart. So they are if the build directory
+    can't be written: slower page loads, but never a failed start-up.
+    """
+    assets = StaticAssets(app.static_folder, app.config['STATIC_BUILD_DIR'])
+    if not app.config['DMXLIFE_DEBUG']:
+        try:
+            assets.build()
+        except OSError as e:
+            app.logger.error(f"Could not build fingerprinted static assets, serving app/static: {e}")
+            assets.urls.clear()
+            assets.files.clear()
+    app.extensions['static_assets'] = assets
+    app.add_url_rule('/assets/<path:filename>', 'assets', assets.serve)
+    app.add_template_global(assets.url, 'asset_url')
@@ -1,11 +1,19 @@
 """
 Main views for the application
 """
-from flask import Blueprint, render_template, jsonify, request, current_app
-from app import auth
+import json
+import threading
+import zlib
+
+from flask import Blueprint, Response, render_template, jsonify, request, current_app
+from markupsafe import Markup
+from app import auth, http_cache, metrics
 from app.dmx_controller import (
-    get_active_scene, get_active_scenes, get_available_scenes, activate_scene,
-    get_current_dmx_values, get_highest_active_idx, get_connection_status, get_config
+    get_active_scene, get_active_scenes, get_scene_page, get_scene_groups, activate_scene,
+    get_current_dmx_values, get_highest_active_idx, get_connection_status,
+    get_compiled_version,
+    get_available_effects, get_active_effects, toggle_effect, get_effects_frame_budget,
+    cue_go, cue_back, cue_goto, cue_release, get_cue_lists, get_cue_state, get_schedule
 )
 
 main_bp = Blueprint('main', __name__)
@@ -19,41 +27,112 @@ GROUP_ORDER = [
 ]
 
 
+# Most scene names one /api/scenes request returns
+SCENE_PAGE_LIMIT = 500
+
+
 def get_grouped_scenes():
     """Organize scenes into their display groups, plus ungrouped scenes separately"""
-    scenes = get_config().get('scenes', [])
-    by_group = {key: [] for key, _ in GROUP_ORDER}
-    extra_scenes = []
-    for scene in scenes:
-        group = scene.get('group')
-        if group in by_group:
-            by_group[group].append(scene['name'])
-        elif group == 'extra':
-            extra_scenes.append(scene['name'])
-        else:
-            # Legacy/ungrouped scenes still get shown so nothing is lost
-            by_group.setdefault('_ungrouped', []).append(scene['name'])
-
-    groups = [(key, label, by_group[key]) for key, label in GROUP_ORDER if by_group[key]]
-    if by_group.get('_ungrouped'):
-        groups.append(('_ungrouped', 'Other', by_group['_ungrouped']))
-    return groups, extra_scenes
+    by_group = get_scene_groups()
+    groups = [(key, label, by_group[key]) for key, label in GROUP_ORDER if by_group.get(key)]
+
+    # Legacy/ungrouped scenes still get shown so nothing is lost
+    known = {key for key, _ in GROUP_ORDER} | {'extra'}
+    ungrouped = [name for group, names in by_group.items() if group not in known for name in names]
+    if ungrouped:
+        groups.append(('_ungrouped', 'Other', ungrouped))
+    return groups, by_group.get('extra', [])
+
+
+def parse_page_args(args):
+    """
+    Check ?offset= and ?limit= (both optional; without a limit, everything
+    from offset on).
+
+    Returns (offset, limit, None) if valid, otherwise (None, None, message).
+    """
+    try:
+        offset = int(args.get('offset', 0))
+        limit = int(args['limit']) if 'limit' in args else None
+    except ValueError:
+        return None, None, 'offset and limit must be integers'
+    if offset < 0:
+        return None, None, 'offset must not be negative'
+    if limit is not None and not 1 <= limit <= SCENE_PAGE_LIMIT:
+        return None, None, f"limit must be 1-{SCENE_PAGE_LIMIT}"
+    return offset, limit, None
+
+
+# The main page's scene and effect buttons, rendered for one compiled version
+_scene_buttons = (None, None)  # (version, Markup)
+_scene_buttons_lock = threading.Lock()
+
+
+def get_scene_buttons(version):
+    """
+    The rendered scene and effect buttons for a compiled version (see
+    get_compiled_version()), rendered on the first request after the scenes
+    or effects are reloaded and served from memory after that, so a page
+    load neither reads the config nor regroups the scenes.
+    """
+    global _scene_buttons
+    cached_version, html = _scene_buttons
+    if cached_version == version:
+        return html
+    with _scene_buttons_lock:
+        cached_version, html = _scene_buttons
+        if cached_version != version:
+            groups, extra_scenes = get_grouped_scenes()
+            html = Markup(render_template('_scene_buttons.html', groups=groups,
+                                          extra_scenes=extra_scenes,
+                                          effects=get_available_effects()))
+            _scene_buttons = (version, html)
+    return html
 
 
 @main_bp.route('/')
 @auth.login_required
 def index():
-    """Main page with scene selection"""
-    groups, extra_scenes = get_grouped_scenes()
+    """
+    Main page with scene selection.
+
+    The buttons come from get_scene_buttons(); the ETag combines the version
+    of the loaded scenes and effects with which of them are active, so a
+    reload with nothing changed is an empty 304.
+    """
+    version = get_compiled_version()
     active_scenes = get_active_scenes()
-    return render_template('index.html', groups=groups, extra_scenes=extra_scenes, active_scenes=active_scenes)
+    active_effects = get_active_effects()
+    state = json.dumps([active_scenes, active_effects]).encode()
+    etag = f"index-{version}-{zlib.crc32(state):08x}"
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag)
+
+    page = render_template('index.html', scene_buttons=get_scene_buttons(version),
+                           active_scenes=active_scenes, active_effects=active_effects)
+    return http_cache.cached_response(page.encode(), etag, mimetype='text/html')
 
 @main_bp.route('/api/scenes')
 @auth.login_required
 def list_scenes():
-    """API endpoint to list available scenes"""
+    """
+    API endpoint to list available scenes, a page at a time.
+
+    `?offset=&limit=` select a page (default: every scene), `?group=` one
+    group's scenes and `?q=` names containing the text. `total` counts the
+    matching scenes, so a client can tell how many pages there are.
+    """
+    offset, limit, invalid = parse_page_args(request.args)
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    names, total = get_scene_page(offset, limit, request.args.get('group') or None,
+                                   request.args.get('q') or None)
     return jsonify({
-        'scenes': get_available_scenes(),
+        'scenes': names,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
         'active': get_active_scene(),
         'active_scenes': get_active_scenes()
     })
@@ -73,6 +152,95 @@ def activate_scene_endpoint():
         return jsonify({'success': True, 'active_scenes': active_scenes})
     return jsonify({'success': False, 'message': 'Failed to activate scene'}), 500
 
+@main_bp.route('/api/cues')
+@auth.login_required
+def list_cues():
+    """API endpoint to list cue lists and the current cue of each playing one"""
+    return jsonify({
+        'cue_lists': get_cue_lists(),
+        'playing': get_cue_state()
+    })
+
+def _cue_command(command, *args):
+    """Run a cue command and shape its (success, message) result as a response"""
+    success, message = command(*args)
+    if success:
+        return jsonify({'success': True, 'playing': get_cue_state()})
+    return jsonify({'success': False, 'message': message}), 400
+
+def _cue_list_name():
+    """The cue list named in the request body, or None"""
+    data = request.get_json(silent=True) or {}
+    return data.get('cue_list')
+
+@main_bp.route('/api/cues/go', methods=['POST'])
+@auth.login_required
+def cue_go_endpoint():
+    """API endpoint to advance a cue list to its next cue (starts it if stopped)"""
+    list_name = _cue_list_name()
+    if not list_name:
+        return jsonify({'success': False, 'message': 'Cue list name required'}), 400
+    return _cue_command(cue_go, list_name)
+
+@main_bp.route('/api/cues/back', methods=['POST'])
+@auth.login_required
+def cue_back_endpoint():
+    """API endpoint to step a cue list back to its previous cue"""
+    list_name = _cue_list_name()
+    if not list_name:
+        return jsonify({'success': False, 'message': 'Cue list name required'}), 400
+    return _cue_command(cue_back, list_name)
+
+@main_bp.route('/api/cues/goto', methods=['POST'])
+@auth.login_required
+def cue_goto_endpoint():
+    """API endpoint to jump a cue list to a specific cue, by label"""
+    data = request.get_json(silent=True) or {}
+    list_name = data.get('cue_list')
+    cue_label = data.get('cue')
+    if not list_name or cue_label is None:
+        return jsonify({'success': False, 'message': 'Cue list name and cue required'}), 400
+    return _cue_command(cue_goto, list_name, cue_label)
+
+@main_bp.route('/api/cues/release', methods=['POST'])
+@auth.login_required
+def cue_release_endpoint():
+    """API endpoint to stop a cue list and return its channels to the scenes"""
+    list_name = _cue_list_name()
+    if not list_name:
+        return jsonify({'success': False, 'message': 'Cue list name required'}), 400
+    return _cue_command(cue_release, list_name)
+
+@main_bp.route('/api/schedule')
+@auth.login_required
+def list_schedule():
+    """API endpoint to list scheduled triggers with their next fire times"""
+    return jsonify({'schedule': get_schedule()})
+
+@main_bp.route('/api/effects')
+@auth.login_required
+def list_effects():
+    """API endpoint to list effects, the running ones, and their per-frame cost"""
+    return jsonify({
+        'effects': get_available_effects(),
+        'active_effects': get_active_effects(),
+        'frame_budget': get_effects_frame_budget()
+    })
+
+@main_bp.route('/api/effects/toggle', methods=['POST'])
+@auth.login_required
+def toggle_effect_endpoint():
+    """API endpoint to start or stop an effect. Returns every running effect."""
+    data = request.get_json(silent=True) or {}
+    effect_name = data.get('effect')
+    if not effect_name:
+        return jsonify({'success': False, 'message': 'Effect name required'}), 400
+
+    success, active_effects = toggle_effect(effect_name)
+    if success:
+        return jsonify({'success': True, 'active_effects': active_effects})
+    return jsonify({'success': False, 'message': 'Failed to toggle effect'}), 500
+
 @main_bp.route('/api/dmx/values')
 @auth.login_required
 def dmx_values():
@@ -92,13 +260,15 @@ def dmx_values():
         'active_scenes': active_scenes
     })
 
+@main_bp.route('/metrics')
+@auth.login_required
+def metrics_endpoint():
+    """Engine and web-tier metrics in the Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @main_bp.route('/api/connection/status')
 @auth.login_required
 def connection_status():
-    """API endpoint to get Art-Net connection status"""
-    status = get_connection_status()
-    return jsonify({
-        'connected': status['connected'],
-        'last_error_time': status['last_error_time'],
-        'error_message': status['error_message']
-    })
+    """API endpoint to get DMX output connection status, plus which
+    backend is active and where it sends"""
+    return jsonify(get_connection_status())
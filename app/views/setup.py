@@ -1,10 +1,26 @@
 """
 Setup views for DMX configuration
 """
-from flask import Blueprint, render_template, jsonify, request, current_app
-from app import auth
-from app.dmx_controller import get_config, save_config, save_scene, delete_scene, test_scene
+import ipaddress
+import json
+import math
+import re
+import zlib
+
+from flask import Blueprint, Response, render_template, jsonify, request, current_app, url_for
+from app import auth, http_cache
+from app.dmx_controller import (
+    get_config, get_config_generation, get_compiled_version, save_config, save_scene, delete_scene, test_scene,
+    update_preview, release_preview, subscribe_preview, get_artnet_nodes,
+    get_artnet_input_status, get_scene, get_scene_count, get_config_revisions,
+    get_config_revision, diff_config_revisions, restore_config_revision
+)
+from app.views.main import parse_page_args
+from app.artnet_input import MERGE_POLICIES
+from app.dmx_backends.capture import DEFAULT_CAPTURE_PATH
 from app.models.fixture import FixtureType
+from app.effects import WAVEFORMS, MODES
+from app.scheduler import DAYS, parse_time_of_day
 
 setup_bp = Blueprint('setup', __name__)
 
@@ -38,6 +54,210 @@ def find_invalid_channel(channels):
     return None
 
 
+def parse_preview_channels(channels):
+    """
+    Check a sparse preview update, {"<0-based channel>": value}, and convert
+    it to {int: int}. JSON object keys are always strings, hence the parse.
+
+    Returns (channels, None) if valid, otherwise (None, message).
+    """
+    if not isinstance(channels, dict):
+        return None, 'Channels must be an object of channel index to value'
+
+    parsed = {}
+    for key, value in channels.items():
+        try:
+            index = int(key)
+        except ValueError:
+            return None, f'Channel index {key!r} is not an integer'
+        if not 0 <= index < 512:
+            return None, f'Channel index {index} is out of range (0-511)'
+        if isinstance(value, bool) or not isinstance(value, int):
+            return None, f'Channel {index + 1} is not an integer'
+        if not 0 <= value <= 255:
+            return None, f'Channel {index + 1} is out of range (0-255)'
+        parsed[index] = value
+
+    return parsed, None
+
+
+def parse_int_setting(raw, key, minimum, maximum):
+    """
+    Parse one numeric setting defensively.
+
+    Returns (value, None) if valid, otherwise (None, message).
+    """
+    if isinstance(raw, bool):
+        return None, f'{key} must be a number'
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        return None, f'{key} must be a number'
+    if not minimum <= value <= maximum:
+        return None, f'{key} must be between {minimum} and {maximum}'
+    return value, None
+
+
+# Legacy flat request fields and their key in the Art-Net settings
+LEGACY_ARTNET_FIELDS = {'artnet_ip': 'ip', 'artnet_port': 'port', 'universe': 'universe'}
+
+
+def parse_artnet_settings(settings):
+    """
+    Validate the Art-Net backend's settings.
+
+    `universe` is the full 15-bit Port-Address (net, subnet and universe).
+    `nodes` lists IPv4 addresses to unicast to. When empty and `discovery`
+    is on, frames go to the nodes that answered ArtPoll for the universe,
+    and to `ip` (usually the broadcast address) while none have.
+
+    Returns (settings, None) if valid, otherwise (None, message).
+    """
+    if not isinstance(settings, dict):
+        return None, 'Art-Net settings must be an object'
+
+    ip = settings.get('ip', '255.255.255.255')
+    if not isinstance(ip, str) or not ip.strip():
+        return None, 'Art-Net IP address is required'
+
+    parsed = {'ip': ip.strip()}
+    numeric_settings = {
+        'port': (settings.get('port', 6454), 1, 65535),
+        'universe': (settings.get('universe', 0), 0, 32767),
+        'packet_size': (settings.get('packet_size', 512), 2, 512),
+    }
+    for key, (raw, minimum, maximum) in numeric_settings.items():
+        parsed[key], invalid = parse_int_setting(raw, key, minimum, maximum)
+        if invalid:
+            return None, invalid
+
+    nodes = settings.get('nodes', [])
+    if not isinstance(nodes, list):
+        return None, 'Art-Net nodes must be a list of IP addresses'
+    parsed['nodes'] = []
+    for node in nodes:
+        try:
+            parsed['nodes'].append(str(ipaddress.IPv4Address(str(node).strip())))
+        except ValueError:
+            return None, f"Art-Net node {node!r} is not an IPv4 address"
+
+    discovery = settings.get('discovery', True)
+    if not isinstance(discovery, bool):
+        return None, 'discovery must be true or false'
+    parsed['discovery'] = discovery
+
+    return parsed, None
+
+
+def parse_sacn_settings(settings):
+    """
+    Validate the sACN (E1.31) backend's settings.
+
+    Output goes to the universe's standard multicast group; `interface`
+    optionally picks the local IPv4 address to send it from.
+
+    Returns (settings, None) if valid, otherwise (None, message).
+    """
+    if not isinstance(settings, dict):
+        return None, 'sACN settings must be an object'
+
+    parsed = {}
+    numeric_settings = {
+        'universe': (settings.get('universe', 1), 1, 63999),
+        'priority': (settings.get('priority', 100), 0, 200),
+    }
+    for key, (raw, minimum, maximum) in numeric_settings.items():
+        parsed[key], invalid = parse_int_setting(raw, key, minimum, maximum)
+        if invalid:
+            return None, invalid
+
+    preview = settings.get('preview', False)
+    if not isinstance(preview, bool):
+        return None, 'preview must be true or false'
+    parsed['preview'] = preview
+
+    source_name = settings.get('source_name', 'DMX Life')
+    if not isinstance(source_name, str) or len(source_name.encode('utf-8')) > 63:
+        return None, 'Source name must be text of at most 63 bytes'
+    parsed['source_name'] = source_name.strip() or 'DMX Life'
+
+    interface = settings.get('interface') or ''
+    if interface:
+        try:
+            interface = str(ipaddress.IPv4Address(str(interface).strip()))
+        except ValueError:
+            return None, f"sACN interface {interface!r} is not an IPv4 address"
+    parsed['interface'] = interface
+
+    return parsed, None
+
+
+def parse_input_settings(settings):
+    """
+    Validate the Art-Net input (console merge) settings.
+
+    `universe` is the 15-bit Port-Address the console sends on, `merge` one
+    of MERGE_POLICIES, and `timeout` how many seconds a silent console
+    keeps its values on the output.
+
+    Returns (settings, None) if valid, otherwise (None, message).
+    """
+    if not isinstance(settings, dict):
+        return None, 'Input settings must be an object'
+
+    enabled = settings.get('enabled', False)
+    if not isinstance(enabled, bool):
+        return None, 'enabled must be true or false'
+
+    universe, invalid = parse_int_setting(settings.get('universe', 0), 'universe', 0, 32767)
+    if invalid:
+        return None, invalid
+
+    merge = settings.get('merge', 'htp')
+    if merge not in MERGE_POLICIES:
+        return None, f"merge must be one of: {', '.join(MERGE_POLICIES)}"
+
+    timeout = settings.get('timeout', 2.5)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0.5 <= timeout <= 60:
+        return None, 'timeout must be a number of seconds from 0.5 to 60'
+
+    return {'enabled': enabled, 'universe': universe, 'merge': merge,
+            'timeout': float(timeout)}, None
+
+
+def parse_capture_settings(settings):
+    """
+    Validate the capture backend's settings.
+
+    `path` is the capture file (strftime fields allowed, relative to the
+    project root); `forward` optionally names the backend to also send
+    through, using that backend's saved settings.
+
+    Returns (settings, None) if valid, otherwise (None, message).
+    """
+    if not isinstance(settings, dict):
+        return None, 'Capture settings must be an object'
+
+    path = settings.get('path') or DEFAULT_CAPTURE_PATH
+    if not isinstance(path, str) or not path.strip():
+        return None, 'Capture path must be text'
+
+    forward = settings.get('forward') or ''
+    if forward not in ('', 'artnet', 'sacn'):
+        return None, "forward must be 'artnet', 'sacn' or empty"
+
+    return {'path': path.strip(), 'forward': forward}, None
+
+
+# Settings validation for each output backend, by backend name
+BACKEND_SETTINGS_PARSERS = {
+    'artnet': parse_artnet_settings,
+    'sacn': parse_sacn_settings,
+    'capture': parse_capture_settings,
+    'null': lambda settings: ({}, None),  # No settings
+}
+
+
 def find_invalid_fixtures(fixtures):
     """
     Validate a fixture list before it is saved.
@@ -85,6 +305,147 @@ def find_invalid_fixtures(fixtures):
     return None
 
 
+def find_invalid_effects(effects):
+    """
+    Validate an effect list before it is saved.
+
+    Fixture names are only checked for shape here, not existence: effects
+    that name a fixture which is later deleted are skipped (and logged) when
+    compiled rather than blocking the fixture edit.
+
+    Returns None if valid, otherwise a message naming the problem.
+    """
+    if not isinstance(effects, list):
+        return 'Effects must be a list'
+
+    seen_names = set()
+    for effect in effects:
+        if not isinstance(effect, dict) or not effect.get('name'):
+            return 'Each effect must have a name'
+        name = effect['name']
+        if name in seen_names:
+            return f"Duplicate effect name: '{name}'"
+        seen_names.add(name)
+
+        if effect.get('waveform', 'sine') not in WAVEFORMS:
+            return f"'{name}' has an unknown waveform (expected one of {', '.join(WAVEFORMS)})"
+        if effect.get('mode', 'override') not in MODES:
+            return f"'{name}' has an unknown mode (expected one of {', '.join(MODES)})"
+
+        fixtures = effect.get('fixtures')
+        if not isinstance(fixtures, list) or not fixtures or \
+                not all(isinstance(fixture, str) for fixture in fixtures):
+            return f"'{name}' must list at least one fixture name"
+
+        channels = effect.get('channels')
+        if not isinstance(channels, list) or not channels:
+            return f"'{name}' must list at least one channel"
+        for channel in channels:
+            if isinstance(channel, bool) or not isinstance(channel, int) or channel < 1:
+                return f"'{name}' has an invalid channel number: {channel!r}"
+
+        for key in ('low', 'high'):
+            value = effect.get(key, 0)
+            if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= 255:
+                return f"'{name}' {key} must be an integer in 0-255"
+
+        for key in ('rate', 'spread'):
+            value = effect.get(key, 1.0)
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or \
+                    not math.isfinite(value) or value < 0:
+                return f"'{name}' {key} must be a non-negative number"
+
+    return None
+
+
+def find_invalid_cue_lists(cue_lists):
+    """
+    Validate a cue list definition list before it is saved.
+
+    Scene names are checked for shape only; a list naming a scene that does
+    not exist is skipped (and logged) when its cue frames are precomputed.
+
+    Returns None if valid, otherwise a message naming the problem.
+    """
+    if not isinstance(cue_lists, list):
+        return 'Cue lists must be a list'
+
+    seen_names = set()
+    for cue_list in cue_lists:
+        if not isinstance(cue_list, dict) or not cue_list.get('name'):
+            return 'Each cue list must have a name'
+        name = cue_list['name']
+        if name in seen_names:
+            return f"Duplicate cue list name: '{name}'"
+        seen_names.add(name)
+
+        cues = cue_list.get('cues')
+        if not isinstance(cues, list) or not cues:
+            return f"'{name}' must have at least one cue"
+
+        seen_labels = set()
+        for position, cue in enumerate(cues):
+            if not isinstance(cue, dict):
+                return f"'{name}' cue {position + 1} must be an object"
+            label = str(cue.get('label') or position + 1)
+            if label in seen_labels:
+                return f"'{name}' has a duplicate cue label: '{label}'"
+            seen_labels.add(label)
+
+            scenes = cue.get('scenes')
+            if not isinstance(scenes, list) or not all(isinstance(s, str) for s in scenes):
+                return f"'{name}' cue {label} must list scene names"
+
+            for key in ('fade', 'delay', 'follow'):
+                value = cue.get(key)
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or \
+                        not math.isfinite(value) or value < 0:
+                    return f"'{name}' cue {label} {key} must be a non-negative number of seconds"
+
+    return None
+
+
+def find_invalid_schedule(schedule):
+    """
+    Validate a list of time-of-day triggers before it is saved.
+
+    Each trigger fires at 'at' (HH:MM, local time) on the listed 'days' (or
+    every day), and either sets a 'scene' on/off or drives a 'cue_list'.
+
+    Returns None if valid, otherwise a message naming the problem.
+    """
+    if not isinstance(schedule, list):
+        return 'Schedule must be a list'
+
+    seen_names = set()
+    for trigger in schedule:
+        if not isinstance(trigger, dict) or not trigger.get('name'):
+            return 'Each schedule trigger must have a name'
+        name = trigger['name']
+        if name in seen_names:
+            return f"Duplicate schedule trigger name: '{name}'"
+        seen_names.add(name)
+
+        try:
+            parse_time_of_day(trigger.get('at'))
+        except (AttributeError, TypeError, ValueError):
+            return f"'{name}' needs a time of day as HH:MM"
+
+        days = trigger.get('days')
+        if days is not None:
+            if not isinstance(days, list) or not all(day in DAYS for day in days):
+                return f"'{name}' days must be a list of {', '.join(DAYS)}"
+
+        if bool(trigger.get('scene')) == bool(trigger.get('cue_list')):
+            return f"'{name}' must name exactly one of a scene or a cue list"
+        if trigger.get('state', 'on') not in ('on', 'off'):
+            return f"'{name}' state must be 'on' or 'off'"
+
+    return None
+
+
 @setup_bp.route('/')
 @auth.login_required
 def index():
@@ -94,7 +455,7 @@ def index():
 @setup_bp.route('/network')
 @auth.login_required
 def network():
-    """Art-Net network settings"""
+    """Output network settings"""
     config = get_config()
     return render_template('setup/network.html', config=config)
 
@@ -106,63 +467,222 @@ def fixtures():
     fixture_types = FixtureType.get_types()
     return render_template('setup/fixtures.html', 
                           config=config, 
-                          fixture_types=fixture_types)
+                          fixture_types=fixture_types,
+                          fixture_profiles_url=fixture_profiles_url())
 
 @setup_bp.route('/scenes')
 @auth.login_required
 def scenes():
     """Scene editor"""
     config = get_config()
-    return render_template('setup/scenes.html', config=config)
+    return render_template('setup/scenes.html', config=config,
+                           fixture_profiles_url=fixture_profiles_url())
 
 # API endpoints for setup
 
+CONFIG_FIELD_NAME = re.compile(r'^[A-Za-z_]+$')
+
+
+def parse_config_fields(fields):
+    """
+    Check a `fields` query parameter: comma-separated top-level config keys.
+
+    Returns (names, None) with the names sorted and deduplicated, or
+    (None, None) if no selection was asked for, otherwise (None, message).
+    """
+    if fields is None:
+        return None, None
+    names = sorted({name.strip() for name in fields.split(',') if name.strip()})
+    if not names:
+        return None, 'fields must name at least one config section'
+    for name in names:
+        if not CONFIG_FIELD_NAME.match(name):
+            return None, f"Invalid field name '{name}'"
+    return names, None
+
+
+def config_response(etag, last_modified, build):
+    """
+    Answer a GET of config data: a 304 if the client's copy is current,
+    without reading the config at all, otherwise the JSON `build()` returns,
+    with validators, gzipped when worthwhile.
+    """
+    if http_cache.is_not_modified(etag, last_modified):
+        return http_cache.not_modified_response(etag, last_modified)
+    body = current_app.json.dumps(build()).encode()
+    return http_cache.cached_response(body, etag, last_modified)
+
+
 @setup_bp.route('/api/config', methods=['GET'])
 @auth.login_required
 def get_config_endpoint():
-    """Get current configuration, plus the scene limit the editor enforces"""
-    config = dict(get_config())
-    config['MAX_SCENES'] = current_app.config['MAX_SCENES']
+    """
+    Get current configuration, plus the scene limit the editor enforces.
+
+    `?fields=fixtures,scenes` returns only those top-level sections (names
+    that are absent from the config are left out). Responses carry an ETag
+    and Last-Modified from the config generation, so a client revalidating
+    an unchanged config gets an empty 304.
+    """
+    fields, invalid = parse_config_fields(request.args.get('fields'))
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    version, last_modified = get_config_generation()
+    if version is None:
+        return jsonify({'success': False, 'message': 'Configuration unavailable'}), 500
+    etag = f"config-{version}" + (f"-{','.join(fields)}" if fields else '')
+
+    def build():
+        config = dict(get_config())
+        config['MAX_SCENES'] = current_app.config['MAX_SCENES']
+        if fields:
+            config = {name: config[name] for name in fields if name in config}
+        return config
+
+    return config_response(etag, last_modified, build)
+
+
+@setup_bp.route('/api/config/scenes/<path:name>', methods=['GET'])
+@auth.login_required
+def get_scene_endpoint(name):
+    """
+    Get one scene's definition. Served from the scene index, so the config
+    isn't read; the ETag is the version of the loaded scenes, not the file's
+    generation, which can be ahead of them until an edit is loaded.
+    """
+    version = get_compiled_version()
+    if version is None:
+        return jsonify({'success': False, 'message': 'Configuration unavailable'}), 500
+
+    # The name goes into the tag hashed, since it can hold any character. A
+    # matching tag means the scene existed in these same loaded scenes, so
+    # the 304 needs no config read.
+    etag = f"scene-{version}-{zlib.crc32(name.encode()):08x}"
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag)
+
+    scene = get_scene(name)
+    if scene is None:
+        return jsonify({'success': False, 'message': f"Scene '{name}' not found"}), 404
+    body = current_app.json.dumps(scene).encode()
+    return http_cache.cached_response(body, etag)
+
+
+# Revisions listed per page when the client doesn't say
+HISTORY_PAGE_SIZE = 50
+
+
+@setup_bp.route('/api/config/history', methods=['GET'])
+@auth.login_required
+def get_config_history():
+    """List config revisions, newest first: ?offset= and ?limit= page them"""
+    offset, limit, invalid = parse_page_args(request.args)
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+    limit = limit or HISTORY_PAGE_SIZE
+    revisions, total = get_config_revisions(offset, limit)
+    return jsonify({'revisions': revisions, 'total': total, 'offset': offset, 'limit': limit})
+
+
+@setup_bp.route('/api/config/history/<int:revision>', methods=['GET'])
+@auth.login_required
+def get_config_revision_endpoint(revision):
+    """Get the whole config as it was at a revision"""
+    config = get_config_revision(revision)
+    if config is None:
+        return jsonify({'success': False, 'message': f"No revision {revision}"}), 404
     return jsonify(config)
 
+
+@setup_bp.route('/api/config/history/<int:revision>/diff', methods=['GET'])
+@auth.login_required
+def diff_config_revision(revision):
+    """
+    What a revision changed: the sections, and the scenes added, removed or
+    changed by name, against ?against= (by default the revision before it)
+    """
+    try:
+        against = int(request.args.get('against', revision - 1))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'against must be an integer'}), 400
+    diff = diff_config_revisions(against, revision)
+    if diff is None:
+        return jsonify({'success': False, 'message': f"No revision {against} or {revision}"}), 404
+    return jsonify({'from': against, 'to': revision, **diff})
+
+
+@setup_bp.route('/api/config/history/<int:revision>/restore', methods=['POST'])
+@auth.login_required
+def restore_config_revision_endpoint(revision):
+    """Make a revision the current config, recorded as a new revision"""
+    success, message = restore_config_revision(revision)
+    if success:
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': message}), 400
+
 @setup_bp.route('/api/config/network', methods=['POST'])
 @auth.login_required
 def update_network_config():
-    """Update Art-Net network settings"""
+    """
+    Update the output settings: which backend is active, that backend's own
+    settings, and the refresh rate. Other backends' settings are kept, so
+    switching back and forth doesn't lose them. An optional `input` object
+    updates the Art-Net input merge as well.
+    """
     data = get_json_object()
     if data is None:
         return jsonify({'success': False, 'message': 'JSON body required'}), 400
 
-    artnet_ip = data.get('artnet_ip', '255.255.255.255')
-    if not isinstance(artnet_ip, str) or not artnet_ip.strip():
-        return jsonify({'success': False, 'message': 'Art-Net IP address is required'}), 400
+    backend = data.get('backend', 'artnet')
+    parse_settings = BACKEND_SETTINGS_PARSERS.get(backend)
+    if parse_settings is None:
+        return jsonify({'success': False, 'message': f"Unknown output backend '{backend}'"}), 400
 
-    # Parse the numeric settings defensively; nothing is saved unless all of
-    # them are valid, so a bad value cannot leave configuration half-updated.
-    numeric_settings = {
-        'artnet_port': (data.get('artnet_port', 6454), 1, 65535),
-        'universe': (data.get('universe', 0), 0, 32767),
-        'refresh_rate': (data.get('refresh_rate', 30), 1, 60),
-    }
+    # Older clients post the Art-Net fields flat, under their legacy names
+    settings = data.get(backend)
+    if settings is None and backend == 'artnet':
+        settings = {key: data[legacy_key] for legacy_key, key in LEGACY_ARTNET_FIELDS.items()
+                    if legacy_key in data}
 
-    network_config = {'artnet_ip': artnet_ip.strip()}
-    for key, (raw, minimum, maximum) in numeric_settings.items():
-        try:
-            value = int(raw)
-        except (TypeError, ValueError):
-            return jsonify({'success': False, 'message': f'{key} must be a number'}), 400
-        if not minimum <= value <= maximum:
-            return jsonify({
-                'success': False,
-                'message': f'{key} must be between {minimum} and {maximum}'
-            }), 400
-        network_config[key] = value
-
-    success = save_config(network_config)
+    # Nothing is saved unless every setting is valid, so a bad value cannot
+    # leave configuration half-updated.
+    settings, invalid = parse_settings(settings)
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    refresh_rate, invalid = parse_int_setting(data.get('refresh_rate', 30), 'refresh_rate', 1, 60)
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    changes = {'refresh_rate': refresh_rate}
+    if 'input' in data:
+        changes['input'], invalid = parse_input_settings(data['input'])
+        if invalid:
+            return jsonify({'success': False, 'message': invalid}), 400
+
+    output = dict(get_config()['output'])
+    output['backend'] = backend
+    output[backend] = settings
+    changes['output'] = output
+
+    success = save_config(changes)
     if success:
         return jsonify({'success': True})
     return jsonify({'success': False, 'message': 'Failed to save network settings'}), 500
 
+@setup_bp.route('/api/network/nodes')
+@auth.login_required
+def get_network_nodes():
+    """Art-Net nodes found by discovery, for the network page"""
+    return jsonify(get_artnet_nodes())
+
+@setup_bp.route('/api/network/input')
+@auth.login_required
+def get_network_input():
+    """Art-Net input merge status: settings and the console being followed"""
+    return jsonify(get_artnet_input_status())
+
 @setup_bp.route('/api/config/fixtures', methods=['POST'])
 @auth.login_required
 def update_fixtures():
@@ -183,6 +703,66 @@ def update_fixtures():
         return jsonify({'success': True})
     return jsonify({'success': False, 'message': 'Failed to save fixtures'}), 500
 
+@setup_bp.route('/api/config/effects', methods=['POST'])
+@auth.login_required
+def update_effects():
+    """Update effect definitions"""
+    data = get_json_object()
+    if data is None:
+        return jsonify({'success': False, 'message': 'JSON body required'}), 400
+
+    if 'effects' not in data:
+        return jsonify({'success': False, 'message': 'No effects provided'}), 400
+
+    invalid = find_invalid_effects(data['effects'])
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    success = save_config({'effects': data['effects']})
+    if success:
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': 'Failed to save effects'}), 500
+
+@setup_bp.route('/api/config/cue-lists', methods=['POST'])
+@auth.login_required
+def update_cue_lists():
+    """Update cue lists; every cue's frame is precomputed as they are saved"""
+    data = get_json_object()
+    if data is None:
+        return jsonify({'success': False, 'message': 'JSON body required'}), 400
+
+    if 'cue_lists' not in data:
+        return jsonify({'success': False, 'message': 'No cue lists provided'}), 400
+
+    invalid = find_invalid_cue_lists(data['cue_lists'])
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    success = save_config({'cue_lists': data['cue_lists']})
+    if success:
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': 'Failed to save cue lists'}), 500
+
+@setup_bp.route('/api/config/schedule', methods=['POST'])
+@auth.login_required
+def update_schedule():
+    """Update the time-of-day schedule"""
+    data = get_json_object()
+    if data is None:
+        return jsonify({'success': False, 'message': 'JSON body required'}), 400
+
+    if 'schedule' not in data:
+        return jsonify({'success': False, 'message': 'No schedule provided'}), 400
+
+    invalid = find_invalid_schedule(data['schedule'])
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    success = save_config({'schedule': data['schedule']})
+    if success:
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': 'Failed to save schedule'}), 500
+
 @setup_bp.route('/api/config/scenes', methods=['POST'])
 @auth.login_required
 def save_scene_endpoint():
@@ -207,7 +787,7 @@ def save_scene_endpoint():
         return jsonify({'success': True})
     
     # If we have max scenes, return appropriate error
-    if len(get_config().get('scenes', [])) >= current_app.config['MAX_SCENES']:
+    if get_scene_count() >= current_app.config['MAX_SCENES']:
         return jsonify({
             'success': False, 
             'message': f"Maximum {current_app.config['MAX_SCENES']} scenes allowed"
@@ -255,6 +835,65 @@ def test_scene_endpoint():
 
     return jsonify({'success': False, 'message': 'Failed to test scene'}), 500
 
+
+@setup_bp.route('/api/preview', methods=['POST'])
+@auth.login_required
+def update_preview_endpoint():
+    """Queue sparse channel changes for the scene editor preview"""
+    data = get_json_object()
+    if data is None:
+        return jsonify({'success': False, 'message': 'JSON body required'}), 400
+
+    channels, invalid = parse_preview_channels(data.get('channels', {}))
+    if invalid:
+        return jsonify({'success': False, 'message': invalid}), 400
+
+    sequence = update_preview(channels, reset=bool(data.get('reset')))
+    if sequence is None:
+        return jsonify({'success': False, 'message': 'Failed to update preview'}), 500
+    return jsonify({'success': True, 'sequence': sequence})
+
+
+@setup_bp.route('/api/preview', methods=['DELETE'])
+@auth.login_required
+def release_preview_endpoint():
+    """End the scene editor preview"""
+    if release_preview():
+        return jsonify({'success': True})
+    return jsonify({'success': False, 'message': 'Failed to release preview'}), 500
+
+
+@setup_bp.route('/api/preview/stream')
+@auth.login_required
+def preview_stream():
+    """
+    Server-sent events acknowledging preview updates: one `data:` line with
+    the sequence number now on the wire each time it advances, and a comment
+    line as a keepalive otherwise. The preview ends when the last open
+    stream closes.
+    """
+    events = subscribe_preview()
+    if events is None:
+        return jsonify({'success': False, 'message': 'DMX controller not initialized'}), 500
+
+    def generate():
+        try:
+            for event in events:
+                if event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                sequence, active = event
+                yield f"data: {json.dumps({'sequence': sequence, 'active': active})}\n\n"
+        finally:
+            # Runs when the client disconnects; closing the subscription is
+            # what releases an abandoned preview
+            events.close()
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # let a reverse proxy pass events straight through
+    })
+
 @setup_bp.route('/api/fixture-types')
 @auth.login_required
 def get_fixture_types():
@@ -263,6 +902,32 @@ def get_fixture_types():
         'types': FixtureType.get_types()
     })
 
+def fixture_profiles_url():
+    """The fixture profile catalogue's URL, versioned by its content hash"""
+    _, digest = FixtureType.get_catalogue()
+    return url_for('setup.get_fixture_profiles', v=digest)
+
+
+@setup_bp.route('/api/fixture-profiles')
+@auth.login_required
+def get_fixture_profiles():
+    """
+    Every fixture type's channel definitions in one response, tagged with
+    the catalogue's content hash as ETag.
+
+    Asked for at the versioned URL the editor pages are rendered with
+    (`?v=<hash>`), the response is cacheable for a year: a changed
+    catalogue gets a new URL. Any other request is revalidated.
+    """
+    types, digest = FixtureType.get_catalogue()
+    cache_control = http_cache.IMMUTABLE if request.args.get('v') == digest \
+        else http_cache.REVALIDATE
+    etag = f"profiles-{digest}"
+    if http_cache.is_not_modified(etag):
+        return http_cache.not_modified_response(etag, cache_control=cache_control)
+    body = current_app.json.dumps({'hash': digest, 'types': types}).encode()
+    return http_cache.cached_response(body, etag, cache_control=cache_control)
+
 @setup_bp.route('/api/fixture-types/<fixture_type>')
 @auth.login_required
 def get_fixture_type_details(fixture_type):
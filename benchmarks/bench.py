@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+DMX Life Benchmarks - Times the hot paths against synthetic configs
+
+Builds a throwaway config for every combination of fixture count, scene
+count and active layer count, then times:
+
+  - scene composition: SceneManager.toggle_scene() and _rebuild_buffer()
+  - the scene catalogue: loading it, and listing one page of it
+  - fades: one DMXController._update_transition() tick
+  - the send path: DMXController._send_dmx_packet() to a loopback socket
+  - config I/O: ConfigManager.read(), write() and save_scene()
+  - the JSON API, through the Flask test client
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --fixtures 16,64 --scenes 10,40 --active 1,8
+    python benchmarks/bench.py --fixtures 64 --scenes 10,1000,5000 --active 8
+    python benchmarks/bench.py --output before.json
+    python benchmarks/bench.py --compare before.json
+
+Results go to benchmarks/results/ (or --output) as JSON: per case and
+combination, the median, p95 and mean time in microseconds. --compare
+prints each median against the same case in an earlier results file.
+
+Nothing here touches app/config.json or the network: the configs live in
+a temporary directory, output goes to 127.0.0.1, and the API benchmark's
+app runs without the Art-Net listener, config watcher or live state.
+"""
+import argparse
+import base64
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Loopback with explicit credentials: no development-credentials warning
+os.environ['DMXLIFE_HOST'] = '127.0.0.1'
+os.environ['DMXLIFE_USERNAME'] = 'bench'
+os.environ['DMXLIFE_PASSWORD'] = 'bench'
+os.environ.pop('DMXLIFE_DEBUG', None)
+
+from app import create_app  # noqa: E402
+from app.config_manager import ConfigManager  # noqa: E402
+from app.dmx_backends import create_backend  # noqa: E402
+from app.dmx_controller_class import DMXController  # noqa: E402
+from app.models.fixture import FixtureType  # noqa: E402
+from app.scene_manager import SceneManager  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+AUTH = {'Authorization': 'Basic ' + base64.b64encode(b'bench:bench').decode()}
+
+
+def make_config(fixture_count, scene_count, active_count, port, seed=0):
+    """
+    A synthetic config: fixtures of every built-in type packed from channel 1
+    (as many as fit in 512 channels), and scenes each enabling a random half
+    of them. The first `active_count` scenes are additive, so they can all be
+    active at once; the rest are spread over the exclusive groups.
+    """
+    rng = random.Random(seed)
+    types = sorted(FixtureType.get_catalogue()[0].items())
+    fixtures = []
+    channel = 1
+    for i in range(fixture_count):
+        type_name, definition = types[i % len(types)]
+        count = len(definition['channels'])
+        if channel + count - 1 > 512:
+            break
+        fixtures.append({
+            'name': f"Fixture {i + 1}",
+            'type': type_name,
+            'start_channel': channel,
+            'channel_count': count,
+            'linked_to': None,
+        })
+        channel += count
+
+    exclusive = ['main', 'achtergrond', 'sfeer', 'aanuit']
+    scenes = []
+    for i in range(scene_count):
+        enabled = rng.sample(fixtures, max(1, len(fixtures) // 2))
+        scenes.append({
+            'name': f"Scene {i + 1}",
+            'channels': [rng.randrange(256) for _ in range(512)],
+            'enabledFixtures': [fixture['name'] for fixture in enabled],
+            'group': None if i < active_count else exclusive[i % len(exclusive)],
+        })
+
+    return {
+        'output': {'backend': 'artnet', 'artnet': {
+            'ip': '127.0.0.1', 'port': port, 'universe': 0, 'packet_size': 512,
+            'nodes': [], 'discovery': False,
+        }},
+        'refresh_rate': 30,
+        'fixtures': fixtures,
+        'scenes': scenes,
+        'effects': [],
+        'cue_lists': [],
+        'schedule': [],
+    }
+
+
+def measure(func, min_time, min_runs=20, max_runs=100000):
+    """Call func repeatedly for at least min_time seconds; summarise in microseconds"""
+    times = []
+    deadline = time.perf_counter() + min_time
+    while len(times) < max_runs and (len(times) < min_runs or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        'runs': len(times),
+        'median_us': round(times[len(times) // 2] * 1e6, 2),
+        'p95_us': round(times[min(len(times) - 1, int(len(times) * 0.95))] * 1e6, 2),
+        'mean_us': round(sum(times) / len(times) * 1e6, 2),
+    }
+
+
+def bench_scene_manager(config_path, active_count, min_time):
+    scene_manager = SceneManager(ConfigManager(config_path))
+    scene_manager.load_scenes()
+    names = list(scene_manager.scenes)
+    for name in names[:active_count]:
+        scene_manager.toggle_scene(name)
+    # Toggle a scene outside the active set on and off, so the stack size
+    # stays at active_count between runs
+    target = names[active_count] if active_count < len(names) else names[-1]
+    return {
+        'scene_manager.toggle_scene': measure(lambda: scene_manager.toggle_scene(target), min_time),
+        'scene_manager._rebuild_buffer': measure(scene_manager._rebuild_buffer, min_time),
+        'scene_manager.load_scenes': measure(scene_manager.load_scenes, min_time, min_runs=5),
+        'scene_manager.list_scenes': measure(
+            lambda: scene_manager.list_scenes(len(names) // 2, 100), min_time
+        ),
+    }
+
+
+def bench_controller(output, min_time):
+    controller = DMXController(create_backend(output))
+    try:
+        # A fade across every channel, re-armed each tick so it never finishes
+        rng = random.Random(1)
+        target = bytearray(rng.randrange(256) for _ in range(512))
+        controller.set_immediate(bytearray(512))
+
+        def transition_tick():
+            with controller._lock:
+                controller.current_values[:] = bytes(512)
+                controller.target_values[:] = target
+                controller.transition_active = True
+                controller.transition_start_time = time.time() - controller.TRANSITION_DURATION / 2
+                controller._update_transition()
+
+        frame = bytes(target)
+        return {
+            'dmx_controller._update_transition': measure(transition_tick, min_time),
+            'dmx_controller._send_dmx_packet': measure(
+                lambda: controller._send_dmx_packet(frame, time.monotonic()), min_time
+            ),
+        }
+    finally:
+        controller.backend.disconnect()
+
+
+def bench_config_manager(config_path, min_time):
+    config_manager = ConfigManager(config_path)
+    config = config_manager.read()
+    scene = config['scenes'][0]
+    return {
+        'config_manager.read': measure(config_manager.read, min_time),
+        'config_manager.write': measure(lambda: config_manager.write(config), min_time, min_runs=5),
+        'config_manager.save_scene': measure(
+            lambda: config_manager.save_scene(scene['name'], scene['channels'],
+                                              scene['enabledFixtures'], scene['group']),
+            min_time, min_runs=5,
+        ),
+    }
+
+
+def bench_api(config_path, scene_count, min_time):
+    app = create_app({'CONFIG_FILE': config_path, 'MAX_SCENES': max(40, scene_count + 1),
+                      'LIVE_STATE': False, 'ARTNET_LISTEN': False, 'CONFIG_WATCH': False})
+    app.logger.disabled = True
+    client = app.test_client()
+    client.get('/api/scenes', headers=AUTH)  # First request starts the output threads
+
+    from app import dmx_controller as integration
+    try:
+        scene = integration.scene_manager.get_available_scenes()[-1]
+
+        def get(path):
+            return lambda: client.get(path, headers=AUTH)
+
+        return {
+            'api GET /api/scenes': measure(get('/api/scenes'), min_time),
+            'api GET /api/scenes?limit=100': measure(get('/api/scenes?limit=100'), min_time),
+            'api GET /setup/api/config/scenes/<name>': measure(
+                get(f"/setup/api/config/scenes/{scene}"), min_time
+            ),
+            'api POST /api/scenes/activate': measure(
+                lambda: client.post('/api/scenes/activate', json={'scene': scene}, headers=AUTH),
+                min_time,
+            ),
+            'api GET /api/dmx/values': measure(get('/api/dmx/values'), min_time),
+            'api GET /api/connection/status': measure(get('/api/connection/status'), min_time),
+            'api GET /setup/api/config': measure(get('/setup/api/config'), min_time),
+        }
+    finally:
+        integration.dmx_controller.stop()
+        integration.scheduler.stop()
+        integration.config_watcher.stop()
+
+
+def run(args):
+    # A bound socket to receive the send-path benchmark's packets
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.bind(('127.0.0.1', 0))
+    port = sink.getsockname()[1]
+
+    results = []
+    combinations = list(itertools.product(args.fixtures, args.scenes, args.active))
+    with tempfile.TemporaryDirectory() as tmp:
+        for fixture_count, scene_count, active_count in combinations:
+            active_count = min(active_count, scene_count)
+            config = make_config(fixture_count, scene_count, active_count, port)
+            # In an app/ subdirectory, so the config history lands inside tmp too
+            config_dir = os.path.join(tmp, f"{fixture_count}-{scene_count}-{active_count}", 'app')
+            os.makedirs(config_dir)
+            config_path = os.path.join(config_dir, 'config.json')
+            with open(config_path, 'w') as f:
+                json.dump(config, f)
+
+            params = {
+                'fixtures': len(config['fixtures']),
+                'scenes': scene_count,
+                'active': active_count,
+            }
+            print(f"fixtures={params['fixtures']} scenes={scene_count} active={active_count}")
+
+            cases = {}
+            cases.update(bench_scene_manager(config_path, active_count, args.min_time))
+            cases.update(bench_controller(config['output'], args.min_time))
+            cases.update(bench_config_manager(config_path, args.min_time))
+            if not args.skip_api:
+                cases.update(bench_api(config_path, scene_count, args.min_time))
+
+            for case, timing in cases.items():
+                print(f"  {case:<40} median {timing['median_us']:>10.1f} us"
+                      f"   p95 {timing['p95_us']:>10.1f} us")
+                results.append({'case': case, 'params': params, **timing})
+
+    sink.close()
+    return results
+
+
+def compare(results, baseline_path):
+    """Print each median against the same case and parameters in a baseline file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def key(result):
+        return (result['case'], tuple(sorted(result['params'].items())))
+
+    previous = {key(result): result for result in baseline['results']}
+    print(f"\nAgainst {baseline_path} (version {baseline.get('version')}):")
+    for result in results:
+        before = previous.get(key(result))
+        if before is None:
+            continue
+        ratio = result['median_us'] / before['median_us'] if before['median_us'] else float('inf')
+        params = ' '.join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"  {result['case']:<40} {params:<32} {before['median_us']:>10.1f} -> "
+              f"{result['median_us']:>10.1f} us  ({ratio:.2f}x)")
+
+
+def int_list(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--fixtures', type=int_list, default=[16, 64],
+                        help='fixture counts, comma-separated (default 16,64)')
+    parser.add_argument('--scenes', type=int_list, default=[10, 40],
+                        help='scene counts, comma-separated (default 10,40)')
+    parser.add_argument('--active', type=int_list, default=[1, 8],
+                        help='active layer counts, comma-separated (default 1,8)')
+    parser.add_argument('--min-time', type=float, default=0.3,
+                        help='seconds to spend on each case (default 0.3)')
+    parser.add_argument('--skip-api', action='store_true', help='leave out the API cases')
+    parser.add_argument('--output', help='results file (default benchmarks/results/<version>-<time>.json)')
+    parser.add_argument('--compare', metavar='PATH', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    with open(os.path.join(ROOT, 'VERSION')) as f:
+        version = f.read().strip()
+
+    results = run(args)
+    document = {
+        'version': version,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'min_time': args.min_time,
+        'results': results,
+    }
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{version}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(document, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Art-Net Node - A stand-in node that answers ArtPoll and prints the DMX it gets
+
+For checking discovery and per-universe unicast without hardware. Bind it to
+a loopback address of its own, then point Art-Net output at that address
+(Network Setup, "Art-Net IP Address") with discovery on and no nodes listed:
+
+    python tools/artnet_node.py --bind 127.0.0.2 --universe 0 --universe 1
+
+The controller polls 127.0.0.2, this node replies that it outputs universes
+0 and 1, and from then on frames for either universe are unicast here.
+Stop it and the controller falls back to the configured address within
+about ten seconds.
+
+Independent of the app's encoder, like the other stand-ins (see
+tools/README.md).
+"""
+import argparse
+import socket
+import time
+
+ARTNET_PORT = 6454
+ARTNET_ID = b'Art-Net\x00'
+OP_POLL = 0x2000
+OP_POLL_REPLY = 0x2100
+OP_DMX = 0x5000
+PORT_TYPE_OUTPUT = 0x80  # Port outputs DMX512
+GOOD_OUTPUT_DATA = 0x80  # Output is transmitting
+
+
+def build_poll_reply(ip, name, net, subnet, universes, bind_index):
+    """
+    An ArtPollReply for up to four output ports sharing a net and subnet
+    (Art-Net 4, Table 8). Fields this node doesn't use are left zero.
+    """
+    reply = bytearray(239)
+    reply[0:8] = ARTNET_ID
+    reply[8:10] = OP_POLL_REPLY.to_bytes(2, 'little')
+    reply[10:14] = socket.inet_aton(ip)
+    reply[14:16] = ARTNET_PORT.to_bytes(2, 'little')
+    reply[18] = net
+    reply[19] = subnet
+    reply[26:44] = name.encode('ascii', 'replace')[:17].ljust(18, b'\x00')
+    reply[44:108] = f"{name} (DMX Life test node)".encode('ascii', 'replace')[:63].ljust(64, b'\x00')
+    reply[172:174] = len(universes).to_bytes(2, 'big')
+    for i, universe in enumerate(universes):
+        reply[174 + i] = PORT_TYPE_OUTPUT
+        reply[182 + i] = GOOD_OUTPUT_DATA
+        reply[190 + i] = universe
+    reply[207:211] = socket.inet_aton(ip)
+    reply[211] = bind_index
+    return bytes(reply)
+
+
+def build_replies(ip, name, port_addresses):
+    """
+    One reply per group of up to four ports with the same net and subnet,
+    numbered by bind index from 1, as a multi-port node would send them.
+    """
+    groups = {}
+    for address in sorted(set(port_addresses)):
+        net, subnet, universe = address >> 8, (address >> 4) & 0x0F, address & 0x0F
+        groups.setdefault((net, subnet), []).append(universe)
+
+    replies = []
+    for (net, subnet), universes in sorted(groups.items()):
+        for start in range(0, len(universes), 4):
+            replies.append(build_poll_reply(
+                ip, name, net, subnet, universes[start:start + 4], len(replies) + 1
+            ))
+    return replies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--bind', default='127.0.0.2',
+                        help='address to listen on and report (default 127.0.0.2)')
+    parser.add_argument('--universe', type=int, action='append',
+                        help='Port-Address to output, 0-32767 (repeatable; default 0)')
+    parser.add_argument('--name', default='Test Node', help='short name to report')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds between summaries (default 1)')
+    args = parser.parse_args()
+    universes = args.universe or [0]
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # Share port 6454 with the controller when both run on this machine
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.bind, ARTNET_PORT))
+    sock.settimeout(args.interval)
+    replies = build_replies(args.bind, args.name, universes)
+    print(f"Node '{args.name}' on {args.bind}:{ARTNET_PORT} outputting universes {sorted(set(universes))}")
+
+    frames = {}  # Port-Address -> frames this interval
+    last = {}  # Port-Address -> last slot data
+    started = time.monotonic()
+    while True:
+        try:
+            packet, (sender, _) = sock.recvfrom(1024)
+        except socket.timeout:
+            packet = None
+        except KeyboardInterrupt:
+            return
+
+        if packet is not None and len(packet) >= 10 and packet[:8] == ARTNET_ID:
+            opcode = int.from_bytes(packet[8:10], 'little')
+            if opcode == OP_POLL and sender != args.bind:
+                # Replies always go to port 6454, whatever port the poll came from
+                for reply in replies:
+                    sock.sendto(reply, (sender, ARTNET_PORT))
+                print(f"Poll from {sender}: sent {len(replies)} replies")
+            elif opcode == OP_DMX and len(packet) >= 18:
+                address = int.from_bytes(packet[14:16], 'little')
+                length = int.from_bytes(packet[16:18], 'big')
+                frames[address] = frames.get(address, 0) + 1
+                last[address] = packet[18:18 + length]
+
+        elapsed = time.monotonic() - started
+        if elapsed >= args.interval:
+            if not frames:
+                print('no data')
+            for address in sorted(frames):
+                lit = [f"{i + 1}={v}" for i, v in enumerate(last[address]) if v]
+                unexpected = '' if address in universes else ' (NOT OURS)'
+                print(
+                    f"universe {address}{unexpected}: {frames[address] / elapsed:.1f} fps, "
+                    f"{' '.join(lit[:16]) or 'all zero'}{' ...' if len(lit) > 16 else ''}"
+                )
+            frames = {}
+            started = time.monotonic()
+
+
+if __name__ == '__main__':
+    main()
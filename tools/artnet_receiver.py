@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Art-Net Receiver - Measures the timing of the ArtDmx stream that reaches the wire
+
+Binds a local UDP port, decodes ArtDmx, and reports what a node would see:
+frame rate, inter-frame interval and jitter percentiles, sequence gaps and
+throughput. Point Art-Net output at this machine's address (127.0.0.1 on
+the same box) with discovery off, then:
+
+    python tools/artnet_receiver.py --bind 127.0.0.1
+    python tools/artnet_receiver.py --bind 127.0.0.1 --duration 30 --json timing.json
+
+Jitter is each interval's distance from the median interval, so a steady
+stream at any rate reports close to zero. Sequence gaps count frames lost
+(or reordered) between two packets, using the 1-255 sequence field; a
+sender with sequencing disabled (always 0) is not checked.
+
+Independent of the app's encoder, like the other stand-ins (see
+tools/README.md).
+"""
+import argparse
+import json
+import socket
+import statistics
+import time
+
+from timing import percentile
+
+ARTNET_PORT = 6454
+ARTNET_ID = b'Art-Net\x00'
+OP_DMX = 0x5000
+
+
+class StreamStats:
+    """Arrival times, sequence gaps and byte counts for one ArtDmx stream"""
+
+    def __init__(self):
+        self.arrivals = []
+        self.bytes = 0
+        self.sequence_gaps = 0
+        self.out_of_order = 0
+        self.last_sequence = None
+
+    def add(self, arrival, sequence, size):
+        self.arrivals.append(arrival)
+        self.bytes += size
+        if sequence == 0:
+            return  # Sequencing disabled by the sender
+        if self.last_sequence is not None:
+            # Sequence runs 1..255 and wraps to 1
+            expected = self.last_sequence % 255 + 1
+            if sequence != expected:
+                missed = (sequence - expected) % 255
+                # A packet from just behind is a reorder, not 250 lost frames
+                if missed > 127:
+                    self.out_of_order += 1
+                    return
+                self.sequence_gaps += missed
+        self.last_sequence = sequence
+
+    def summary(self, elapsed):
+        intervals = [b - a for a, b in zip(self.arrivals, self.arrivals[1:])]
+        result = {
+            'frames': len(self.arrivals),
+            'fps': round(len(self.arrivals) / elapsed, 2) if elapsed else 0.0,
+            'bytes_per_s': round(self.bytes / elapsed) if elapsed else 0,
+            'sequence_gaps': self.sequence_gaps,
+            'out_of_order': self.out_of_order,
+        }
+        if intervals:
+            median = statistics.median(intervals)
+            jitter = sorted(abs(i - median) for i in intervals)
+            ordered = sorted(intervals)
+            result['interval_ms'] = {
+                'median': round(median * 1000, 3),
+                'min': round(ordered[0] * 1000, 3),
+                'max': round(ordered[-1] * 1000, 3),
+            }
+            result['jitter_ms'] = {
+                name: round(percentile(jitter, fraction) * 1000, 3)
+                for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))
+            }
+        return result
+
+
+def format_summary(universe, summary):
+    line = (f"universe {universe}: {summary['fps']:.1f} fps, "
+            f"{summary['bytes_per_s'] / 1024:.1f} KiB/s, "
+            f"{summary['sequence_gaps']} lost, {summary['out_of_order']} out of order")
+    if 'jitter_ms' in summary:
+        jitter = summary['jitter_ms']
+        line += (f", interval {summary['interval_ms']['median']:.1f} ms, "
+                 f"jitter p50 {jitter['p50']:.2f} / p95 {jitter['p95']:.2f} / "
+                 f"p99 {jitter['p99']:.2f} / max {jitter['max']:.2f} ms")
+    return line
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--bind', default='127.0.0.1', help='address to listen on (default 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=ARTNET_PORT, help='UDP port (default 6454)')
+    parser.add_argument('--universe', type=int, help='only measure this Port-Address')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds between summaries (default 1)')
+    parser.add_argument('--duration', type=float,
+                        help='stop after this many seconds and print a final summary')
+    parser.add_argument('--json', metavar='PATH',
+                        help='write the final summary to this file as JSON')
+    args = parser.parse_args()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    # Share the port with the app's own Art-Net listener on the same machine
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.bind, args.port))
+    sock.settimeout(min(args.interval, 0.25))
+    print(f"Listening for ArtDmx on {args.bind}:{args.port}")
+
+    buffer = bytearray(1024)
+    interval_stats = {}  # Port-Address -> StreamStats, reset every interval
+    total_stats = {}  # Port-Address -> StreamStats, whole run
+    started = interval_start = time.monotonic()
+    try:
+        while True:
+            try:
+                length = sock.recv_into(buffer)
+                arrival = time.monotonic()
+            except socket.timeout:
+                length = 0
+                arrival = time.monotonic()
+
+            if length >= 18 and buffer[:8] == ARTNET_ID and \
+                    int.from_bytes(buffer[8:10], 'little') == OP_DMX:
+                universe = int.from_bytes(buffer[14:16], 'little')
+                if args.universe is None or universe == args.universe:
+                    for stats in (interval_stats, total_stats):
+                        stats.setdefault(universe, StreamStats()).add(arrival, buffer[12], length)
+
+            if arrival - interval_start >= args.interval:
+                elapsed = arrival - interval_start
+                if not interval_stats:
+                    print('no data')
+                for universe in sorted(interval_stats):
+                    print(format_summary(universe, interval_stats[universe].summary(elapsed)))
+                interval_stats = {}
+                interval_start = arrival
+
+            if args.duration is not None and arrival - started >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.monotonic() - started
+    result = {
+        'duration_s': round(elapsed, 3),
+        'universes': {str(u): total_stats[u].summary(elapsed) for u in sorted(total_stats)},
+    }
+    print(f"Total over {elapsed:.1f}s:")
+    for universe in sorted(total_stats):
+        print('  ' + format_summary(universe, result['universes'][str(universe)]))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
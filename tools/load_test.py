@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Load Test - Many browser-like clients against the HTTP API at once
+
+Simulates the traffic of N open browser tabs and reports, per endpoint,
+throughput and p50/p95/p99 latency, plus how steady the output frames
+stayed while the web tier was busy:
+
+    python tools/load_test.py --spawn --clients 20 --duration 60
+    python tools/load_test.py --url http://192.168.1.20:5050 --user admin --password ...
+    python tools/load_test.py --spawn --clients 50 --editors 5 --json load.json
+
+Each viewer does what the main page does: polls /api/dmx/values every
+second (the DMX monitor) and /api/connection/status every five (the
+status badge), and now and then activates a scene. Each editor does what
+the scene editor does: loads /setup/api/config, then drags sliders,
+sending sparse /setup/api/preview updates at up to 20 per second, and
+ends each drag with a full-frame /setup/api/config/scenes/test.
+
+--spawn runs the app in a subprocess on a free loopback port, with a
+temporary copy of the config whose output is the null backend, so the
+run needs no lighting network and never touches app/config.json.
+
+Output jitter comes from the app's own /metrics: the frame period and
+jitter histograms are read before and after the run, and percentiles are
+estimated from the difference, so they cover exactly the loaded period.
+With histogram buckets a percentile is an upper bound ("at most").
+"""
+import argparse
+import base64
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+from timing import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CONFIG = os.path.join(ROOT, 'app', 'config.json')
+
+# Poll intervals, in seconds, matching the page scripts
+DMX_MONITOR_INTERVAL = 1.0  # dmx-monitor.js
+CONNECTION_STATUS_INTERVAL = 5.0  # connection-status.js
+PREVIEW_INTERVAL = 0.05  # scenes.js sends at most one preview per frame in flight
+
+SERVER_SCRIPT = """
+import sys
+from app import create_app
+app = create_app({'CONFIG_FILE': sys.argv[1]})
+app.run(host='127.0.0.1', port=int(sys.argv[2]), threaded=True)
+"""
+
+
+class Results:
+    """Latencies and error counts per endpoint, shared by every client thread"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, latency, ok):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(latency)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self, elapsed):
+        summary = {}
+        with self._lock:
+            for endpoint in sorted(self.latencies):
+                ordered = sorted(self.latencies[endpoint])
+                summary[endpoint] = {
+                    'requests': len(ordered),
+                    'errors': self.errors.get(endpoint, 0),
+                    'per_s': round(len(ordered) / elapsed, 2),
+                    'ms': {
+                        name: round(percentile(ordered, fraction) * 1000, 2)
+                        for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99),
+                                               ('max', 1.0))
+                    },
+                }
+        return summary
+
+
+class Client:
+    """One browser tab: a keep-alive connection and the tab's request schedule"""
+
+    def __init__(self, base_url, auth, results):
+        url = urllib.parse.urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.headers = {'Authorization': auth}
+        self.results = results
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        """Send one request; returns the decoded JSON body, or None on failure"""
+        headers = dict(self.headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        data = None
+        ok = False
+        try:
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=10)
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            raw = response.read()
+            ok = response.status < 400
+            if ok and response.getheader('Content-Type', '').startswith('application/json'):
+                data = json.loads(raw)
+            if response.getheader('Connection', '').lower() == 'close':
+                self.close()
+        except (OSError, http.client.HTTPException, ValueError):
+            self.close()  # Reconnect on the next request
+        self.results.add(f"{method} {path}", time.perf_counter() - start, ok)
+        return data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def run_viewer(client, stop, scene_names, toggle_interval, rng):
+    """The main page: two polls on their intervals, and an occasional scene change"""
+    now = time.monotonic()
+    # Tabs were opened at different times, so their polls are not in step
+    next_values = now + rng.uniform(0, DMX_MONITOR_INTERVAL)
+    next_status = now + rng.uniform(0, CONNECTION_STATUS_INTERVAL)
+    next_toggle = now + rng.expovariate(1 / toggle_interval) if toggle_interval else float('inf')
+
+    while not stop.is_set():
+        due = min(next_values, next_status, next_toggle)
+        if stop.wait(max(0.0, due - time.monotonic())):
+            break
+        now = time.monotonic()
+        if now >= next_values:
+            client.request('GET', '/api/dmx/values')
+            next_values += DMX_MONITOR_INTERVAL
+        if now >= next_status:
+            client.request('GET', '/api/connection/status')
+            next_status += CONNECTION_STATUS_INTERVAL
+        if now >= next_toggle and scene_names:
+            client.request('POST', '/api/scenes/activate', {'scene': rng.choice(scene_names)})
+            next_toggle = now + rng.expovariate(1 / toggle_interval)
+    client.close()
+
+
+def run_editor(client, stop, drag_time, pause_time, rng):
+    """The scene editor: load the config, then alternate slider drags and pauses"""
+    client.request('GET', '/setup/api/config')
+    channels = [0] * 512
+    while not stop.is_set():
+        # One drag: a handful of adjacent channels moving together
+        first = rng.randrange(512 - 8)
+        deadline = time.monotonic() + rng.uniform(0.5, 2) * drag_time
+        while time.monotonic() < deadline and not stop.is_set():
+            value = rng.randrange(256)
+            changed = {}
+            for index in range(first, first + rng.randint(1, 8)):
+                channels[index] = value
+                changed[str(index)] = value
+            client.request('POST', '/setup/api/preview', {'channels': changed, 'reset': False})
+            stop.wait(PREVIEW_INTERVAL)
+        client.request('POST', '/setup/api/config/scenes/test', {'channels': channels})
+        stop.wait(rng.uniform(0.5, 2) * pause_time)
+    client.request('DELETE', '/setup/api/preview')
+    client.close()
+
+
+def parse_histograms(text, names):
+    """Per-bucket (not cumulative) counts for the named histograms in /metrics text"""
+    histograms = {name: [] for name in names}
+    for line in text.splitlines():
+        for name in names:
+            prefix = f'{name}_bucket{{le="'
+            if line.startswith(prefix):
+                bound, _, value = line[len(prefix):].partition('"} ')
+                histograms[name].append((float(bound), float(value)))
+    result = {}
+    for name, cumulative in histograms.items():
+        previous = 0.0
+        buckets = []
+        for bound, count in cumulative:
+            buckets.append((bound, count - previous))
+            previous = count
+        result[name] = buckets
+    return result
+
+
+def histogram_percentiles(before, after):
+    """Upper-bound p50/p95/p99 (in ms) of the observations between two snapshots"""
+    buckets = [(bound, count - earlier)
+               for (bound, count), (_, earlier) in zip(after, before or [(0, 0)] * len(after))]
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+    result = {'samples': int(total)}
+    for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+        seen = 0
+        for bound, count in buckets:
+            seen += count
+            if seen >= fraction * total:
+                result[name] = 'over the last bucket' if bound == float('inf') else round(bound * 1000, 3)
+                break
+    return result
+
+
+def spawn_server(config_path, workdir):
+    """Start the app on a free loopback port with the null output; returns (process, url, log)"""
+    # In an app/ subdirectory, so the config history lands inside workdir too
+    config_dir = os.path.join(workdir, 'app')
+    os.makedirs(config_dir)
+    with open(config_path) as f:
+        config = json.load(f)
+    config['output'] = {**config.get('output', {}), 'backend': 'null'}
+    config['input'] = {**config.get('input', {}), 'enabled': False}
+    spawned_config = os.path.join(config_dir, 'config.json')
+    with open(spawned_config, 'w') as f:
+        json.dump(config, f)
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    env = dict(os.environ, DMXLIFE_HOST='127.0.0.1', DMXLIFE_USERNAME='load',
+               DMXLIFE_PASSWORD='load')
+    env.pop('DMXLIFE_DEBUG', None)
+    log_path = os.path.join(workdir, 'server.log')
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        [sys.executable, '-c', SERVER_SCRIPT, spawned_config, str(port)],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    log.close()
+
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process, url, log_path
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    with open(log_path) as f:
+        sys.exit(f"The app did not start:\n{f.read()}")
+
+
+def fetch(url, auth, path):
+    """One GET outside the measured traffic; returns the body as text"""
+    split = urllib.parse.urlsplit(url)
+    connection = http.client.HTTPConnection(split.hostname, split.port or 80, timeout=10)
+    try:
+        connection.request('GET', path, headers={'Authorization': auth})
+        response = connection.getresponse()
+        body = response.read().decode()
+        if response.status >= 400:
+            sys.exit(f"GET {path} failed with HTTP {response.status}; check --user/--password")
+        return body
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='running instance to load, e.g. http://127.0.0.1:5050')
+    target.add_argument('--spawn', action='store_true',
+                        help='start a local instance with the null output backend')
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help='config to copy for --spawn (default app/config.json)')
+    parser.add_argument('--user', default='admin', help='username with --url (default admin)')
+    parser.add_argument('--password', default='banana123',
+                        help='password with --url (default: the development password)')
+    parser.add_argument('--clients', type=int, default=10, help='main-page viewers (default 10)')
+    parser.add_argument('--editors', type=int, default=1, help='scene editors (default 1)')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds to run (default 30)')
+    parser.add_argument('--toggle-interval', type=float, default=15.0,
+                        help='mean seconds between one viewer\'s scene changes; 0 for none '
+                             '(default 15)')
+    parser.add_argument('--drag-time', type=float, default=1.5,
+                        help='typical seconds an editor drags a slider (default 1.5)')
+    parser.add_argument('--pause-time', type=float, default=3.0,
+                        help='typical seconds between an editor\'s drags (default 3)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default 0)')
+    parser.add_argument('--json', metavar='PATH', help='write the results to this file as JSON')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='dmxlife-load-')
+    process = None
+    try:
+        if args.spawn:
+            process, url, log_path = spawn_server(args.config, workdir)
+            credentials = 'load:load'
+            print(f"Started the app at {url} with the null output (log: {log_path})")
+        else:
+            url = args.url.rstrip('/')
+            credentials = f"{args.user}:{args.password}"
+        auth = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+
+        scene_names = json.loads(fetch(url, auth, '/api/scenes'))['scenes']
+        histogram_names = ('dmxlife_frame_period_seconds', 'dmxlife_frame_jitter_seconds')
+        before = parse_histograms(fetch(url, auth, '/metrics'), histogram_names)
+
+        results = Results()
+        stop = threading.Event()
+        threads = []
+        for i in range(args.clients):
+            rng = random.Random(args.seed * 1000 + i)
+            threads.append(threading.Thread(target=run_viewer, daemon=True, args=(
+                Client(url, auth, results), stop, scene_names, args.toggle_interval, rng)))
+        for i in range(args.editors):
+            rng = random.Random(args.seed * 1000 + args.clients + i)
+            threads.append(threading.Thread(target=run_editor, daemon=True, args=(
+                Client(url, auth, results), stop, args.drag_time, args.pause_time, rng)))
+
+        print(f"{args.clients} viewers and {args.editors} editors for {args.duration:g}s ...")
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        try:
+            stop.wait(args.duration)
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=15)
+        elapsed = time.monotonic() - started
+
+        after = parse_histograms(fetch(url, auth, '/metrics'), histogram_names)
+        endpoints = results.summary(elapsed)
+        output = {
+            name.replace('dmxlife_', '').replace('_seconds', '_ms'):
+                histogram_percentiles(before.get(name), after[name])
+            for name in histogram_names
+        }
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total = sum(summary['requests'] for summary in endpoints.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f}/s)")
+    print(f"  {'endpoint':<42} {'req':>6} {'err':>5} {'req/s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, summary in endpoints.items():
+        ms = summary['ms']
+        print(f"  {endpoint:<42} {summary['requests']:>6} {summary['errors']:>5} "
+              f"{summary['per_s']:>7.1f} {ms['p50']:>8.2f} {ms['p95']:>8.2f} "
+              f"{ms['p99']:>8.2f} {ms['max']:>8.2f}")
+
+    print('\nOutput frames under load (histogram upper bounds):')
+    for name, summary in output.items():
+        if summary is None:
+            print(f"  {name}: no frames sent (is the output running?)")
+        else:
+            print(f"  {name}: {summary['samples']} frames, p50 <= {summary['p50']}, "
+                  f"p95 <= {summary['p95']}, p99 <= {summary['p99']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'duration_s': round(elapsed, 3),
+                'clients': args.clients,
+                'editors': args.editors,
+                'endpoints': endpoints,
+                'output': output,
+            }, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Replay Capture - Streams a recorded capture back out through DMXController
+
+Plays the frames a capture backend recorded (Network Setup, "Capture to
+file") at their original timing, through the output the app's config
+selects, or straight to an Art-Net address:
+
+    python tools/replay_capture.py captures/capture-20261019-201500.dmxrec
+    python tools/replay_capture.py show.dmxrec --artnet 127.0.0.1 --speed 2
+
+Frames go through DMXController.set_immediate(), the same send path the
+app uses, so a replay reproduces an on-site problem on the bench with no
+console or show file involved. Stop the app first if it uses the same
+output, or both will be sending.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config_manager import ConfigManager  # noqa: E402
+from app.dmx_backends import DMXBackendError, create_backend  # noqa: E402
+from app.dmx_backends.capture import open_capture  # noqa: E402
+from app.dmx_controller_class import DMXController  # noqa: E402
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'app', 'config.json')
+
+
+def build_backend(args):
+    """The backend to replay through: --artnet if given, else the config's output"""
+    if args.artnet:
+        output = {'backend': 'artnet', 'artnet': {
+            'ip': args.artnet, 'universe': args.universe, 'discovery': False,
+        }}
+    else:
+        output = ConfigManager(args.config).get_output_settings()
+        if output.get('backend') == 'capture':
+            # Replay through whatever the capture forwarded to, never into a
+            # new capture of itself
+            forward = (output.get('capture') or {}).get('forward')
+            if not forward:
+                sys.exit('The config outputs to a capture file only; use --artnet to choose a destination')
+            output = {**output, 'backend': forward}
+    return create_backend(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('capture', help='capture file to play')
+    parser.add_argument('--config', default=DEFAULT_CONFIG,
+                        help='app config whose output settings to use (default app/config.json)')
+    parser.add_argument('--artnet', metavar='IP', help='send Art-Net to this address instead')
+    parser.add_argument('--universe', type=int, default=0,
+                        help='Art-Net Port-Address with --artnet (default 0)')
+    parser.add_argument('--speed', type=float, default=1.0, help='playback rate (default 1)')
+    parser.add_argument('--max-gap', type=float, default=5.0,
+                        help='longest pause to reproduce, in seconds; longer gaps '
+                             '(output stopped, app restarted) are cut to this (default 5)')
+    parser.add_argument('--loop', action='store_true', help='play until interrupted')
+    args = parser.parse_args()
+
+    header, records = open_capture(args.capture)
+    if len(records) == 0:
+        sys.exit('The capture holds no frames')
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(header['started_wall']))
+    print(f"{len(records)} frames captured from {started}")
+
+    try:
+        backend = build_backend(args)
+    except DMXBackendError as e:
+        sys.exit(f"Cannot replay: {e}")
+    controller = DMXController(backend)
+    print(f"Replaying through {backend.get_connection_status()}")
+
+    # Playback offsets: the recorded intervals, scaled, with long gaps cut
+    intervals = records['time'][1:] - records['time'][:-1]
+    intervals = intervals.clip(0, args.max_gap) / args.speed
+
+    try:
+        while True:
+            late = 0
+            worst = 0.0
+            start = time.monotonic()
+            due = start
+            for i in range(len(records)):
+                if i:
+                    due += intervals[i - 1]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -0.005:
+                    late += 1
+                    worst = max(worst, -delay)
+                controller.set_immediate(bytearray(records['slots'][i]))
+            elapsed = time.monotonic() - start
+            print(f"Played {len(records)} frames in {elapsed:.1f}s; "
+                  f"{late} more than 5 ms late (worst {worst * 1000:.1f} ms)")
+            if not args.loop:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+sACN Listener - Joins a universe's multicast group and prints what arrives
+
+A stand-in receiver for checking the sACN backend without hardware: run it
+on the same machine (multicast loopback is on) or anywhere on the lighting
+network, then select sACN in Network Setup.
+
+    python tools/sacn_listener.py --universe 1
+
+Independent of the app's encoder, like the other stand-ins (see
+tools/README.md).
+"""
+import argparse
+import socket
+import struct
+import time
+import uuid
+
+SACN_PORT = 5568
+ACN_PACKET_IDENTIFIER = b'ASC-E1.17\x00\x00\x00'
+
+
+def multicast_group(universe):
+    return f"239.255.{universe >> 8}.{universe & 0xFF}"
+
+
+def parse_data_packet(packet):
+    """Decode an E1.31 data packet into a dict, or None if it isn't one"""
+    if len(packet) < 126 or packet[4:16] != ACN_PACKET_IDENTIFIER:
+        return None
+    if int.from_bytes(packet[18:22], 'big') != 0x00000004:
+        return None  # Not a data packet (e.g. universe discovery)
+
+    value_count = int.from_bytes(packet[123:125], 'big')
+    return {
+        'cid': uuid.UUID(bytes=bytes(packet[22:38])),
+        'source_name': packet[44:108].split(b'\x00', 1)[0].decode('utf-8', 'replace'),
+        'priority': packet[108],
+        'sequence': packet[111],
+        'preview': bool(packet[112] & 0x80),
+        'terminated': bool(packet[112] & 0x40),
+        'universe': int.from_bytes(packet[113:115], 'big'),
+        'start_code': packet[125],
+        'slots': packet[126:125 + value_count],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--universe', type=int, default=1, help='sACN universe (default 1)')
+    parser.add_argument('--interface', default='0.0.0.0',
+                        help='local address to join the group on (default: any)')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds between summaries (default 1)')
+    args = parser.parse_args()
+
+    group = multicast_group(args.universe)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(('', SACN_PORT))
+    membership = struct.pack('4s4s', socket.inet_aton(group), socket.inet_aton(args.interface))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+    sock.settimeout(args.interval)
+    print(f"Listening for universe {args.universe} on {group}:{SACN_PORT}")
+
+    frames = 0
+    sequence_errors = 0
+    last_sequence = None
+    last = None
+    started = time.monotonic()
+    while True:
+        try:
+            packet, (sender, _) = sock.recvfrom(1024)
+        except socket.timeout:
+            packet = None
+        except KeyboardInterrupt:
+            return
+
+        if packet is not None:
+            data = parse_data_packet(packet)
+            if data is None or data['universe'] != args.universe:
+                continue
+            if data['terminated']:
+                print(f"{sender} '{data['source_name']}' terminated its stream")
+                last_sequence = None
+                continue
+            if last_sequence is not None and data['sequence'] != (last_sequence + 1) % 256:
+                sequence_errors += 1
+            last_sequence = data['sequence']
+            frames += 1
+            last = (sender, data)
+
+        elapsed = time.monotonic() - started
+        if elapsed >= args.interval:
+            if last is None:
+                print('no data')
+            else:
+                sender, data = last
+                lit = [f"{i + 1}={v}" for i, v in enumerate(data['slots']) if v]
+                flags = ' PREVIEW' if data['preview'] else ''
+                print(
+                    f"{sender} '{data['source_name']}' prio {data['priority']}{flags} "
+                    f"{frames / elapsed:.1f} fps, {sequence_errors} sequence errors, "
+                    f"{len(data['slots'])} slots: {' '.join(lit[:16]) or 'all zero'}"
+                    f"{' ...' if len(lit) > 16 else ''}"
+                )
+            frames = 0
+            sequence_errors = 0
+            last = None
+            started = time.monotonic()
+
+
+if __name__ == '__main__':
+    main()
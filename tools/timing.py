@@ -0,0 +1,11 @@
+"""
+Timing helpers shared by the measuring tools
+"""
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list; None if it is empty"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]